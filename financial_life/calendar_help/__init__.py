@@ -1,4 +1,4 @@
-from calendar import monthrange
+from calendar import monthrange, isleap
 from datetime import date
 from datetime import timedelta
 from datetime import datetime
@@ -40,7 +40,128 @@ class Bank_Date(datetime):
 
 def get_days_per_year(year):
     # returns the number of days per year
-    return 365 if monthrange(year, 2)[1] == 28 else 366
+    return 366 if isleap(year) else 365
+
+
+class Calendar(object):
+    """ Table of consecutive days given as day ordinals (see date.toordinal),
+    in which year, month, day, the number of days of the year and the ends
+    of months and years are looked up instead of creating date objects. The
+    table grows with the days asked for """
+
+    # number of years the table is extended beyond the day asked for
+    lookahead = 50
+
+    def __init__(self):
+        self._first = 0             # ordinal of the first day in the table
+        self._first_year = None
+        self._last_year = None
+        self._years = []
+        self._months = []
+        self._days = []
+        self._days_per_year = []
+        self._year_ends = []        # ordinal of the 31st December of the year
+        self._month_ends = []
+        self._dates = []            # Bank_Date of every day, once created
+
+    def index(self, ordinal):
+        """ returns the position of ordinal in the table """
+        i = ordinal - self._first
+        if (i < 0) or (i >= len(self._days)):
+            self.extend(ordinal)
+            i = ordinal - self._first
+        return i
+
+    def extend(self, ordinal):
+        """ rebuilds the table, so that it contains the day ordinal """
+        year = date.fromordinal(ordinal).year
+        if self._first_year is None:
+            first_year, last_year = year, year + self.lookahead
+        else:
+            first_year = min(year, self._first_year)
+            last_year = max(year + self.lookahead, self._last_year)
+        last_year = min(last_year, date.max.year)
+
+        # the lists are cleared in place, as lookups may already hold them
+        for table in (self._years, self._months, self._days, self._days_per_year,
+                      self._year_ends, self._month_ends, self._dates):
+            del table[:]
+        self._first = date(first_year, 1, 1).toordinal()
+        self._first_year = first_year
+        self._last_year = last_year
+        for year in range(first_year, last_year + 1):
+            days_per_year = get_days_per_year(year)
+            year_end = date(year, 12, 31).toordinal()
+            for month in range(1, 13):
+                days = monthrange(year, month)[1]
+                self._years.extend([year] * days)
+                self._months.extend([month] * days)
+                self._days.extend(range(1, days + 1))
+                self._month_ends.extend([False] * (days - 1) + [True])
+            self._days_per_year.extend([days_per_year] * days_per_year)
+            self._year_ends.extend([year_end] * days_per_year)
+        self._dates.extend([None] * len(self._days))
+
+    def year(self, ordinal):
+        return self._years[self.index(ordinal)]
+
+    def month(self, ordinal):
+        return self._months[self.index(ordinal)]
+
+    def day(self, ordinal):
+        return self._days[self.index(ordinal)]
+
+    def days_per_year(self, ordinal):
+        return self._days_per_year[self.index(ordinal)]
+
+    def year_end(self, ordinal):
+        """ returns the ordinal of the last day of the year """
+        return self._year_ends[self.index(ordinal)]
+
+    def is_end_of_month(self, ordinal):
+        return self._month_ends[self.index(ordinal)]
+
+    def is_end_of_year(self, ordinal):
+        return self._year_ends[self.index(ordinal)] == ordinal
+
+    def date(self, ordinal, time = None):
+        """ returns the day ordinal as Bank_Date. time is an optional
+        timedelta added to the beginning of the day """
+        i = self.index(ordinal)
+        result = self._dates[i]
+        if result is None:
+            result = Bank_Date.fromordinal(ordinal)
+            self._dates[i] = result
+        if time:
+            result = result + time
+        return result
+
+
+# calendar shared by all simulations
+calendar_table = Calendar()
+
+
+class Ordinal_Date(object):
+    """ Mixin for classes, which keep their current date as day ordinal
+    (_ordinal) and the time of the day (_time). The date is available as
+    _current_date, but the Bank_Date is only created, when it is used """
+
+    @property
+    def _current_date(self):
+        if self._cdate is None:
+            self._cdate = calendar_table.date(self._ordinal, self._time)
+        return self._cdate
+
+    @_current_date.setter
+    def _current_date(self, date):
+        self._ordinal = date.toordinal()
+        self._time = date - datetime(date.year, date.month, date.day)
+        self._cdate = date
+
+    def set_ordinal(self, ordinal):
+        """ sets the current date as day ordinal """
+        self._ordinal = ordinal
+        self._cdate = None
 
 # deprecated, old methods for maniuplating datetime
 
@@ -0,0 +1,37 @@
+'''
+Created on 17.10.2026
+
+Tests for the calendar table
+'''
+# standard libraries
+from datetime import date, datetime, timedelta
+import unittest
+
+# own libraries
+from financial_life.calendar_help import Calendar, Bank_Date, get_days_per_year
+
+
+class Test_Calendar(unittest.TestCase):
+
+    def test_table(self):
+        calendar = Calendar()
+        start = date(2015, 11, 3).toordinal()
+        # the table is extended backwards and beyond the lookahead
+        for ordinal in [start] + list(range(date(1999, 12, 1).toordinal(), start + 365 * 60)):
+            day = date.fromordinal(ordinal)
+            self.assertEqual((calendar.year(ordinal), calendar.month(ordinal), calendar.day(ordinal)),
+                             (day.year, day.month, day.day))
+            self.assertEqual(calendar.days_per_year(ordinal), get_days_per_year(day.year))
+            self.assertEqual(calendar.year_end(ordinal), date(day.year, 12, 31).toordinal())
+            self.assertEqual(calendar.is_end_of_month(ordinal), (day + timedelta(days = 1)).day == 1)
+
+    def test_date(self):
+        calendar = Calendar()
+        ordinal = date(2016, 2, 29).toordinal()
+        self.assertIsInstance(calendar.date(ordinal), Bank_Date)
+        self.assertIs(calendar.date(ordinal), calendar.date(ordinal))
+        self.assertEqual(calendar.date(ordinal, timedelta(hours = 10)), datetime(2016, 2, 29, 10))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,71 +4,72 @@ Created on 21.12.2016
 @author: martin
 '''
 # standard libraries
-from datetime import timedelta
+from datetime import timedelta, datetime
 
 # third-party libraries
 
 # own libraries
 from financial_life.financing import accounts as a
+from financial_life.financing import Recurrence
 from financial_life.tax import germany as tax_ger
 
 
 def controller_tax(s):
     """ This is a controller function that calculates annual tax rates
-    's' is the simulation object
+    's' is the simulation object. It is called on the 15th of February,
+    just to reflect the fact that tax payments for the previous year are
+    never made on the 1st of January, which has an impact on interests
+    as well (see the trigger in example_meta_controller)
     """
-    # perform tax calculation always on 15th of February, just to
-    # reflect the fact that tax payments for the previous year are
-    # never made on the 1st of January, which has an impact on 
-    # interests as well
-    if ((s.current_date.month == 2) and 
-       (s.current_date.day == 15)):
-        # account class for payments
-        account = s.accounts[0]
-        
-        # filter for all transactions that occured in the previous year
-        # and of type 'income'
-        income_report = s.report.subset(lambda st: (st.date.year == (s.current_date.year-1)) and 
-                                                   (st.meta.get('type','') == 'income'))
-        
-        # using list comprehensions, we can easily calculate a few sums
-        #m_income = sum(income.value)  
-        m_brutto = sum(payment.meta['tax']['brutto'] for payment in income_report)
-        m_paid = sum(payment.meta['tax']['paid'] for payment in income_report)
-        
-        # get all accounts which have the field tax.outcome == 'yearly_interests'
-        loans = [account for account in s.accounts 
-                 if account.meta.get('tax', {}).get('outcome','') == 'yearly_interests']
-        # get only the reports of last year
-        interests_reports = [loan.report.subset(lambda st: st.date.year == (s.current_date.year-1)) 
-                             for loan in loans]
-        # sum up all interests from all interests reports
-        m_interests = sum(sum(report.interest) for report in interests_reports)                
-        
-        # as interests for loans are negative, we effectively
-        # subtract the payed interests from the brutto we earned in the last year
-        m_tax_relevant_money = m_brutto + m_interests
-        # now, we apply german tax rules from 2016 to the tax-relevant money
-        m_tax, m_tax_percentage = tax_ger.tax_to_pay(2016, m_tax_relevant_money)
-        # this is the money we either receive from the state (positive value
-        # or we need to pay (negative value)
-        m_diff = m_paid - m_tax
-        
-        s.add_unique('State', account, m_diff, 
-                     date = s.current_date + timedelta(days=1),
-                     name = 'Tax',
-                     fixed = True,
-                     meta = {
-                             'taxpayment': {
-                                            'tax_relevant_money': m_tax_relevant_money,
-                                            'tax_to_pay': m_tax,
-                                            'tax_percentage': m_tax_percentage,
-                                            'paid': m_paid,
-                                            'difference': m_diff
-                                            }
-                             }
-                     )
-        
+    # account class for payments
+    account = s.accounts[0]
+    
+    # the previous year
+    start = datetime(s.current_date.year - 1, 1, 1)
+    end = datetime(s.current_date.year, 1, 1)
+
+    # filter for all transactions that occured in the previous year
+    # and of type 'income'. The report finds them by bisection of the
+    # dates and an index of the meta field 'type'
+    income_report = s.report.between(start, end, type = 'income')
+    
+    # using list comprehensions, we can easily calculate a few sums
+    #m_income = sum(income.value)  
+    m_brutto = sum(payment.meta['tax']['brutto'] for payment in income_report)
+    m_paid = sum(payment.meta['tax']['paid'] for payment in income_report)
+    
+    # get all accounts which have the field tax.outcome == 'yearly_interests'
+    loans = [account for account in s.accounts 
+             if account.meta.get('tax', {}).get('outcome','') == 'yearly_interests']
+    # get only the reports of last year
+    interests_reports = [loan.report.between(start, end) for loan in loans]
+    # sum up all interests from all interests reports
+    m_interests = sum(sum(report.interest) for report in interests_reports)                
+    
+    # as interests for loans are negative, we effectively
+    # subtract the payed interests from the brutto we earned in the last year
+    m_tax_relevant_money = m_brutto + m_interests
+    # now, we apply german tax rules from 2016 to the tax-relevant money
+    m_tax, m_tax_percentage = tax_ger.tax_to_pay(2016, m_tax_relevant_money)
+    # this is the money we either receive from the state (positive value
+    # or we need to pay (negative value)
+    m_diff = m_paid - m_tax
+    
+    s.add_unique('State', account, m_diff, 
+                 date = s.current_date + timedelta(days=1),
+                 name = 'Tax',
+                 fixed = True,
+                 meta = {
+                         'taxpayment': {
+                                        'tax_relevant_money': m_tax_relevant_money,
+                                        'tax_to_pay': m_tax,
+                                        'tax_percentage': m_tax_percentage,
+                                        'paid': m_paid,
+                                        'difference': m_diff
+                                        }
+                         }
+                 )
+    
     
 def example_meta_controller(print_it = True):
     """ This example shows, how meta-information for payments and account data could
@@ -86,6 +87,8 @@ def example_meta_controller(print_it = True):
     
     # add these accounts to the simulation
     simulation = a.Simulation(account, loan, date='01.09.2016')
+    # the tax controller looks up payments by their type
+    simulation.report.add_index('type')
 
     # our employee receives monthly 2000 netto, coming from 2500 brutto,
     # 310 are subtracted directly from the loan, which is less than she
@@ -105,7 +108,9 @@ def example_meta_controller(print_it = True):
     simulation.add_regular(account, loan, lambda: min(1500, -loan.account), 
                            interval = 'monthly', 
                            date_start="01.09.2016")
-    simulation.add_controller(controller_tax)
+    # the controller is only called on the 15th of February
+    simulation.add_controller(controller_tax,
+                              trigger = Recurrence('yearly', by_month = 2, by_day = 15))
 
     # simulate for ten years
     simulation.simulate(delta = timedelta(days=365*10))
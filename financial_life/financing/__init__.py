@@ -2,11 +2,17 @@
 reports """
 
 # standard libraries
-from datetime import datetime
+from datetime import datetime, timedelta
+from array import array
 from calendar import monthrange
 import warnings
-from copy import deepcopy
+from copy import copy, deepcopy
 from collections import defaultdict
+from itertools import islice, count, dropwhile
+from functools import lru_cache, partial
+import heapq
+import bisect
+import types
 from collections import Callable
 
 # third-party libraries
@@ -62,6 +68,88 @@ def conv_payment_func(x):
     return Payment_Value(x)
 
 
+def copy_function(func, memo):
+    """ deep copy of func, which also copies the variables of the closure
+    of functions. This way, a lambda referring to an account refers to the
+    copied account afterwards. Variables of the global namespace are not
+    copied. func can be any object, which is not a function, as well """
+    if not isinstance(func, types.FunctionType):
+        return deepcopy(func, memo)
+    if id(func) in memo:
+        return memo[id(func)]
+
+    cells = None
+    if func.__closure__:
+        cells = tuple(types.CellType() for _ in func.__closure__)
+    result = types.FunctionType(func.__code__, func.__globals__, func.__name__,
+                                None, cells)
+    # register the copy first, the closure might refer to it again
+    memo[id(func)] = result
+    memo.setdefault(id(memo), []).append(func)
+
+    result.__qualname__ = func.__qualname__
+    result.__defaults__ = deepcopy(func.__defaults__, memo)
+    result.__kwdefaults__ = deepcopy(func.__kwdefaults__, memo)
+    result.__dict__.update(deepcopy(func.__dict__, memo))
+    for cell, original in zip(cells or (), func.__closure__ or ()):
+        try:
+            value = original.cell_contents
+        except ValueError:
+            # empty cell
+            continue
+        cell.cell_contents = copy_function(value, memo)
+    return result
+
+
+def cell_values(func):
+    """ returns the values of the filled cells of the closure of func """
+    values = []
+    for cell in func.__closure__ or ():
+        try:
+            values.append(cell.cell_contents)
+        except ValueError:
+            # empty cell
+            pass
+    return values
+
+
+def referenced_objects(value, cls, found, seen = None):
+    """ appends all objects of type cls to found, which value refers to:
+    value itself, the closure, defaults and global variables of functions,
+    arguments of partials and the attributes of other callables, e.g.
+    Payment_Value or Registered_Callable, also within lists, tuples and
+    dictionaries. Objects of type cls are not searched any further """
+    if seen is None:
+        seen = set()
+    if id(value) in seen:
+        return found
+    seen.add(id(value))
+
+    if isinstance(value, cls):
+        found.append(value)
+        return found
+    if isinstance(value, (list, tuple, set, frozenset)):
+        children = value
+    elif isinstance(value, dict):
+        children = value.values()
+    elif isinstance(value, types.FunctionType):
+        global_values = [value.__globals__.get(name) for name in value.__code__.co_names]
+        children = (cell_values(value) + list(value.__defaults__ or ()) +
+                    list((value.__kwdefaults__ or {}).values()) +
+                    [v for v in global_values if isinstance(v, cls)])
+    elif isinstance(value, types.MethodType):
+        children = (value.__self__, value.__func__)
+    elif isinstance(value, partial):
+        children = (value.func,) + value.args + tuple(value.keywords.values())
+    elif callable(value) and not isinstance(value, type) and hasattr(value, '__dict__'):
+        children = vars(value).values()
+    else:
+        children = ()
+    for child in children:
+        referenced_objects(child, cls, found, seen)
+    return found
+
+
 def create_stop_criteria(date_stop):
     """ This is a function that returns a functions, which defines
     a stop criteria for the iterators. If date_stop is a date,
@@ -79,12 +167,82 @@ def create_stop_criteria(date_stop):
         raise ValueError("date_stop is %s but should be either date-type or Callable" % type(date_stop))
 
 
-def iter_regular_month(regular, date_start = None):
+# number of occurrences of a regular payment that are compiled at once
+C_schedule_block = 120
+C_ordinal_max = Bank_Date.max.toordinal()
+
+
+@lru_cache(maxsize = 4096)
+def compile_schedule(month, day, block, step = 1):
+    """ returns the day ordinals of the block-th C_schedule_block occurrences
+    of a payment on day, which is repeated every step months. The months
+    are counted from January of year 0 and for a yearly payment (step = 12),
+    month is the month of the payment. day is reduced to the last day of
+    shorter months. The read-only array is cached, so that simulations
+    with the same payments compile their schedules only once
+    """
+    months = np.arange(block * C_schedule_block, (block + 1) * C_schedule_block) * step + month
+    months = (months - 1970 * 12).astype('datetime64[M]')
+    first = months.astype('datetime64[D]').astype(np.int64)
+    days = (months + 1).astype('datetime64[D]').astype(np.int64) - first
+    ordinals = first + np.minimum(day, days) + C_ordinal_1970 - 1
+    ordinals = ordinals[(ordinals > 0) & (ordinals <= C_ordinal_max)]
+    ordinals.flags.writeable = False
+    return ordinals
+
+
+def schedule_ordinals(month, day, index, step = 1):
+    """ iterates over the day ordinals of a schedule (see compile_schedule),
+    starting with its index-th occurrence """
+    block, offset = divmod(index, C_schedule_block)
+    while True:
+        ordinals = compile_schedule(month, day, block, step)
+        if not len(ordinals):
+            return
+        yield from ordinals[offset:].tolist()
+        block += 1
+        offset = 0
+
+
+def iter_payments(regular, ordinals):
+    """ creates an iterator over the payments of regular on the days given
+    by the iterable ordinals, until regular['date_stop'] """
+    date_stop = regular.get('date_stop', Bank_Date.max)
+    if isinstance(date_stop, datetime):
+        # payments at midnight are before date_stop, if it has a time
+        limit = date_stop.toordinal() + (date_stop != datetime(date_stop.year, date_stop.month, date_stop.day))
+        stop_criteria = None
+    else:
+        limit = C_ordinal_max + 1
+        stop_criteria = create_stop_criteria(date_stop)
+
+    # all payments share the description of the first one
+    payment = Payment(from_acc = regular['from_acc'],
+                      to_acc = regular['to_acc'],
+                      date = None,
+                      name = regular['name'],
+                      kind = 'regular',
+                      payment = regular['payment'],
+                      fixed = regular['fixed'],
+                      meta = regular['meta']
+                      )
+    for ordinal in ordinals:
+        if ordinal >= limit:
+            return
+        current_date = Bank_Date.fromordinal(ordinal)
+        if stop_criteria and not stop_criteria(current_date):
+            return
+        yield payment.at(current_date)
+
+
+def iter_regular_month(regular, date_start = None, skip = 0):
     """ creates an iterator for a regular payment. this function is for example
     used by payment to create iterators for every item in _regular
         regular: item of the structure Payments._regular
         date_start: date the payment generator wants to start the payments,
                     this can be a date after regular['date_start']
+        skip: number of payments to skip, e.g. for continuing an iterator
+              that has been copied
     """
     if not date_start:
         date_start = regular['date_start']
@@ -100,38 +258,22 @@ def iter_regular_month(regular, date_start = None):
     else:
         i = 1
 
-    date_start = Bank_Date(year = date_start.year,
-                           month = date_start.month,
-                           day = min(regular['day'], monthrange(date_start.year, date_start.month)[1]),
-                           hour = date_start.hour,
-                           minute = date_start.minute,
-                           second = date_start.second)
-
-    date_stop = regular.get('date_stop', Bank_Date.max)
-    stop_criteria = create_stop_criteria(date_stop)
-
-    current_date = date_start.add_month(i)
+    # the day is reduced to the length of the first month, e.g. the 31st
+    # becomes the 30th in all months after a start in April
+    day = min(regular['day'], monthrange(date_start.year, date_start.month)[1])
+    month = date_start.year * 12 + date_start.month - 1
+    return iter_payments(regular, schedule_ordinals(0, day, month + i + skip))
 
-    while stop_criteria(current_date):
-        yield Payment(from_acc = regular['from_acc'],
-                      to_acc = regular['to_acc'],
-                      date = current_date,
-                      name = regular['name'],
-                      kind = 'regular',
-                      payment = regular['payment'],
-                      fixed = regular['fixed'],
-                      meta = regular['meta']
-                      )
-        i += 1
-        current_date = date_start.add_month(i)
-
-def iter_regular_year(regular, date_start = None):
+def iter_regular_year(regular, date_start = None, skip = 0):
     """ creates an iterator for a yearly payment. this function is
     used by payment to create iterators for every item in _regular
-    It takes the day and month in regular['date_start'] to schedule the payment
+    It takes the day and month in regular['date_start'] to schedule the payment.
+    A payment on the 29th of February is made on the 28th in other years
         regular: item of the structure Payments._regular
         date_start: date the payment generator wants to start the payments,
                     this can be a date after regular['date_start']
+        skip: number of payments to skip, e.g. for continuing an iterator
+              that has been copied
     """
 
     if not date_start:
@@ -140,45 +282,229 @@ def iter_regular_year(regular, date_start = None):
         # determine the greater date
         date_start = max(date_start, regular['date_start'])
 
-    current_date = datetime(year=date_start.year,
-                            month=regular['date_start'].month,
-                            day=regular['date_start'].day)
+    month = regular['date_start'].month
+    day = regular['date_start'].day
+    year = date_start.year
+    current_date = datetime(year = year,
+                            month = month,
+                            day = min(day, monthrange(year, month)[1]))
 
     if current_date < date_start:
-        current_date = datetime(year=date_start.year + 1,
-                                month=regular['date_start'].month,
-                                day=regular['date_start'].day)
-
-    date_stop = regular.get('date_stop', Bank_Date.max)
-    stop_criteria = create_stop_criteria(date_stop)
+        year += 1
+
+    return iter_payments(regular, schedule_ordinals(month - 1, day, year + skip, step = 12))
+
+
+C_recurrence_intervals = ('daily', 'weekly', 'monthly', 'yearly')
+
+
+def as_tuple(values):
+    """ converts a single value or a sequence of values into a sorted tuple
+    without duplicates. None is kept """
+    if values is None:
+        return None
+    if isinstance(values, int):
+        values = (values,)
+    return tuple(sorted(set(values)))
+
+
+class Recurrence(object):
+    """ Rule for the dates of a regular payment, similar to the recurrence
+    rules of calendars. A rule can be given as interval to add_regular
+        interval: 'daily', 'weekly', 'monthly' or 'yearly'
+        step: number of intervals between two occurrences, e.g. 2 for
+              every other week
+        by_month: month or months, in which occurrences take place
+        by_day: weekdays (0 = monday) of a weekly rule or days of the month
+                of a monthly or yearly rule. By default, the weekday of
+                date_start of the payment for weekly rules, the day of the
+                payment for monthly rules and the day of date_start for
+                yearly rules
+        end_of_month: occurrences are on the last day of the month
+        count: maximal number of occurrences from date_start of the payment on
+        until: last possible date of an occurrence
+    Days after the end of shorter months are reduced to their last day.
+    The occurrences are generated lazily, those of monthly and yearly rules
+    from cached blocks of day ordinals (see compile_schedule)
+
+        # every other friday
+        Recurrence('weekly', step = 2, by_day = 4)
+        # at the end of every quarter
+        Recurrence('monthly', by_month = (3, 6, 9, 12), end_of_month = True)
+    """
 
-    while stop_criteria(current_date):
-        yield Payment(from_acc = regular['from_acc'],
-                      to_acc = regular['to_acc'],
-                      date = current_date,
-                      name = regular['name'],
-                      kind = 'regular',
-                      payment = regular['payment'],
-                      fixed = regular['fixed'],
-                      meta = regular['meta']
-                      )
+    def __init__(self, interval, step = 1, by_month = None, by_day = None,
+                 end_of_month = False, count = None, until = None):
+        if interval not in C_recurrence_intervals:
+            raise ValueError("interval must be one of '" + '\',\''.join(C_recurrence_intervals) + "'")
+        if step < 1:
+            raise ValueError("step must be at least 1 but is %s" % step)
+        by_month = as_tuple(by_month)
+        if by_month and not all(1 <= month <= 12 for month in by_month):
+            raise ValueError("by_month must contain months between 1 and 12")
+        by_day = as_tuple(by_day)
+        if by_day and (interval == 'weekly') and not all(0 <= day <= 6 for day in by_day):
+            raise ValueError("by_day of a weekly rule must contain weekdays between 0 and 6")
+        if by_day and (interval != 'weekly') and not all(1 <= day <= 31 for day in by_day):
+            raise ValueError("by_day must contain days between 1 and 31")
+
+        self._interval = interval
+        self._step = int(step)
+        self._by_month = by_month
+        self._by_day = by_day
+        self._end_of_month = end_of_month
+        self._count = count
+        self._until = None if until is None else validate.valid_date(until)
 
-        current_date = datetime(year = current_date.year + 1,
-                                month=regular['date_start'].month,
-                                day=regular['date_start'].day)
+    @property
+    def interval(self):
+        return self._interval
+
+    def days(self, date_start, day = 1):
+        """ returns the weekdays or days of the month of the occurrences """
+        if self._end_of_month:
+            return (31,)
+        if self._by_day:
+            return self._by_day
+        if self._interval == 'weekly':
+            return (date_start.weekday(),)
+        if self._interval == 'monthly':
+            return (day,)
+        return (date_start.day,)
+
+    def iter_ordinals(self, date_start, day = 1):
+        """ iterates lazily over the day ordinals of all occurrences from
+        date_start on. day is the day of the month of monthly rules
+        without by_day """
+        first = date_start.toordinal()
+        days = self.days(date_start, day)
+        if self._interval == 'daily':
+            streams = [count(first, self._step)]
+        elif self._interval == 'weekly':
+            monday = first - date_start.weekday()
+            streams = [count(monday + weekday, 7 * self._step) for weekday in days]
+        else:
+            month = date_start.year * 12 + date_start.month - 1
+            if self._interval == 'monthly':
+                step = self._step
+                months = [month]
+            else:
+                step = 12 * self._step
+                months = [date_start.year * 12 + m - 1 for m in (self._by_month or (date_start.month,))]
+            streams = [schedule_ordinals(month % step, day, month // step, step)
+                       for month in months for day in days]
+        ordinals = heapq.merge(*streams) if len(streams) > 1 else streams[0]
+
+        until = self._until.toordinal() if self._until else C_ordinal_max
+        last = None
+        occurrences = 0
+        for ordinal in ordinals:
+            if ordinal > until:
+                return
+            # different days may be reduced to the same end of a month
+            if (ordinal < first) or (ordinal == last):
+                continue
+            if self._by_month and (Bank_Date.fromordinal(ordinal).month not in self._by_month):
+                continue
+            yield ordinal
+            last = ordinal
+            occurrences += 1
+            if occurrences == self._count:
+                return
+
+    def ordinals(self, date_start, size, day = 1):
+        """ returns the day ordinals of the first size occurrences from
+        date_start on as numpy array """
+        return np.fromiter(islice(self.iter_ordinals(date_start, day), size), dtype = np.int64)
+
+    def __call__(self, regular, date_start = None, skip = 0):
+        """ creates an iterator for a regular payment following this rule.
+        The arguments are the same as for iter_regular_month """
+        ordinals = self.iter_ordinals(regular['date_start'], regular['day'])
+        if date_start:
+            start = date_start.toordinal()
+            ordinals = dropwhile(lambda ordinal: ordinal < start, ordinals)
+        return iter_payments(regular, islice(ordinals, skip, None))
+
+    def __repr__(self):
+        arguments = [repr(self._interval)]
+        for name, default in (('step', 1), ('by_month', None), ('by_day', None),
+                              ('end_of_month', False), ('count', None)):
+            value = getattr(self, '_' + name)
+            if value != default:
+                arguments.append('%s = %r' % (name, value))
+        if self._until:
+            arguments.append('until = %r' % self._until.strftime('%Y-%m-%d'))
+        return 'Recurrence(%s)' % ', '.join(arguments)
+
+
+def interval_function(interval):
+    """ returns the function, which creates the payment iterators for an
+    interval of add_regular """
+    if isinstance(interval, Recurrence):
+        return interval
+    return C_interval[interval]
 
 
 # functions for generating regular payments
 C_interval = {
+              'weekly': Recurrence('weekly'),
               'monthly': iter_regular_month,
+              'quarter': Recurrence('monthly', step = 3),
+              'quarter_year': Recurrence('monthly', by_month = (3, 6, 9, 12)),
               'yearly': iter_regular_year,
               }
 
 
 
+class Status_Schema(object):
+    """ Keys of a status and their positions in its values. Statuses with
+    the same keys share one schema (see status_schema) """
+    __slots__ = ('keys', 'positions')
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.positions = {key: position for position, key in enumerate(keys)}
+
+    def __reduce__(self):
+        # copies and unpickled statuses share the schemas again
+        return (status_schema, (self.keys,))
+
+
+# schemas of all key sets of statuses created so far
+status_schemas = {}
+
+
+def status_schema(keys):
+    """ returns the shared schema of the tuple keys """
+    schema = status_schemas.get(keys)
+    if schema is None:
+        schema = status_schemas.setdefault(keys, Status_Schema(keys))
+    return schema
+
+
+class Status_Values(dict):
+    """ Read-only dictionary of the values of a status. The values are
+    kept in the status itself, therefore, changes of this dictionary
+    raise an error instead of being lost """
+
+    def read_only(self, *args, **kwargs):
+        raise TypeError('the values of a status cannot be changed')
+
+    __setitem__ = __delitem__ = __ior__ = read_only
+    clear = pop = popitem = setdefault = update = read_only
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+
 class Status(object):
     """ This class represents the status of a financing product
-    at a particular date """
+    at a particular date. The values are kept in a tuple, whose keys
+    are stored in a schema shared by all statuses with the same keys """
+    __slots__ = ('_date', '_meta', '_schema', '_values')
+
+    _format = "%d.%m.%Y"
 
     def __init__(self, date, **kwargs):
         """ Creates a new status object. Note, that all of kwargs
@@ -188,23 +514,34 @@ class Status(object):
             raise TypeError("date must be from type datetime")
 
         self._date = date
-        self._meta = {}
-
-        if 'meta' in kwargs:
-            self._meta = kwargs.pop('meta')
-
-        self._status = kwargs
-        self._format = "%d.%m.%Y"
+        self._meta = kwargs.pop('meta') if 'meta' in kwargs else {}
+        self._schema = status_schema(tuple(kwargs))
+        self._values = tuple(kwargs.values())
+
+    @classmethod
+    def from_values(cls, date, schema, values, meta = None):
+        """ creates a status from a schema and a tuple of values without
+        checking them """
+        status = cls.__new__(cls)
+        status._date = date
+        status._meta = {} if meta is None else meta
+        status._schema = schema
+        status._values = values
+        return status
 
     def __str__(self):
         result = "Date: %s" % self._date.strftime(self._format) + '\n'
-        for key, value in self._status.items():
+        for key, value in zip(self._schema.keys, self._values):
             result += ("%s: %s\n" % (key, str(value)))
         return result
 
     def keys(self):
         """ Returns a list of keys """
-        return self._status.keys()
+        return self._schema.positions.keys()
+
+    def items(self):
+        """ Returns pairs of keys and values """
+        return zip(self._schema.keys, self._values)
 
     @property
     def date(self):
@@ -216,7 +553,11 @@ class Status(object):
 
     @property
     def status(self):
-        return self._status
+        """ read-only dictionary of the values """
+        return Status_Values(zip(self._schema.keys, self._values))
+
+    # the dictionary of values, kept for code using the former attribute
+    _status = status
 
     @property
     def meta(self):
@@ -225,16 +566,570 @@ class Status(object):
     def __getitem__(self, key):
         if key == 'date':
             return self._date
-        return self._status[key]
+        return self._values[self._schema.positions[key]]
 
     def __getattr__(self, name):
+        # private attributes are not part of the status. This is also
+        # needed for pickle, which looks up __setstate__ before _status exists
+        if name.startswith('_'):
+            raise AttributeError(name)
         return self.__getitem__(name)
     
     def get(self, attr, default):
         """ Get attribute or default value from data-dictionary """
         if attr == 'date':
             return self._date
-        return self._status.get(attr, default)
+        position = self._schema.positions.get(attr)
+        if position is None:
+            return default
+        return self._values[position]
+
+class Status_History(object):
+    """ List of statuses, which continues the first statuses of another
+    list without copying them. This is used by forked reports, which share
+    the history written before the fork. As reports only append statuses,
+    the shared part never changes """
+
+    def __init__(self, parent, own = None):
+        """ parent: list of statuses to continue
+        own: empty storage for the statuses appended to this history """
+        self._parent = parent
+        self._size = len(parent)     # number of shared statuses
+        self._own = [] if own is None else own
+
+    def append(self, status):
+        self._own.append(status)
+
+    def pop(self):
+        """ removes and returns the last status. Shared statuses are
+        only hidden from this history """
+        if self._own:
+            return self._own.pop()
+        if not self._size:
+            raise IndexError('pop from empty history')
+        self._size -= 1
+        return self._parent[self._size]
+
+    def __len__(self):
+        return self._size + len(self._own)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('status index out of range')
+        if index < self._size:
+            return self._parent[index]
+        return self._own[index - self._size]
+
+    def __iter__(self):
+        yield from islice(self._parent, self._size)
+        yield from self._own
+
+    def date(self, index):
+        if index < self._size:
+            return status_date(self._parent, index)
+        return status_date(self._own, index - self._size)
+
+
+# ordinal of 01.01.1970, the origin of numpy dates
+C_ordinal_1970 = datetime(1970, 1, 1).toordinal()
+# numpy units of the frames of monthly and yearly reports
+C_frame_units = {'monthly': 'M',
+                 'yearly': 'Y',
+                 }
+
+
+class Column(object):
+    """ Growable array with the values of one key of a report. The kind of
+    the column is determined by its first value:
+        int:      integers as int64
+        cents:    floats with at most two decimals as int64 cents
+        float:    other floats as float64
+        category: strings as int32 codes of a list of categories
+        object:   anything else in a list
+    If a value does not fit into the column, the column is converted into
+    a more general kind """
+
+    def __init__(self, value, size = 0):
+        """ creates a column for value with size empty entries """
+        self._categories = None
+        if type(value) is int:
+            self._kind = 'int'
+            self._values = array('q', bytes(8 * size))
+        elif type(value) is float and self.cents(value) is not None:
+            self._kind = 'cents'
+            self._values = array('q', bytes(8 * size))
+        elif type(value) is float:
+            self._kind = 'float'
+            self._values = array('d', bytes(8 * size))
+        elif type(value) is str:
+            self._kind = 'category'
+            self._values = array('i', bytes(4 * size))
+            self._categories = []
+            self._category_codes = {}
+        else:
+            self._kind = 'object'
+            self._values = [None] * size
+
+    @staticmethod
+    def cents(value):
+        """ returns value in cents, if this is exact, otherwise None """
+        if abs(value) >= 2**50:
+            return None
+        cents = round(value * 100)
+        if cents / 100 == value:
+            return cents
+        return None
+
+    @property
+    def kind(self):
+        return self._kind
+
+    def append(self, value):
+        kind = self._kind
+        if kind == 'cents':
+            if type(value) is float:
+                cents = self.cents(value)
+                if cents is not None:
+                    self._values.append(cents)
+                    return
+                self.convert('float')
+                self._values.append(value)
+                return
+        elif kind == 'int':
+            if type(value) is int and -2**63 <= value < 2**63:
+                self._values.append(value)
+                return
+        elif kind == 'category':
+            if type(value) is str:
+                code = self._category_codes.get(value)
+                if code is None:
+                    code = len(self._categories)
+                    self._categories.append(value)
+                    self._category_codes[value] = code
+                self._values.append(code)
+                return
+        elif kind == 'float':
+            if type(value) is float:
+                self._values.append(value)
+                return
+        else:
+            self._values.append(value)
+            return
+        self.convert('object')
+        self._values.append(value)
+
+    def pop(self):
+        """ removes the last entry """
+        self._values.pop()
+
+    def append_empty(self):
+        """ appends a placeholder for a status without this key """
+        self._values.append(None if self._kind == 'object' else 0)
+
+    def convert(self, kind):
+        """ converts the column into a column of kind 'float' or 'object' """
+        values = self.values()
+        self._values = array('d', values) if kind == 'float' else values
+        self._kind = kind
+        self._categories = None
+
+    def __getitem__(self, index):
+        kind = self._kind
+        if kind == 'cents':
+            return self._values[index] / 100
+        if kind == 'category':
+            return self._categories[self._values[index]]
+        return self._values[index]
+
+    def array(self):
+        """ returns the values of a numerical column as numpy array """
+        if self._kind == 'cents':
+            return np.array(self._values, dtype = np.int64) / 100
+        if self._kind == 'int':
+            return np.array(self._values, dtype = np.int64)
+        if self._kind == 'float':
+            return np.array(self._values, dtype = np.float64)
+        raise TypeError("Column of kind %s is not numerical" % self._kind)
+
+    def values(self):
+        """ returns a list with all values of the column """
+        if self._kind == 'cents':
+            return (np.array(self._values, dtype = np.int64) / 100).tolist()
+        if self._kind == 'category':
+            categories = self._categories
+            return [categories[code] for code in self._values]
+        return list(self._values)
+
+
+class Status_Columns(object):
+    """ Columnar storage of the statuses of a report. Instead of a Status
+    object for every entry, the values of each key are stored in one Column,
+    dates are stored as day ordinals and the key sets of the statuses are
+    stored once as layouts. Statuses are created on access, therefore,
+    changing them does not change the storage. """
+
+    def __init__(self):
+        self._ordinals = array('i')     # dates as ordinals
+        self._times = None              # microseconds of the day, if needed
+        self._layouts = []              # tuples of keys used by statuses
+        self._layout_codes = {}
+        self._rows = array('i')         # code of the layout of every status
+        self._metas = []                # meta-dictionary of every status
+        self._columns = {}
+
+    def append(self, status):
+        schema = status._schema
+        values = status._values
+        code = self._layout_codes.get(schema.keys)
+        if code is None:
+            code = self.add_layout(schema.keys, status)
+
+        date = status._date
+        time = ((date.hour * 60 + date.minute) * 60 + date.second) * 1000000 + date.microsecond
+        if time and self._times is None:
+            self._times = array('q', bytes(8 * len(self._rows)))
+        if self._times is not None:
+            self._times.append(time)
+        self._ordinals.append(date.toordinal())
+        self._rows.append(code)
+        self._metas.append(status._meta)
+
+        positions = schema.positions
+        for key, column in self._columns.items():
+            position = positions.get(key)
+            if position is None:
+                column.append_empty()
+            else:
+                column.append(values[position])
+
+    def pop(self):
+        """ removes and returns the last status """
+        status = self[-1]
+        self._ordinals.pop()
+        if self._times is not None:
+            self._times.pop()
+        self._rows.pop()
+        self._metas.pop()
+        for column in self._columns.values():
+            column.pop()
+        return status
+
+    def add_layout(self, layout, status):
+        """ registers a new layout of status and creates columns for new keys """
+        code = len(self._layouts)
+        self._layouts.append(layout)
+        self._layout_codes[layout] = code
+        for key in layout:
+            if key not in self._columns:
+                self._columns[key] = Column(status[key], len(self._rows))
+        return code
+
+    def date(self, index):
+        result = Bank_Date.fromordinal(self._ordinals[index])
+        if self._times is not None and self._times[index]:
+            result += timedelta(microseconds = self._times[index])
+        return result
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('status index out of range')
+        columns = self._columns
+        layout = self._layouts[self._rows[index]]
+        return Status.from_values(self.date(index), status_schema(layout),
+                                  tuple(columns[key][index] for key in layout),
+                                  self._metas[index])
+
+    def __iter__(self):
+        for index in range(len(self._rows)):
+            yield self[index]
+
+    def present(self, key):
+        """ returns a boolean array, which is True for all statuses
+        containing key """
+        layouts = np.array([key in layout for layout in self._layouts], dtype = bool)
+        return layouts[np.array(self._rows, dtype = np.int32)]
+
+    def frames(self, interval):
+        """ returns an array with the month or year of every status """
+        days = np.array(self._ordinals, dtype = np.int64) - C_ordinal_1970
+        return days.astype('datetime64[D]').astype('datetime64[%s]' % C_frame_units[interval])
+
+    def rollup(self, interval, semantics, size = None):
+        """ Aggregates consecutive statuses of the same month or year like
+        Report.create_report: keys with a cumulative semantic are summed in
+        the order of the statuses, keys with the semantic 'none' are left out
+        and all other keys take the last value. semantics is the index of the
+        semantics of the report. Only the first size statuses are aggregated,
+        if size is given. Returns a list of (date, data) for every frame or
+        None, if a cumulative key is not numeric """
+        size = len(self) if size is None else min(size, len(self))
+        if size == 0:
+            return []
+        frames = self.frames(interval)[:size]
+        starts = np.flatnonzero(np.concatenate(([True], frames[1:] != frames[:-1])))
+        ends = np.append(starts[1:], size)
+        lengths = ends - starts
+        positions = np.arange(size)
+        rows = np.array(self._rows, dtype = np.int64)[:size]
+
+        # first and last status of every frame containing the key
+        keys = [key for key in self._columns if semantics.get(key, '') != 'none']
+        present = {}
+        first = {}
+        last = {}
+        order = {}
+        for key in keys:
+            present[key] = self.present(key)[:size]
+            first[key] = np.minimum.reduceat(np.where(present[key], positions, size), starts)
+            last[key] = np.maximum.reduceat(np.where(present[key], positions, -1), starts)
+            # position of the key within the layout of its first status
+            places = np.array([layout.index(key) if key in layout else 0
+                               for layout in self._layouts], dtype = np.int64)
+            order[key] = places[rows[np.minimum(first[key], size - 1)]]
+
+        # sums of cumulative keys, added one after the other within every
+        # frame to get exactly the same floats as a sequential sum
+        cum_keys = [key for key in keys if 'cum' in semantics.get(key, '')]
+        sums = {}
+        float_keys = []
+        for key in cum_keys:
+            column = self._columns[key]
+            if column.kind not in ('int', 'cents', 'float'):
+                return None
+            values = np.where(present[key], column.array()[:size], 0)
+            if column.kind == 'int':
+                sums[key] = np.add.reduceat(values, starts).tolist()
+            else:
+                float_keys.append((key, values))
+        if float_keys:
+            values = np.vstack([values for _, values in float_keys])
+            totals = np.zeros((len(float_keys), len(starts)))
+            for j in range(lengths.max()):
+                active = np.flatnonzero(lengths > j)
+                totals[:, active] += values[:, starts[active] + j]
+            for (key, _), total in zip(float_keys, totals):
+                sums[key] = total.tolist()
+
+        result = []
+        for frame in range(len(starts)):
+            found = sorted((int(first[key][frame]), int(order[key][frame]), key)
+                           for key in keys if first[key][frame] < size)
+            data = {}
+            for _, _, key in found:
+                if key in sums:
+                    data[key] = sums[key][frame]
+                else:
+                    data[key] = self._columns[key][int(last[key][frame])]
+            result.append((self.date(int(ends[frame]) - 1), data))
+        return result
+
+    def get(self, key, default):
+        """ returns a list with the values of key or default for all
+        statuses without the key """
+        if key == 'date':
+            return [self.date(i) for i in range(len(self))]
+        if key not in self._columns:
+            return [default] * len(self)
+        values = self._columns[key].values()
+        return [value if present else default
+                for value, present in zip(values, self.present(key))]
+
+
+# cents marking missing values in memory-mapped columns
+C_no_cents = np.iinfo(np.int64).min
+
+
+class Memmap_Column(object):
+    """ Column of int64 cents in a file, which is memory-mapped on first
+    access """
+
+    kind = 'cents'
+
+    def __init__(self, path, size):
+        self._path = path
+        self._size = size
+        self._cents = None
+
+    @property
+    def cents(self):
+        """ the memory-mapped cents without copying them """
+        if self._cents is None:
+            if self._size:
+                self._cents = np.memmap(self._path, dtype = np.int64, mode = 'r',
+                                        shape = (self._size,))
+            else:
+                self._cents = np.zeros(0, dtype = np.int64)
+        return self._cents
+
+    def present(self):
+        return self.cents != C_no_cents
+
+    def __getitem__(self, index):
+        return int(self.cents[index]) / 100
+
+    def array(self):
+        return self.cents / 100
+
+    def values(self):
+        return self.array().tolist()
+
+
+class Memmap_Columns(Status_Columns):
+    """ Read-only storage of statuses in memory-mapped files: a file of
+    int32 day ordinals and a file of int64 cents for every key (see
+    financing.store). Monthly and yearly reports are aggregated column-wise
+    like Status_Columns """
+
+    def __init__(self, ordinals, columns):
+        """ ordinals: array of the day ordinals of the statuses
+        columns: dictionary of Memmap_Column for every key """
+        self._ordinals = ordinals
+        self._times = None
+        self._layouts = [tuple(columns)]
+        self._layout_codes = {}
+        self._rows = np.zeros(len(ordinals), dtype = np.int32)
+        self._metas = None
+        self._columns = columns
+
+    def append(self, status):
+        raise ValueError("memory-mapped reports are read-only")
+
+    def pop(self):
+        raise ValueError("memory-mapped reports are read-only")
+
+    def date(self, index):
+        return Bank_Date.fromordinal(int(self._ordinals[index]))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('status index out of range')
+        values = {}
+        for key, column in self._columns.items():
+            cents = int(column.cents[index])
+            if cents != C_no_cents:
+                values[key] = cents / 100
+        return Status(self.date(index), **values)
+
+    def present(self, key):
+        return self._columns[key].present()
+
+    def cents(self, key):
+        """ returns the memory-mapped cents of key without copying them """
+        return self._columns[key].cents
+
+    def get(self, key, default):
+        """ returns an array with the values of key. Missing values are
+        replaced by default """
+        if key == 'date':
+            return [self.date(i) for i in range(len(self))]
+        if key not in self._columns:
+            return [default] * len(self)
+        column = self._columns[key]
+        present = column.present()
+        if present.all():
+            return column.array()
+        return [value if found else default
+                for value, found in zip(column.values(), present)]
+
+    def as_df(self):
+        """ returns a pandas.DataFrame with a column for every key and the
+        dates as index. Missing values are NaN """
+        dates = (np.asarray(self._ordinals, dtype = np.int64) - C_ordinal_1970).astype('datetime64[D]')
+        data = {key: np.where(column.present(), column.array(), np.nan)
+                for key, column in self._columns.items()}
+        return pd.DataFrame(data, index = pd.DatetimeIndex(dates))
+
+
+# marker for fields missing in meta-data
+C_missing = object()
+
+
+def status_date(statuses, index):
+    """ returns the date of a status in a storage of statuses without
+    creating the status, if possible """
+    if isinstance(statuses, list):
+        return statuses[index].date
+    return statuses.date(index)
+
+
+class Date_View(object):
+    """ Sequence of the dates of a storage of statuses, e.g. for bisect """
+
+    def __init__(self, statuses):
+        self._statuses = statuses
+
+    def __len__(self):
+        return len(self._statuses)
+
+    def __getitem__(self, index):
+        return status_date(self._statuses, index)
+
+
+def hashable(value):
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+def add_to_index(index, field, position, status):
+    """ adds the position of a status to the index of a meta field """
+    value = status.meta.get(field, C_missing)
+    if (value is not C_missing) and hashable(value):
+        index.setdefault(value, []).append(position)
+
+
+def remove_from_index(index, field, position, status):
+    """ removes the position of the last status from the index of a
+    meta field """
+    value = status.meta.get(field, C_missing)
+    if (value is not C_missing) and hashable(value):
+        positions = index[value]
+        if positions and positions[-1] == position:
+            positions.pop()
+        if not positions:
+            del index[value]
+
+
+def add_data(data, status, semantics):
+    """ adds the data of a status to the data of an aggregated status.
+    semantics is the index of the semantics of the report """
+    for key, value in status.items():
+        semantic = semantics.get(key, '')
+        # for cumulative data, we need to add, for other we just
+        # need to take the latest value
+        if "cum" in semantic:
+            data[key] += value
+        elif semantic != "none":
+            data[key] = value
+    return data
+
+
+# storages for the statuses of a report
+# levels of detail of reports: every transaction, statuses aggregated per
+# day, month or year or no statuses at all
+C_report_levels = ('transactions', 'daily', 'monthly', 'yearly', 'none')
+
+C_storages = {'list': list,
+              'columnar': Status_Columns,
+              }
+
 
 class Report(object):
     """ A report is a collection of statuses with some additional
@@ -243,17 +1138,47 @@ class Report(object):
     statuses
     """
 
+    # storage of statuses for new reports: 'list' keeps a list of Status
+    # objects, 'columnar' stores them in Status_Columns
+    default_storage = 'list'
+
     def __init__(self, name=None,
                  format_date = "%d.%m.%Y",
-                 precision = 'daily'
+                 precision = 'daily',
+                 storage = None,
+                 level = 'transactions'
                  ):
-        self._statuses = []
-        self._keys = []    # list of all keys used so far
+        if storage is None:
+            storage = Report.default_storage
+        if storage not in C_storages:
+            raise ValueError("storage must be one of '" + '\',\''.join(C_storages) + "'")
+        if level not in C_report_levels:
+            raise ValueError("level must be one of '" + '\',\''.join(C_report_levels) + "'")
+        self._storage = storage
+        self._statuses = C_storages[storage]()
+        self._keys = []         # list of all keys in order of their appearance
+        self._key_set = set()
+        self._layouts = set()   # key sets of the statuses appended so far
 
         self._format_date = format_date
         # precision for merging statuses with similar date
         self._precision = precision
         self._semantics = deepcopy(report_semantics)
+        # index of the semantic of every key and the semantics it is built from
+        self._semantic_index = None
+        self._indexed_semantics = None
+        # incrementally maintained monthly and yearly reports
+        self._rollups = {}
+        # whether the statuses are sorted by date and the last date
+        self._sorted = True
+        self._last_date = None
+        # indexes of meta fields: value -> positions of statuses
+        self._meta_indexes = {}
+        # level of detail. For daily, monthly and yearly reports, only the
+        # aggregated data of the current frame is kept besides the statuses
+        self._level = level
+        self._frame = None
+        self._data = None
 
         if not name:
             name = id_generator(8)
@@ -273,6 +1198,8 @@ class Report(object):
             Entire assignments
                 .add_semantics({'cost_cum':['interest', 'insurence']})
         """
+        self._semantic_index = None
+
         if isinstance(key, dict):
             for k, items in key.items():
                 if k in self._semantics:
@@ -284,26 +1211,45 @@ class Report(object):
         if semantics not in self._semantics:
             raise AttributeError('Semantic "%s" not in semantics' % semantics)
 
+        # aggregated reports are created again with the new semantics
+        self._rollups = {}
+
         if isinstance(key, list):
             self._semantics[semantics] = self._semantics[semantics] + key
-            self._keys = list(set(self._keys) | set(key))
+            self.register_keys(key)
             return
 
         if isinstance(key, str):
             self._semantics[semantics].append(key)
-            self._keys = list(set(self._keys) | set((key,)))
+            self.register_keys((key,))
             return
 
+    def register_keys(self, keys):
+        """ adds all keys to the list of keys, which are not in there yet """
+        for key in keys:
+            if key not in self._key_set:
+                self._key_set.add(key)
+                self._keys.append(key)
+
     def semantics(self, semantic):
         """ returns list of elements in semantic """
         return self._semantics[semantic]
 
+    def semantic_index(self):
+        """ returns a dictionary with the semantic of every key. If a key
+        appears in several semantics, the first one is taken """
+        if (self._semantic_index is None) or (self._indexed_semantics is not self._semantics):
+            index = {}
+            for semantic, values in self._semantics.items():
+                for key in values:
+                    index.setdefault(key, semantic)
+            self._semantic_index = index
+            self._indexed_semantics = self._semantics
+        return self._semantic_index
+
     def semantics_of(self, key):
         """ returns the semantic in which the key appears """
-        for semantic, values in self._semantics.items():
-            if key in values:
-                return semantic
-        return ''
+        return self.semantic_index().get(key, '')
 
     def append(self, status = None, date = None, **kwargs):
         """ adds either an instance of status to the list or
@@ -311,14 +1257,84 @@ class Report(object):
         assert((status and not date) or (date and not status))
 
         if date:
-            status = Status( Bank_Date.fromtimestamp(date.timestamp()), **kwargs )
+            # Bank_Dates are immutable and are used as they are
+            if type(date) is not Bank_Date:
+                date = Bank_Date.fromtimestamp(date.timestamp())
+            status = Status(date, **kwargs)
 
         if not isinstance(status, Status):
             raise TypeError("status must be of type Status")
 
+        if self._level == 'transactions':
+            self.store(status)
+        elif self._level != 'none':
+            self.aggregate_status(status)
+
+    def aggregate_status(self, status):
+        """ adds a status to the aggregated status of the current day,
+        month or year, which replaces the last status of the report """
+        frame = self.get_from_date(status.date, self._level)
+        replace = (self._data is not None) and (frame == self._frame)
+        if not replace:
+            self._frame = frame
+            self._data = defaultdict(int)
+        add_data(self._data, status, self.semantic_index())
+        date = status.date
+        if type(date) is not Bank_Date:
+            date = Bank_Date.fromtimestamp(date.timestamp())
+        self.store(Status(date, **self._data), replace = replace)
+
+    def store(self, status, replace = False):
+        """ adds status to the storage and updates keys, indexes and
+        aggregated reports. If replace is True, status replaces the last
+        status of the storage """
+        if replace:
+            old = self._statuses.pop()
+            position = len(self._statuses)
+            for field, index in self._meta_indexes.items():
+                remove_from_index(index, field, position, old)
+
+        position = len(self._statuses)
         self._statuses.append(status)
-        # add potential new keys to the list
-        self._keys = list(set(self._keys) | set(status.keys()))
+
+        if (self._last_date is not None) and (status.date < self._last_date):
+            self._sorted = False
+        self._last_date = status.date
+        for field, index in self._meta_indexes.items():
+            add_to_index(index, field, position, status)
+
+        # add potential new keys to the list. Statuses mostly share the same
+        # key set, therefore, keys are only checked for new key sets
+        layout = status._schema.keys
+        if layout not in self._layouts:
+            self._layouts.add(layout)
+            self.register_keys(layout)
+
+        if self._rollups:
+            index = self.semantic_index()
+            for interval, rollup in list(self._rollups.items()):
+                if rollup.index is not index:
+                    del self._rollups[interval]
+                elif replace:
+                    rollup.replace(status)
+                else:
+                    rollup.add(status)
+
+    def fork(self):
+        """ returns a copy of the report, which shares the statuses
+        written so far with this report. Statuses appended afterwards are
+        only visible in the report they have been appended to """
+        result = copy(self)
+        result._statuses = Status_History(self._statuses, C_storages[self._storage]())
+        result._keys = list(self._keys)
+        result._key_set = set(self._key_set)
+        result._layouts = set(self._layouts)
+        result._semantics = deepcopy(self._semantics)
+        result._rollups = {}
+        result._data = copy(self._data)
+        result._meta_indexes = {field: {value: list(positions) for value, positions in index.items()}
+                                for field, index in self._meta_indexes.items()}
+        return result
 
     @property
     def size(self):
@@ -337,6 +1353,50 @@ class Report(object):
     def precision(self):
         return self._precision
 
+    @property
+    def storage(self):
+        return self._storage
+
+    @property
+    def level(self):
+        return self._level
+
+    @level.setter
+    def level(self, level):
+        """ changes the level of detail. The statuses written so far are
+        aggregated again for the new level """
+        if level not in C_report_levels:
+            raise ValueError("level must be one of '" + '\',\''.join(C_report_levels) + "'")
+        statuses = list(self._statuses)
+        fields = list(self._meta_indexes)
+        self._statuses = C_storages[self._storage]()
+        self._sorted = True
+        self._last_date = None
+        self._meta_indexes = {}
+        self._rollups = {}
+        self._level = level
+        self._frame = None
+        self._data = None
+        for status in statuses:
+            self.append(status)
+        for field in fields:
+            self.add_index(field)
+
+    def set_sink(self, sink):
+        """ writes all statuses to sink (see financing.sinks) instead of
+        keeping them in memory. Statuses appended so far are written to
+        the sink as well """
+        sink.attach(self)
+        for status in self._statuses:
+            sink.append(status)
+        self._statuses = sink
+
+    def close(self):
+        """ writes the remaining statuses of a report with a sink to its file """
+        close = getattr(self._statuses, 'close', None)
+        if close is not None:
+            close()
+
     def get_from_date(self, date, interval):
         """ help function to make the creation monthly, yearly reports more
         generic. This function returns e.g. month or year from a given date """
@@ -356,46 +1416,66 @@ class Report(object):
 
     def create_report(self, interval='yearly'):
         """ generic function for returning a report for certain
-        intervals """
-
-        def add_data(data, status):
-            """ add status data to existing dictionary """
-            for key, value in status.status.items():
-                # for cumulative data, we need to add, for other we just
-                # need to take the latest value
-                if "cum" in self.semantics_of(key):
-                    data[key] += value
-                elif not self.semantics_of(key) is "none":
-                    data[key] = value
-            return data
-
+        intervals. Monthly and yearly reports are maintained incrementally
+        once they have been requested, see rollup """
         if interval == 'daily':
             return self
-
-        i = 0
+        if interval in C_frame_units:
+            return self.rollup(interval)
+        return self.aggregate(interval)
+
+    def rollup(self, interval):
+        """ Returns the monthly or yearly report. After the first request,
+        the report is kept up to date with every status appended, so that
+        further requests do not aggregate the whole report again. Changing
+        the semantics of the report discards it. Every request returns a
+        fork of the maintained report, which can be changed without
+        affecting later requests """
+        rollup = self._rollups.get(interval)
+        if (rollup is None) or (rollup.index is not self.semantic_index()):
+            rollup = Rollup(self, interval)
+            self._rollups[interval] = rollup
+        return rollup.report().fork()
+
+    def aggregate(self, interval, size = None):
+        """ aggregates all statuses of the report for the given interval
+        into a new report. Only the first size statuses are aggregated, if
+        size is given """
+        index = self.semantic_index()
         result = Report(name = self._name,
                         format_date = self._format_date,
-                        precision = interval
+                        precision = interval,
+                        storage = self._storage
                         )
         result._semantics = deepcopy(self._semantics)
 
-        while (i < len(self._statuses)):
+        # columnar reports are aggregated column-wise
+        if isinstance(self._statuses, Status_Columns) and (interval in C_frame_units):
+            rows = self._statuses.rollup(interval, index, size)
+            if rows is not None:
+                for date, data in rows:
+                    result.append(date=date, **data)
+                return result
+
+        frame = None
+        data = None
+        last = None
+        for status in islice(self._statuses, size):
             # get the value of the interval type, e.g. exact month or exact year
-            frame = self.get_from_date(self._statuses[i].date, interval)
-            # create a new dictionary and add the current status to it
-            data = add_data(defaultdict(int), self._statuses[i])
-            i += 1
-            # iterate to the following statuses as long as frame equals the current value of the
-            # the given interval type (e.g. as long as the month is the same)
-            while (i < len(self._statuses)) and (frame == self.get_from_date(self._statuses[i].date, interval)):
-                data = add_data(data, self._statuses[i])
-                i += 1
-
-            # if the while loop ended because of i, we need to correct it again
-            if (i == len(self._statuses)):
-                result.append(date=self._statuses[i-1].date, **data)
-            else:
-                result.append(date=self._statuses[i-1].date, **data)
+            current = self.get_from_date(status.date, interval)
+            # as soon as the frame changes (e.g. a new month begins), the
+            # data of the previous frame is complete
+            if (data is not None) and (current != frame):
+                result.append(date=last.date, **data)
+                data = None
+            if data is None:
+                frame = current
+                data = defaultdict(int)
+            add_data(data, status, index)
+            last = status
+
+        if data is not None:
+            result.append(date=last.date, **data)
 
         return result
     
@@ -412,15 +1492,87 @@ class Report(object):
         """
         if not isinstance(lambda_func, Callable):
             raise TypeError('lambda_func must be of the form lambda status: True <or> False')
+        return self.selection([s for s in self._statuses if lambda_func(s)])
+
+    def selection(self, statuses):
+        """ creates a report with the given statuses of this report, which
+        shares the semantics of this report """
         result = Report(name = self._name,
                         format_date = self._format_date,
-                        precision = 'custom'
+                        precision = 'custom',
+                        storage = 'list'
                         )
         result._semantics = self._semantics
-        result._keys = self._keys
-        result._statuses = [s for s in self._statuses if lambda_func(s)]
+        result._keys = list(self._keys)
+        result._key_set = set(self._key_set)
+        result._layouts = set(self._layouts)
+        result._statuses = statuses
+        result._sorted = self._sorted
+        if statuses:
+            result._last_date = statuses[-1].date
         return result
 
+    def add_index(self, field):
+        """ creates an index for a meta field, which is used by between
+        and where to find statuses with a given value of this field. The
+        index is updated with every status appended. Values, which cannot
+        be hashed, are not indexed """
+        index = {}
+        for position, status in enumerate(self._statuses):
+            add_to_index(index, field, position, status)
+        self._meta_indexes[field] = index
+
+    def between(self, start = None, end = None, **meta):
+        """ returns a report with all statuses from start to end, excluding
+        end. Further conditions on meta fields can be given as keyword
+        arguments, e.g.
+            .between('01.01.2017', '01.01.2018', type = 'income')
+        As long as statuses have been appended in temporal order, the
+        statuses are found by bisection. Meta fields with an index (see
+        add_index) are looked up in the index, others are compared status
+        by status """
+        if start is not None:
+            start = validate.valid_date(start)
+        if end is not None:
+            end = validate.valid_date(end)
+
+        size = len(self._statuses)
+        if self._sorted:
+            dates = Date_View(self._statuses)
+            first = 0 if start is None else bisect.bisect_left(dates, start)
+            last = size if end is None else bisect.bisect_left(dates, end)
+            positions = range(first, max(first, last))
+        else:
+            positions = [i for i in range(size)
+                         if ((start is None or status_date(self._statuses, i) >= start) and
+                             (end is None or status_date(self._statuses, i) < end))]
+
+        # indexed fields first, as they reduce the number of statuses quickly
+        remaining = {}
+        for field, value in meta.items():
+            index = self._meta_indexes.get(field)
+            if (index is None) or not hashable(value):
+                remaining[field] = value
+                continue
+            candidates = index.get(value, [])
+            if isinstance(positions, range):
+                positions = candidates[bisect.bisect_left(candidates, positions.start):
+                                       bisect.bisect_left(candidates, positions.stop)]
+            else:
+                candidates = set(candidates)
+                positions = [i for i in positions if i in candidates]
+
+        statuses = [self._statuses[i] for i in positions]
+        for field, value in remaining.items():
+            statuses = [status for status in statuses
+                        if status.meta.get(field, C_missing) == value]
+        return self.selection(statuses)
+
+    def where(self, **meta):
+        """ returns a report with all statuses whose meta fields have the
+        given values, e.g. .where(type = 'income'). See between """
+        return self.between(**meta)
+
     def table_rows(self):
         """ Creates a list of lists, where each inner list
         represents a row of a table. This is used by the tabulate
@@ -463,15 +1615,17 @@ class Report(object):
 
     def __getitem__(self, key):
         result = Report(format_date = self._format_date,
-                        precision = self._precision)
+                        precision = self._precision,
+                        storage = self._storage)
         for s in self._statuses:
             if key in s.keys():
                 result.append(date = s['date'], **{key: s[key]})
         return result
 
     def __getattr__(self, name):
-        result = [s.get(name, 'None') for s in self._statuses]
-        return result
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return self.get(name)
         if (name == 'date'):
             return result
         else:
@@ -482,6 +1636,8 @@ class Report(object):
 
     def get(self, name, num_only = False):
         replace = 0 if num_only else 'None'
+        if isinstance(self._statuses, Status_Columns):
+            return self._statuses.get(name, replace)
         result = [s.get(name, replace) for s in self._statuses]
         return result
         if (name == 'date'):
@@ -501,9 +1657,106 @@ class Report(object):
 
     def as_df(self):
         """ Returns the report as pandas.DataFrame """
+        if isinstance(self._statuses, Memmap_Columns):
+            return self._statuses.as_df()
         dates, data = list(zip(*((s.date, s.status) for s in self._statuses)))
         return pd.DataFrame(list(data), index=dates)
 
+class Rollup(object):
+    """ Monthly or yearly aggregation of a report, which is updated with
+    every status appended to the report. Complete frames (e.g. months) are
+    kept in a report, the data of the current frame is kept separately
+    until the next frame begins. The last status is kept apart from the
+    data of its frame, as reports with a coarser level of detail replace
+    their last status until its day, month or year is complete """
+
+    def __init__(self, report, interval):
+        self._interval = interval
+        # semantics the aggregation is based on
+        self._index = report.semantic_index()
+        self._closed = Report(name = report.name,
+                              format_date = report._format_date,
+                              precision = interval,
+                              storage = report.storage
+                              )
+        self._closed._semantics = deepcopy(report._semantics)
+        self._frame = None
+        self._data = None       # data of the current frame without the last status
+        self._date = None       # date of the latest status in data
+        self._count = 0         # number of statuses in data
+        self._last = None       # last status of the report
+        self._result = None
+
+        size = len(report._statuses)
+        statuses = list(report.aggregate(interval, size - 1)) if size > 1 else []
+        for status in statuses[:-1]:
+            self._closed.append(date = status.date, **status.status)
+        if statuses:
+            self._frame = self.frame_of(statuses[-1].date)
+            self._data = defaultdict(int, statuses[-1].status)
+            self._date = statuses[-1].date
+            self._count = 1
+        if size:
+            self.open(report._statuses[size - 1])
+
+    @property
+    def index(self):
+        return self._index
+
+    def frame_of(self, date):
+        if self._interval == 'yearly':
+            return date.year
+        return (date.year, date.month)
+
+    def add(self, status):
+        """ adds a status appended to the report """
+        self.fold()
+        self.open(status)
+
+    def replace(self, status):
+        """ replaces the last status of the report """
+        self._last = None
+        self.open(status)
+
+    def fold(self):
+        """ adds the last status to the data of its frame """
+        if self._last is not None:
+            add_data(self._data, self._last, self._index)
+            self._date = self._last.date
+            self._count += 1
+            self._last = None
+
+    def open(self, status):
+        """ makes status the last status. If it belongs to the next frame,
+        the current frame is closed """
+        frame = self.frame_of(status.date)
+        if (self._data is not None) and (frame != self._frame):
+            if self._count:
+                self._closed.append(date = self._date, **self._data)
+            self._data = None
+        if self._data is None:
+            self._frame = frame
+            self._data = defaultdict(int)
+            self._count = 0
+        self._last = status
+        self._result = None
+
+    def report(self):
+        """ returns the aggregated report including the current frame """
+        if self._result is None:
+            result = self._closed.fork()
+            data, date, count = self._data, self._date, self._count
+            if self._last is not None:
+                data = defaultdict(int, data)
+                add_data(data, self._last, self._index)
+                date = self._last.date
+                count += 1
+            if count:
+                result.append(date = date, **data)
+            self._result = result
+        return self._result
+
+
 class Payment_Value(object):
     """ This is a class that represents a payment value. If the payment
     is an integer or float it is returned right away, if it is a
@@ -516,8 +1769,11 @@ class Payment_Value(object):
         prepares the reporting variable """
         self._name = "could not be determined"
         self._payment = payment
+        self._cents = None
         if isinstance(payment, int) or isinstance(payment, float):
             self._name = str('%0.2f' % payment)
+            # constant payments are converted only once
+            self._cents = int(payment * 100)
         if isinstance(payment, Callable):
             self._name = "dynamic"
 
@@ -525,16 +1781,41 @@ class Payment_Value(object):
     def name(self):
         return self._name
 
+    @property
+    def cents(self):
+        """ amount of a constant payment in cents or None for payments,
+        which are evaluated during runtime """
+        return self._cents
+
+    def __deepcopy__(self, memo):
+        """ functions are copied together with their closure """
+        result = copy(self)
+        memo[id(self)] = result
+        result._payment = copy_function(self._payment, memo)
+        return result
+
     def __call__(self):
-        if isinstance(self._payment, int) or isinstance(self._payment, float):
-            return int(self._payment * 100)
+        if self._cents is not None:
+            return self._cents
         if isinstance(self._payment, Callable):
             return int(self._payment() * 100)
 
+def valid_from(*accounts):
+    """ returns the first date, at which all accounts exist. Accounts
+    without creation date, like names of accounts, always exist """
+    dates = [account._date_start for account in accounts
+             if getattr(account, '_date_start', None) is not None]
+    return max(dates) if dates else datetime.min
+
+
 class Payment(object):
     """ Class that describes one specific payment between two accounts
     accounts can here be of type "Account" or str, which is an
-    abstract account that always complies """
+    abstract account that always complies. The description of the payment
+    without its date is kept in _data, which is shared by all payments of
+    a regular payment. It also contains the amount of constant payments in
+    cents and the date from which on both accounts exist """
+    __slots__ = ('_data', '_date')
 
     def __init__(self, from_acc, to_acc, date, name,
                  kind, payment, fixed=True, meta={}):
@@ -550,13 +1831,22 @@ class Payment(object):
         self._data = {
                      'from_acc': from_acc,
                      'to_acc': to_acc,
-                     'date': date,
                      'name': name,
                      'kind': kind,
                      'payment': payment,
                      'fixed': fixed,
-                     'meta': meta
+                     'meta': meta,
+                     'cents': payment.cents if isinstance(payment, Payment_Value) else None,
+                     'valid_from': valid_from(from_acc, to_acc),
                      }
+        self._date = date
+
+    def at(self, date):
+        """ returns a payment with the same description on another date """
+        payment = Payment.__new__(Payment)
+        payment._data = self._data
+        payment._date = date
+        return payment
 
     @property
     def from_acc(self):
@@ -568,7 +1858,7 @@ class Payment(object):
 
     @property
     def date(self):
-        return self._data['date']
+        return self._date
 
     @property
     def name(self):
@@ -582,11 +1872,19 @@ class Payment(object):
     def payment(self):
         return self._data['payment']
 
+    @property
+    def cents(self):
+        return self._data['cents']
+
+    @property
+    def valid_from(self):
+        return self._data['valid_from']
+
     @property
     def json(self):
         return {'from_acc': self._data['from_acc'].name,
                 'to_acc': self._data['to_acc'].name,
-                'date': self._data['date'].date(),
+                'date': self._date.date(),
                 'name': self._data['name'],
                 'kind': self._data['kind'],
                 'payment': self._data['payment'].name,
@@ -595,15 +1893,233 @@ class Payment(object):
                 }
 
     def __getitem__(self, key):
+        if key == 'date':
+            return self._date
         return self._data[key]
 
 
+class Payment_Queue(object):
+    """ Queue of all pending payments of a PaymentList from a given date on.
+    Unique and regular payments can be added while the queue is in use,
+    e.g. by controllers during a simulation, without rebuilding the queue.
+
+    The next payment of every stream (a unique payment or the iterator of a
+    regular payment) is kept in a heap. Payments on the same day are ordered
+    like in PaymentList: unique payments by date and insertion, followed by
+    regular payments in the order they were added """
+
+    def __init__(self, payments, start_date):
+        assert isinstance(start_date, datetime), "start_date must be of type datetime"
+        self._heap = []
+        self._streams = {}      # iterators of the regular payments
+        # for every iterator: regular payment, start date and the number of
+        # payments fetched, in order to recreate it in a copy of the queue
+        self._sources = {}
+        self._popped = []       # streams whose payment has been popped
+        self._count = 0         # counter for keeping insertion order of uniques
+        # if a list, the keys of all popped payments are appended to it
+        self.keys = None
+
+        for payment in payments.uniques:
+            self.add_unique(payment, start_date)
+        for index, regular in enumerate(payments.regular):
+            self.add_regular(regular, index, start_date)
+
+    def add_unique(self, payment, start_date):
+        """ adds a unique payment to the queue, if it is not before
+        start_date """
+        if payment['date'] >= start_date:
+            key = (payment['date'].date(), 0, payment['date'], self._count)
+            heapq.heappush(self._heap, (key, payment))
+            self._count += 1
+
+    def add_regular(self, regular, index, start_date):
+        """ adds a regular payment to the queue, starting from start_date.
+        index is the position of regular in the PaymentList """
+        self._streams[index] = interval_function(regular['interval'])(regular, start_date)
+        self._sources[index] = [regular, start_date, 0]
+        self.push_next(index)
+
+    def push_next(self, index):
+        """ pushes the next payment of a regular stream to the heap """
+        payment = next(self._streams[index], None)
+        if payment is None:
+            del self._streams[index]
+            del self._sources[index]
+        else:
+            self._sources[index][2] += 1
+            heapq.heappush(self._heap, ((payment['date'].date(), 1, index), payment))
+
+    def next_date(self):
+        """ returns the date of the next payment or Bank_Date.max, if there
+        are no payments left """
+        if not self._heap:
+            return Bank_Date.max
+        return self._heap[0][1]['date']
+
+    def pop_day(self):
+        """ removes all payments of the next day from the queue and returns
+        them in their order of execution """
+        day = self._heap[0][0][0]
+        payments = []
+        while self._heap and (self._heap[0][0][0] == day):
+            key, payment = heapq.heappop(self._heap)
+            if key[1] == 1:
+                self._popped.append(key[2])
+            if self.keys is not None:
+                self.keys.append(key)
+            payments.append(payment)
+        return tuple(payments)
+
+    def peek_day(self):
+        """ returns the payments of the next day without removing them,
+        in no particular order """
+        if not self._heap:
+            return ()
+        day = self._heap[0][0][0]
+        return tuple(payment for key, payment in self._heap if key[0] == day)
+
+    def pending(self):
+        """ returns the next payment of every unique and regular payment in
+        the queue together with its regular payment (None for unique
+        payments) """
+        return [(payment, self._sources[key[2]][0] if key[1] == 1 else None)
+                for key, payment in self._heap]
+
+    @property
+    def popped(self):
+        """ indices of the regular payments popped since the last advance """
+        return self._popped
+
+    def advance(self):
+        """ fetches the next payments of all regular streams whose payment has
+        been popped. This must be called after these payments have been
+        executed, as the stop criteria of regular payments may depend on them """
+        for index in self._popped:
+            self.push_next(index)
+        self._popped = []
+
+    def restrict(self, accept):
+        """ removes all payments and regular payments from the queue, for
+        which accept(payment) is False """
+        self._heap = [entry for entry in self._heap if accept(entry[1])]
+        heapq.heapify(self._heap)
+        for index, (regular, _, _) in list(self._sources.items()):
+            if not accept(regular):
+                del self._streams[index]
+                del self._sources[index]
+
+    def combine(self, queues):
+        """ replaces the pending payments by those of queues, which have been
+        restricted to disjoint payments of the same queue. Payments added to
+        them keep their order, if they have only been added to one of them """
+        self._heap = [entry for queue in queues for entry in queue._heap]
+        heapq.heapify(self._heap)
+        self._streams = {}
+        self._sources = {}
+        for queue in queues:
+            self._streams.update(queue._streams)
+            self._sources.update(queue._sources)
+        self._popped = []
+        self._count = max(queue._count for queue in queues)
+
+    def __getstate__(self):
+        """ iterators cannot be copied or pickled. They are recreated
+        from their sources instead """
+        state = self.__dict__.copy()
+        del state['_streams']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._streams = {index: interval_function(regular['interval'])(regular, start_date, skip = count)
+                         for index, (regular, start_date, count) in self._sources.items()}
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        """ returns the payments of the next day. The streams of the previous
+        day are advanced first, like in a generator continuing after yield """
+        self.advance()
+        if not self._heap:
+            raise StopIteration
+        return self.pop_day()
+
+
+class Controller_Schedule(object):
+    """ Days on which a controller of a simulation is called, given by a
+    Recurrence from date_start on. Like the streams of Payment_Queue, the
+    iterator over the days is recreated from the number of days fetched,
+    when the schedule is copied or pickled """
+
+    def __init__(self, controller, recurrence, date_start):
+        self.controller = controller
+        self._recurrence = recurrence
+        self._date_start = date_start
+        self._count = 0
+        self._ordinals = self.create_iterator()
+        self.next = None        # ordinal of the next day
+        self.advance()
+
+    def create_iterator(self):
+        ordinals = self._recurrence.iter_ordinals(self._date_start, self._date_start.day)
+        return islice(ordinals, self._count, None)
+
+    def advance(self):
+        """ fetches the next day, C_ordinal_max + 1 if there is none """
+        self.next = next(self._ordinals, C_ordinal_max + 1)
+        self._count += 1
+
+    def due(self, ordinal):
+        """ returns True, if the controller needs to be called on the day
+        ordinal and fetches the day after it """
+        if self.next > ordinal:
+            return False
+        while self.next <= ordinal:
+            self.advance()
+        return True
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_ordinals']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._ordinals = self.create_iterator()
+
+
+class Payment_Trigger(object):
+    """ Trigger of a controller, which is only called on days, on which a
+    matching payment is due. Payments match, if they have the given kind
+    ('regular' or 'unique'), name and values of meta fields, e.g.
+
+        Payment_Trigger(type = 'income')
+    """
+
+    def __init__(self, kind = None, name = None, **meta):
+        self._kind = kind
+        self._name = name
+        self._meta = meta
+
+    def matches(self, payment):
+        if (self._kind is not None) and (payment['kind'] != self._kind):
+            return False
+        if (self._name is not None) and (payment['name'] != self._name):
+            return False
+        payment_meta = payment['meta']
+        return all(payment_meta.get(field, C_missing) == value
+                   for field, value in self._meta.items())
+
+
 class PaymentList(object):
     """ Hanldes the complexities of payments including unique
     payments and regular payments """
 
     def __init__(self):
         self._uniques = []
+        self._unique_dates = []     # dates of _uniques for sorted insertion
         self._regular = []
 
     @property
@@ -624,7 +2140,7 @@ class PaymentList(object):
     def add_unique(self, from_acc, to_acc, payment,
                    date, name = '', fixed = True, meta={}):
         """ adds a one-time payment to the list, optional give it
-        a name """
+        a name. The new payment is returned """
         if not isinstance(date, datetime):
             raise TypeError("Date must be at least from type datetime")
 
@@ -633,40 +2149,46 @@ class PaymentList(object):
         # converts any input to a function that returns the right value
         conv_payment = conv_payment_func(payment)
 
-        self._uniques.append(
-                             Payment(
-                                     from_acc = from_acc,
-                                     to_acc = to_acc,
-                                     date = Bank_Date.fromtimestamp(date.timestamp()),
-                                     name = name,
-                                     kind = 'unique',
-                                     payment = conv_payment,
-                                     fixed = fixed,
-                                     meta = meta
-                                     )
-                             )
-
-        # sort the whole list with date as key
-        self._uniques = sorted(self._uniques, key = lambda p: p['date'] )
+        date = Bank_Date.fromtimestamp(date.timestamp())
+        unique = Payment(
+                         from_acc = from_acc,
+                         to_acc = to_acc,
+                         date = date,
+                         name = name,
+                         kind = 'unique',
+                         payment = conv_payment,
+                         fixed = fixed,
+                         meta = meta
+                         )
+
+        # keep the list sorted by date. payments with the same date remain
+        # in the order they were added
+        i = bisect.bisect_right(self._unique_dates, date)
+        self._uniques.insert(i, unique)
+        self._unique_dates.insert(i, date)
+        return unique
 
     def add_regular(self, from_acc, to_acc, payment, interval,
                     date_start, day=1, name='', date_stop = None,
                     fixed = False, meta={}):
         """ Adds a regular payment to the list, with a given
         payment: amount to pay
-        interval: 'monthly': every month
+        interval: 'weekly': every week on the weekday of date_start
+                  'monthly': every month
                   'quarter': every quarter with date_start as start month
                   'quarter_year': every quarter of a year (mar, jun, sep, dec)
                   'yearly': every year
+                  or a Recurrence for other rules
         day: day to start with
         date_start: start date of this payment
         name : optional name
         fixed: only everything or nothing must be transfered (true)
                or depending on the receiving account a smaller amount
                can be transfered (false)
+        The new regular payment is returned
         """
-        if not interval in C_interval.keys():
-            raise ValueError("interval must be one of '" + '\',\''.join(C_interval))
+        if not (isinstance(interval, Recurrence) or interval in C_interval.keys()):
+            raise ValueError("interval must be a Recurrence or one of '" + '\',\''.join(C_interval) + "'")
         if day >= 29:
             warnings.warn(("note that in months which have less days than {} the " +
                            "payment will be transferred earlier").format(day)
@@ -681,18 +2203,19 @@ class PaymentList(object):
         # converts any payment to a function
         conv_payment = conv_payment_func(payment)
 
-        self._regular.append({'from_acc': from_acc,
-                              'to_acc': to_acc,
-                              'interval': interval,
-                              'day' : day,
-                              'date_start': Bank_Date.fromtimestamp(date_start.timestamp()),
-                              'date_stop': date_stop,
-                              'payment': conv_payment,
-                              'name' : name,
-                              'fixed': fixed,
-                              'meta': meta
-                              }
-                             )
+        regular = {'from_acc': from_acc,
+                   'to_acc': to_acc,
+                   'interval': interval,
+                   'day' : day,
+                   'date_start': Bank_Date.fromtimestamp(date_start.timestamp()),
+                   'date_stop': date_stop,
+                   'payment': conv_payment,
+                   'name' : name,
+                   'fixed': fixed,
+                   'meta': meta
+                   }
+        self._regular.append(regular)
+        return regular
 
     def clear_regular(self):
         """ Removes all regular payments """
@@ -700,35 +2223,9 @@ class PaymentList(object):
 
     def payment(self, start_date):
         """ returns an interator that iterates through all
-        payments """
-
-        assert isinstance(start_date, datetime), "start_date must be of type datetime"
-        # creates for each item an iterator that returns just this
-        # item. this list is later on amended by iterators for regular
-        # payments
-        iters = [iter([u]) for u in self._uniques if u['date']>= start_date]
-        for r in self._regular:
-            # creates an iterator based on the interval in r
-            iters.append(C_interval[r['interval']](r, start_date))
-
-        # list of next dates. this list is inline with the iters list
-        # the second parameter in next prevents the command to raise a
-        # StopIteration Exception
-        dates = [next(iter, C_default_payment) for iter in iters]
-
-        # as long as there is still a date, below infinity
-        min_date = min(dates, key = lambda d: d['date'])
-
-        # in this routine, the next command must be called after yield, as there might
-        # be some callables which need to be called right after the payments, but not
-        # before
-        while min_date['date'] != Bank_Date.max:
-            # find all indices and payments in the list that have the same daet
-            indices, payments = zip(*[(i, d) for (i, d) in enumerate(dates) if (d['date'].date() == min_date['date'].date())])
-            yield payments
-            for i in indices:
-                dates[i] = next(iters[i], C_default_payment)
-            min_date = min(dates, key = lambda d: d['date'])
+        payments. The iterator is a Payment_Queue, which accepts new
+        payments while it is in use """
+        return Payment_Queue(self, start_date)
 
 class Currency():
     """ Standard class for currencies to assure correct computing
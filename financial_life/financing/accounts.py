@@ -7,16 +7,24 @@ Created on 24.03.2016
 # standard libraries
 from datetime import datetime, timedelta
 from collections import Callable
+from copy import deepcopy
 import warnings
 import logging
+import os
+import heapq
+import bisect
 
 # third-party libraries
 
 # own libraries
 from financial_life.financing import PaymentList
 from financial_life.financing import Report
-from financial_life.financing import C_default_payment
-from financial_life.calendar_help import Bank_Date, get_days_per_year
+from financial_life.financing import copy_function
+from financial_life.financing import Recurrence, Controller_Schedule, Payment_Trigger
+from financial_life.financing import C_ordinal_max
+from financial_life.financing.checkpoint import save_checkpoint, load_checkpoint
+from financial_life.financing.sinks import sink_class, file_name
+from financial_life.calendar_help import Bank_Date, Ordinal_Date, calendar_table
 from financial_life.financing import plotting as plt
 from financial_life.financing import validate
 
@@ -48,6 +56,14 @@ def neg_func(func):
         return -result
     return foo
 
+def days_until(date, date_stop):
+    """ Returns the number of days d >= 0 for which date + d is still
+    earlier than date_stop """
+    diff = date_stop - date
+    if diff.seconds or diff.microseconds:
+        return max(0, diff.days + 1)
+    return max(0, diff.days)
+
 def valid_account_type(*accounts):
     """ Checks whether all accounts given to this function
     are either from type Account or from type string
@@ -95,14 +111,153 @@ class TransferMessage(object):
         return self._money
 
 
-class Simulation(object):
+class Active_Accounts(object):
+    """ Schedule of the accounts of a simulation, which need to be simulated
+    on the current day. Accounts become active on their start date. Dormant
+    accounts (see Account.is_dormant) are put aside until their next event
+    date or until a payment involves them. Then, they catch up on the days
+    in between with skip_days, like in event-driven simulations """
+
+    def __init__(self):
+        self._accounts = []     # all accounts of the simulation in order
+        self._positions = {}    # position of every account by its id
+        self._active = []       # positions of the active accounts in order
+        self.accounts = []      # the active accounts
+        self._waiting = []      # heap of (ordinal, position) of inactive accounts
+        self._wake = {}         # ordinal, on which an inactive account is due
+        self._dormant = set()   # positions of dormant accounts
+
+    def register(self, accounts):
+        """ adds accounts of the simulation, which have not been registered
+        yet. They wait for their start date """
+        for account in accounts[len(self._accounts):]:
+            position = len(self._accounts)
+            self._accounts.append(account)
+            self._positions[id(account)] = position
+            self.wait(position, account._date_start.toordinal())
+
+    def wait(self, position, ordinal):
+        self._wake[position] = ordinal
+        heapq.heappush(self._waiting, (ordinal, position))
+
+    def activate(self, position):
+        del self._wake[position]
+        self._dormant.discard(position)
+        bisect.insort(self._active, position)
+        self.accounts = [self._accounts[p] for p in self._active]
+
+    def catch_up(self, account, ordinal):
+        """ lets the days after the last simulated day of a dormant account
+        until ordinal pass """
+        days = ordinal - account._ordinal
+        if days > 0:
+            account.skip_days(days)
+
+    def update(self, simulation):
+        """ activates all accounts, which are due on the current day of the
+        simulation and returns the active accounts """
+        self.register(simulation._accounts)
+        ordinal = simulation._ordinal
+        while self._waiting and (self._waiting[0][0] <= ordinal):
+            due, position = heapq.heappop(self._waiting)
+            if self._wake.get(position) != due:
+                # the account has been activated by a payment before
+                continue
+            account = self._accounts[position]
+            if position in self._dormant:
+                self.catch_up(account, ordinal - 1)
+            elif account._date_start > simulation._current_date:
+                # the account starts later on this day
+                self.wait(position, ordinal + 1)
+                continue
+            self.activate(position)
+        return self.accounts
+
+    def wake(self, account, simulation):
+        """ activates a dormant account, which is involved in a payment on
+        the current day of the simulation """
+        position = self._positions.get(id(account))
+        if position not in self._dormant:
+            return
+        self.catch_up(account, simulation._ordinal - 1)
+        account.set_day(simulation._ordinal, simulation._time)
+        account.start_of_day()
+        self.activate(position)
+
+    def put_aside(self):
+        """ removes all dormant accounts from the active accounts until
+        their next event date """
+        dormant = [position for position in self._active if self._accounts[position].is_dormant()]
+        if not dormant:
+            return
+        for position in dormant:
+            self._active.remove(position)
+            self._dormant.add(position)
+            self.wait(position, self._accounts[position].next_event_date().toordinal())
+        self.accounts = [self._accounts[p] for p in self._active]
+
+    def __getstate__(self):
+        # positions are found by the ids of the accounts, which change in copies
+        state = self.__dict__.copy()
+        del state['_positions']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._positions = {id(account): position for position, account in enumerate(self._accounts)}
+
+    def restrict(self, positions):
+        """ keeps only the accounts at the given positions in the schedule,
+        e.g. for simulating a group of accounts on its own. The accounts
+        must have been registered before """
+        positions = set(positions)
+        self._active = [p for p in self._active if p in positions]
+        self.accounts = [self._accounts[p] for p in self._active]
+        self._waiting = [entry for entry in self._waiting if entry[1] in positions]
+        heapq.heapify(self._waiting)
+        self._wake = {p: ordinal for p, ordinal in self._wake.items() if p in positions}
+        self._dormant &= positions
+
+    def combine(self, schedules):
+        """ replaces the schedule by the schedules of disjoint groups of
+        accounts, which have been restricted to them """
+        self._active = sorted(p for schedule in schedules for p in schedule._active)
+        self.accounts = [self._accounts[p] for p in self._active]
+        self._waiting = [entry for schedule in schedules for entry in schedule._waiting]
+        heapq.heapify(self._waiting)
+        self._wake = {}
+        self._dormant = set()
+        for schedule in schedules:
+            self._wake.update(schedule._wake)
+            self._dormant |= schedule._dormant
+
+    def next_ordinal(self):
+        """ returns the ordinal, on which the next inactive account is due """
+        return self._waiting[0][0] if self._waiting else C_ordinal_max
+
+    def synchronize(self, ordinal):
+        """ lets dormant accounts catch up until ordinal, e.g. at the end of
+        a simulation """
+        for position in self._dormant:
+            self.catch_up(self._accounts[position], ordinal)
+
+
+class Simulation(Ordinal_Date):
     """ This class simulates the interaction between different accounts. It
     provides the framework in which dependencies between accounts and state-
     dependent changes of account-modi can be managed """
 
-    def __init__(self, *accounts, name = None, date = None, meta = None):
+    def __init__(self, *accounts, name = None, date = None, meta = None,
+                 event_driven = False, report_level = 'transactions'):
         """ Simulations can be initialized with names, to make differentiate
-        between different simulations """
+        between different simulations
+
+        event_driven: if True, the simulation jumps over days on which no
+                      payment, interest booking or controller is due, instead
+                      of walking through every single day
+        report_level: level of detail of the report of all payments, either
+                      'transactions', 'daily', 'monthly', 'yearly' or 'none'.
+                      Coarser levels only keep aggregated payments """
         # check for errors in the input of accounts
         for account in accounts:
             if not isinstance(account, Account):
@@ -116,7 +271,7 @@ class Simulation(object):
         # a simuation can also store meta information 
         self._meta = meta
 
-        self._report = Report(self._name)
+        self._report = Report(self._name, level = report_level)
         self._report.add_semantics('from_acc', 'none')
         self._report.add_semantics('to_acc', 'none')
         self._report.add_semantics('value', 'input_cum')
@@ -126,8 +281,8 @@ class Simulation(object):
         self._report.add_semantics('message', 'none')
 
         self._payments = PaymentList()
-        self._payments_iter = None
-        self._next_pay = None
+        # queue of pending payments, which is created when the simulation starts
+        self._payment_queue = None
 
         self._date_start = validate.valid_date(date)
         self._day = 0
@@ -135,11 +290,22 @@ class Simulation(object):
 
         # list of accounts to manage
         self._accounts = list(accounts)
+        # accounts, which need to be simulated on the current day
+        self._active_accounts = Active_Accounts()
 
         # list of controller-functions executed before day-simulation.
         # controller functions are executed before the day to check custom
         # states of the accounts and perform actions
         self._controller = []
+        # controllers, which are only called on certain days, as schedules
+        # or as pairs of payment trigger and controller
+        self._schedules = []
+        self._payment_triggers = []
+        # pairs of controller and the accounts it has been declared to touch
+        self._controller_accounts = []
+
+        # whether days without any events are skipped during simulation
+        self._event_driven = event_driven
 
 
     @property
@@ -166,6 +332,14 @@ class Simulation(object):
     def report(self):
         return self._report
 
+    @property
+    def event_driven(self):
+        return self._event_driven
+
+    @event_driven.setter
+    def event_driven(self, event_driven):
+        self._event_driven = event_driven
+
     def as_df(self):
         df = self.report.as_df()
         df = df[['from_acc', 'to_acc', 'value', 'kind', 'name', ]]
@@ -238,9 +412,11 @@ class Simulation(object):
         """ Transfers money from one account to the other """
         from_acc, to_acc = valid_account_type(from_acc, to_acc)
         date = validate.valid_date(date)
-        self._payments.add_unique(
+        unique = self._payments.add_unique(
             from_acc, to_acc, payment, date, name, fixed, meta)
-        self.update_payment_iterators()
+        # payments can be added during the simulation as well
+        if self._payment_queue is not None:
+            self._payment_queue.add_unique(unique, self._current_date)
 
     def add_regular(self, from_acc, to_acc, payment, interval,
                     date_start=datetime(1971,1,1),
@@ -257,24 +433,23 @@ class Simulation(object):
         date_start = validate.valid_date(date_start)
         if date_stop is not None:
             date_stop = validate.valid_stop_date(date_stop)
-        self._payments.add_regular(
+        regular = self._payments.add_regular(
             from_acc, to_acc, payment, interval,
             date_start, day, name, date_stop, fixed, meta)
-        self.update_payment_iterators()
-        
-    def update_payment_iterators(self):
-        """ Whenever a new payment is added via add_unique or add_regular,
-        this function is triggered to update the payment iterator. This is 
-        necessary, as payments could be dynamically added during the 
-        simulation as well """
-        self._payments_iter = self._payments.payment(self._current_date)
+        # payments can be added during the simulation as well
+        if self._payment_queue is not None:
+            self._payment_queue.add_regular(
+                regular, len(self._payments.regular) - 1, self._current_date)
 
-        try:
-            self._next_pay = next(self._payments_iter, C_default_payment)
-        except StopIteration:
-            # if there are no payments, create a date for a payment
-            # that lies in the distant future
-            self._next_pay = [{'date': Bank_Date.max}]
+    def update_payment_iterators(self):
+        """ Discards the queue of pending payments and rebuilds it from the
+        payment list, starting at the current date. Regular payments are
+        re-anchored at the current date, e.g. a monthly payment on the 31st
+        is then continued on the 28th after February. Payments added via
+        add_unique or add_regular are inserted into the running queue
+        directly and need no rebuild, therefore, this is only needed if the
+        payment list has been changed otherwise """
+        self._payment_queue = self._payments.payment(self._current_date)
 
     def add_account(self, account):
         """ adds an account to the simulation and returns it to the
@@ -286,17 +461,53 @@ class Simulation(object):
                             str(type(account))))
         return account
 
-    def add_controller(self, controller):
-        if isinstance(controller, Callable):
-            self._controller.append(controller)
-        else:
+    def add_controller(self, controller, trigger = None, accounts = None):
+        """ Adds a controller function, which is called with the simulation
+        as argument before the payments of a day. Without trigger, it is
+        called every day. Otherwise, trigger can be
+            a Recurrence or one of 'daily', 'weekly', 'monthly' or 'yearly'
+            counted from the current date: the controller is only called
+            on these days, e.g. Recurrence('yearly', by_month = 2, by_day = 15)
+            a Payment_Trigger: the controller is only called on days with
+            a matching payment
+        Controllers are called in the order they were added, first those
+        without trigger. Only controllers without trigger prevent
+        event-driven simulations from skipping days.
+
+        accounts: the accounts the controller reads or changes. Without
+                  them, the controller may touch every account and the
+                  simulation cannot be split into independent groups of
+                  accounts (see financing.parallel) """
+        if not isinstance(controller, Callable):
             raise TypeError(("controller must be of type Callable but is of type " +
                             str(type(controller))))
+        if accounts is not None:
+            accounts = tuple(accounts)
+            for account in accounts:
+                if not isinstance(account, Account):
+                    raise TypeError(str(account) + " is not of type or subtype Account")
+        if trigger is None:
+            self._controller.append(controller)
+        else:
+            if isinstance(trigger, str):
+                trigger = Recurrence(trigger)
+            if isinstance(trigger, Recurrence):
+                self._schedules.append(Controller_Schedule(controller, trigger, self._current_date))
+            elif isinstance(trigger, Payment_Trigger):
+                self._payment_triggers.append((trigger, controller))
+            else:
+                raise TypeError(("trigger must be a Recurrence, a Payment_Trigger or a string but is of type " +
+                                str(type(trigger))))
+        if accounts is not None:
+            self._controller_accounts.append((controller, accounts))
 
     def get_payment(self, payment):
         """ functions that returns the amount of payment for the current day.
         it handles the distinction between variables that represent just numbers
         and variables that represent functions to be executed """
+        # constant payments are converted to cents when they are added
+        if payment.cents is not None:
+            return payment.cents
         payed = 0
         if isinstance(payment['payment'], int) or isinstance(payment['payment'], float):
             payed = payment['payment']
@@ -331,48 +542,51 @@ class Simulation(object):
         If the money to be transfered is zero, no payment procedure will be
         initiated
         """
-        if not (isinstance(payment['from_acc'], DummyAccount)):
-            assert payment['from_acc']._date_start <= self._current_date, (str(payment['from_acc']) + ' has a later creation date than the payment ' + payment['name'])
-        if not (isinstance(payment['to_acc'], DummyAccount)):
-            assert payment['to_acc']._date_start <= self._current_date, (str(payment['to_acc']) + ' has a later creation date than the payment ' + payment['name'])
+        from_acc, to_acc = payment['from_acc'], payment['to_acc']
+        kind, name, meta = payment['kind'], payment['name'], payment['meta']
+        # the creation dates of both accounts are compared only once per payment
+        if payment.valid_from > self._current_date:
+            for account in (from_acc, to_acc):
+                if not (isinstance(account, DummyAccount)):
+                    assert account._date_start <= self._current_date, (str(account) + ' has a later creation date than the payment ' + name)
         try:
             # this is now the money that will be transfered, if there is
             # a receiver. this amount of money remains fixed for the transfer
             money = self.get_payment(payment)
             if money == 0:
                 self.make_report(
-                                from_acc = payment['from_acc'],
-                                to_acc = payment['to_acc'],
+                                from_acc = from_acc,
+                                to_acc = to_acc,
                                 value = 0,
-                                kind = payment['kind'],
-                                name = payment['name'],
+                                kind = kind,
+                                name = name,
                                 code = C_transfer_NA,
                                 message = "Transfer with zero money will not be initiated",
-                                meta = payment['meta']
+                                meta = meta
                                 )
                 return False
         except TypeError as e:
             logger.debug("make_transfer: money of wrong type")
             self.make_report(
-                                from_acc = payment['from_acc'],
-                                to_acc = payment['to_acc'],
+                                from_acc = from_acc,
+                                to_acc = to_acc,
                                 value = 0,
-                                kind = payment['kind'],
-                                name = payment['name'],
+                                kind = kind,
+                                name = name,
                                 code = C_transfer_ERR,
                                 message = e.message(),
-                                meta = payment['meta']
+                                meta = meta
                                 )
             return False
 
         # first, try to get the money from the sender account, tm = TransferMessage()
-        tm_sender = payment['from_acc'].payment_output(
-                                                       account_str = payment['to_acc'].name,
-                                                       payment = -money,
-                                                       kind = payment['kind'],
-                                                       description = payment['name'],
-                                                       meta = payment['meta']
-                                                       )
+        tm_sender = from_acc.payment_output(
+                                            account_str = to_acc.name,
+                                            payment = -money,
+                                            kind = kind,
+                                            description = name,
+                                            meta = meta
+                                            )
 
         # if sending money succeeded, try the receiver side
         if tm_sender.code == C_transfer_OK:
@@ -381,84 +595,84 @@ class Simulation(object):
             # throw an error message
             if money < (-tm_sender.money):
                 raise ValueError("%f was requested from account '%s' but %f returned" % (money,
-                                                                                         payment['from_acc'].name,
+                                                                                         from_acc.name,
                                                                                          -tm_sender.money))
             if money > (-tm_sender.money):
                 # if payment is fixed, throw an error, otherwise proceed
                 if payment['fixed']:
                     raise ValueError("%f was requested from account '%s' but %f returned" % (money,
-                                                                                         payment['from_acc'].name,
+                                                                                         from_acc.name,
                                                                                          -tm_sender.money))
                 else:
                     money = -tm_sender.money
 
-            tm_receiver = payment['to_acc'].payment_input(
-                                                          account_str = payment['from_acc'].name,
-                                                          payment = money,
-                                                          kind = payment['kind'],
-                                                          description = payment['name'],
-                                                          meta = payment['meta']
-                                                          )
+            tm_receiver = to_acc.payment_input(
+                                               account_str = from_acc.name,
+                                               payment = money,
+                                               kind = kind,
+                                               description = name,
+                                               meta = meta
+                                               )
             # if receiving succeeded, return success
             if tm_receiver.code == C_transfer_OK:
                 # in the wired case that money is less than what has been returned by the sender,
                 # throw an error message
                 if money < tm_receiver.money:
                     raise ValueError("%f was submitted to account '%s' but %f returned" % (money,
-                                                                                           payment['to_acc'].name,
+                                                                                           to_acc.name,
                                                                                            tm_receiver.money))
                 # if the receiver does not accept the entir money
                 if money > tm_receiver.money:
                     # check, whether payment is fixed
                     if payment['fixed']:
                         raise ValueError("%f was submitted to account '%s' but %f returned because it is fixed" % (money,
-                                                                                               payment['to_acc'].name,
+                                                                                               to_acc.name,
                                                                                                tm_receiver.money))
                     else:
                         # if payment is not fixed, we need to transfer the difference back to
                         # the sender account
-                        payment['from_acc'].return_money( money - tm_receiver.money)
+                        from_acc.return_money( money - tm_receiver.money)
 
                 logger.debug("make_transfer: receiver code is OK")
                 self.make_report(
-                                    from_acc = payment['from_acc'],
-                                    to_acc = payment['to_acc'],
+                                    from_acc = from_acc,
+                                    to_acc = to_acc,
                                     value = tm_receiver.money,
-                                    kind = payment['kind'],
-                                    name = payment['name'],
+                                    kind = kind,
+                                    name = name,
                                     code = C_transfer_OK,
                                     message = '',
-                                    meta = payment['meta']
+                                    meta = meta
                                     )
                 return True
             else:
                 # if an error on the receiver side happened,
                 # return the money back and report that
                 logger.debug("make_transfer: receiver code is not ok")
-                payment['from_acc'].return_money(money)
+                from_acc.return_money(money)
                 self.make_report(
-                                    from_acc = payment['from_acc'],
-                                    to_acc = payment['to_acc'],
+                                    from_acc = from_acc,
+                                    to_acc = to_acc,
                                     value = tm_sender.money,
-                                    kind = payment['kind'],
-                                    name = payment['name'],
+                                    kind = kind,
+                                    name = name,
                                     code = tm_receiver.code,
                                     message = tm_receiver.message,
-                                    meta = payment['meta']
+                                    meta = meta
                                     )
                 return False
         else:
             # if an error occured on the sending side, report this and return false
             logger.debug("make_transfer: sending code is not OK")
             self.make_report(
-                                from_acc = payment['from_acc'],
-                                to_acc = payment['to_acc'],
+                                from_acc = from_acc,
+                                to_acc = to_acc,
                                 value = money,
-                                kind = payment['kind'],
-                                name = payment['name'],
+                                kind = kind,
+                                name = name,
                                 code = tm_sender.code,
                                 message = tm_sender.message,
-                                meta = payment['meta']
+                                meta = meta
                                 )
             return False
 
@@ -468,56 +682,173 @@ class Simulation(object):
         # Initialization
         date_stop = validate.valid_date_stop(date_stop)
 
-        if (not self._payments_iter):
-            self._payments_iter = self._payments.payment(self._current_date)
-
-        if (not self._next_pay):
-            try:
-                self._next_pay = next(self._payments_iter, C_default_payment)
-            except StopIteration:
-                # if there are no payments, create a date for a payment
-                # that lies in the distant future
-                self._next_pay = [{'date': Bank_Date.max}]
+        if self._payment_queue is None:
+            self._payment_queue = self._payments.payment(self._current_date)
 
         delta = validate.valid_delta(delta)
 
-        temp_delta = 0
-
-        while ((self._current_date < date_stop) and     # ...stop-date is reached
-            (temp_delta < delta.days) and           # and delta has not been exeeded
-            ((self._current_date - self._date_start).days < C_max_time)):  # ...number of simulated days exceeds max
-
-            # 0. set the current day
-            for account in self._accounts:
-                if account._date_start <= self._current_date:
-                    account.set_date(self._current_date)
-
-            # 1. execute start-of-day function
-            # everything that should happen before the money transfer
-            for account in self._accounts:
-                if account._date_start <= self._current_date:
-                    account.start_of_day()
-
-            # 2. execute all controller functions
-            for controller in self._controller:
-                controller(self)
-
-            # 3. apply all payments for the day in correct temporal order
-            if self._next_pay[0]['date'].date() == self._current_date.date():
-                for payment in self._next_pay:
-                    self.make_transfer(payment)
-                self._next_pay = next(self._payments_iter, C_default_payment)
+        # number of days to simulate until the stop-date is reached, delta
+        # has been exceeded or the number of simulated days exceeds max
+        days_left = min(delta.days,
+                        C_max_time - self._day,
+                        days_until(self._current_date, date_stop))
 
-            # 4. execute end-of-day function
-            # everything that should happen after the money transfer
-            for account in self._accounts:
-                if account._date_start <= self._current_date:
-                    account.end_of_day()
+        while days_left > 0:
+            self.simulate_day()
 
             # go to the next day within the simulation
             self._day += 1
-            self._current_date = self._date_start + timedelta(days = self._day)
-            temp_delta += 1
+            self.set_ordinal(self._ordinal + 1)
+            days_left -= 1
+
+            if self._event_driven:
+                days = min(self.quiet_days(), days_left)
+                if days > 0:
+                    self.skip_days(days)
+                    days_left -= days
+
+        # dormant accounts are brought to the last simulated day
+        self._active_accounts.synchronize(self._ordinal - 1)
+
+    def fork(self, name = None):
+        """ Returns an independent copy of the simulation at the current
+        date, e.g. for simulating alternative plans from this day on. Both
+        simulations can be simulated further on their own. The reports
+        written so far are shared between both simulations and not copied.
+
+        Functions of payments, stop criteria and controllers are copied
+        together with their closures, so that a lambda referring to an
+        account of this simulation refers to the account of the fork.
+        Variables of the global namespace are not copied """
+        memo = {}
+        for report in [self._report] + [account._report for account in self._accounts]:
+            memo[id(report)] = report.fork()
+        for controller in self._controller:
+            copy_function(controller, memo)
+        for schedule in self._schedules:
+            copy_function(schedule.controller, memo)
+        for _, controller in self._payment_triggers:
+            copy_function(controller, memo)
+        for regular in self._payments.regular:
+            copy_function(regular['date_stop'], memo)
+
+        result = deepcopy(self, memo)
+        if name is not None:
+            result._name = name
+        return result
+
+    def checkpoint(self, path):
+        """ Stores the current state of the simulation in a file, from
+        which it can be restored with Simulation.restore. Payments, stop
+        criteria and controllers must be numbers, functions on module level
+        or instances of Registered_Callable """
+        save_checkpoint(self, path)
+
+    @classmethod
+    def restore(cls, path):
+        """ Returns the simulation stored in a checkpoint. The simulation
+        continues from the date of the checkpoint """
+        simulation = load_checkpoint(path)
+        if not isinstance(simulation, cls):
+            raise TypeError("Checkpoint does not contain a " + cls.__name__)
+        return simulation
+
+    def stream_reports(self, directory, format = 'csv', buffer_size = 1000):
+        """ Writes the reports of all accounts and of the simulation to
+        files in directory while simulating, instead of keeping them in
+        memory. format is either 'csv', 'jsonl' or 'parquet'. Files are named
+        after the reports, the report of the simulation is written to
+        'simulation'. Returns the paths of the files, which can be opened
+        with sinks.open_report after close_reports has been called """
+        cls = sink_class(directory, format)
+        os.makedirs(directory, exist_ok = True)
+        reports = [(file_name(account.name), account.report) for account in self._accounts]
+        reports.append(('simulation', self._report))
+        paths = []
+        for name, report in reports:
+            path = os.path.join(directory, '%s.%s' % (name, cls.extension))
+            if path in paths:
+                raise ValueError('Reports of two accounts would be written to %s' % path)
+            report.set_sink(cls(path, buffer_size))
+            paths.append(path)
+        return paths
+
+    def close_reports(self):
+        """ writes the remaining statuses of all reports written to files """
+        for account in self._accounts:
+            account.report.close()
+        self._report.close()
+
+    def simulate_day(self):
+        """ Simulates the current day for all accounts, controllers and
+        payments. Only active accounts are simulated (see Active_Accounts) """
+        active = self._active_accounts
+        accounts = active.update(self)
+
+        # 0. set the current day
+        for account in accounts:
+            account.set_day(self._ordinal, self._time)
+
+        # 1. execute start-of-day function
+        # everything that should happen before the money transfer
+        for account in accounts:
+            account.start_of_day()
+
+        # 2. execute all controller functions, which are due
+        for controller in self._controller:
+            controller(self)
+        for schedule in self._schedules:
+            if schedule.due(self._ordinal):
+                schedule.controller(self)
+        if self._payment_triggers and (self._payment_queue.next_date().toordinal() == self._ordinal):
+            payments = self._payment_queue.peek_day()
+            for trigger, controller in self._payment_triggers:
+                if any(trigger.matches(payment) for payment in payments):
+                    controller(self)
+
+        # 3. apply all payments for the day in correct temporal order
+        if self._payment_queue.next_date().toordinal() == self._ordinal:
+            for payment in self._payment_queue.pop_day():
+                if active._dormant:
+                    active.wake(payment['from_acc'], self)
+                    active.wake(payment['to_acc'], self)
+                self.make_transfer(payment)
+            # the next payments are determined right after the transfers, as
+            # stop criteria of regular payments may depend on them
+            self._payment_queue.advance()
+
+        # 4. execute end-of-day function
+        # everything that should happen after the money transfer
+        for account in active.accounts:
+            account.end_of_day()
+        active.put_aside()
+
+    def quiet_days(self):
+        """ Returns the number of days, starting with the current date, on
+        which neither a payment, nor a controller, nor any account
+        requires the simulation of the day """
+        # controllers without trigger need to be called every day
+        if self._controller:
+            return 0
+
+        active = self._active_accounts
+        active.register(self._accounts)
+        next_event = min(self._payment_queue.next_date().toordinal(), active.next_ordinal())
+        for schedule in self._schedules:
+            next_event = min(next_event, schedule.next)
+        for account in active.accounts:
+            next_event = min(next_event, account.next_event_date().toordinal())
+        return max(0, next_event - self._ordinal)
+
+    def skip_days(self, days):
+        """ Lets a given number of quiet days pass at once. The accounts
+        account for these days (e.g. by accruing interest) without
+        simulating them one by one """
+        for account in self._active_accounts.accounts:
+            account.skip_days(days)
+
+        self._day += days
+        self.set_ordinal(self._ordinal + days)
 
     def reports(self, interval='yearly'):
         """ Returns a tuple of reports for a given interval """
@@ -540,7 +871,7 @@ class Simulation(object):
             print(' ')
 
 
-class Account(object):
+class Account(Ordinal_Date):
     """ Basic class for all types of accounts with reporting and simulation
     functionality
 
@@ -553,8 +884,11 @@ class Account(object):
     - return_money
     """
 
-    def __init__(self, amount, interest, date=None, name = None, meta = {}):
-
+    def __init__(self, amount, interest, date=None, name = None, meta = {},
+                 report_level = 'transactions'):
+        """ report_level: level of detail of the report, either 'transactions',
+        'daily', 'monthly', 'yearly' or 'none'. For long simulations, coarser
+        levels keep the memory small, as only aggregated statuses are stored """
         self._date_start = validate.valid_date(date)
         self._name = validate.valid_name(name)
         self._meta = meta
@@ -568,7 +902,7 @@ class Account(object):
         ## that inherits from account                               ##
         
         # setting up the report and the semantics
-        self._report = Report(name = self._name)
+        self._report = Report(name = self._name, level = report_level)
 
         self._account = int(amount * 100)               # amount of money to start with
         self._interest = interest                       # interest rate
@@ -583,6 +917,36 @@ class Account(object):
     def __str__(self):
         return self._name
 
+    @property
+    def _sum_interest(self):
+        """ interest accrued since the last interest booking. Accrued days are
+        kept as exact integer balance-days per length of year, so that the
+        interest of any span of days is computed in one step """
+        accrued = 0
+        for days_per_year, balance_days in sorted(self._balance_days.items()):
+            accrued += balance_days * (self._interest / days_per_year)
+        return self._interest_offset + accrued
+
+    @_sum_interest.setter
+    def _sum_interest(self, value):
+        self._interest_offset = value
+        self._balance_days = {}
+
+    def accrue(self, days = 1):
+        """ Accrues the interest on the current account for a given number of
+        days, starting with the current date. Spans crossing the end of a year
+        are split into the parts of each year, as the daily interest depends
+        on the number of days per year """
+        ordinal = self._ordinal
+        while days > 0:
+            year_end = calendar_table.year_end(ordinal)
+            days_of_year = min(days, year_end - ordinal + 1)
+            days_per_year = calendar_table.days_per_year(ordinal)
+            self._balance_days[days_per_year] = (self._balance_days.get(days_per_year, 0) +
+                                                 self._caccount * days_of_year)
+            days -= days_of_year
+            ordinal = year_end + 1
+
     @property
     def date(self):
         return self._date
@@ -707,6 +1071,15 @@ class Account(object):
 
         self._current_date = date
 
+    def set_day(self, ordinal, time = None):
+        """ This function is called by the simulation class to set the current
+        date as day ordinal and time of the day, without creating a date """
+        delta = ordinal - self._ordinal
+        if delta != 1:
+            warnings.warn('Difference between current date and next date is %i and not 1' % delta)
+        self._time = time
+        self.set_ordinal(ordinal)
+
     def start_of_day(self):
         """ Things that should happen on the start of the day, before any money
         transfer happens """
@@ -717,6 +1090,36 @@ class Account(object):
         transfers have been accomplished """
         pass
 
+    def next_event_date(self):
+        """ Returns the next date on which this account needs to be simulated,
+        even if no payment is due. Event-driven simulations skip all days
+        before this date. By default, every day needs to be simulated """
+        return self._current_date + timedelta(days = 1)
+
+    def is_dormant(self):
+        """ Returns True, if nothing happens with the account apart from
+        payments and its next event date. Dormant accounts are not simulated
+        until then and catch up with skip_days. By default, accounts are
+        never dormant """
+        return False
+
+    def skip_days(self, days):
+        """ Lets a given number of days pass on which neither payments nor
+        any account-specific events happen. Accounts that overwrite
+        next_event_date need to account for these days here """
+        self.set_ordinal(self._ordinal + days)
+
+    def next_paydate(self):
+        """ Returns the next interest paydate after the current date """
+        paydate = Bank_Date(self._current_date.year,
+                            self._interest_paydate['month'],
+                            self._interest_paydate['day'])
+        if paydate.date() <= self._current_date.date():
+            paydate = Bank_Date(self._current_date.year + 1,
+                                self._interest_paydate['month'],
+                                self._interest_paydate['day'])
+        return paydate
+
 
 class DummyAccount(Account):
     """ This account is used when the user creates a Transfer using a
@@ -738,11 +1141,13 @@ class Bank_Account(Account):
     """ This is a normal bank account that can be used to manage income and
     outgoings within a normal household """
 
-    def __init__(self, amount, interest, date = None, name = None, meta = {}):
+    def __init__(self, amount, interest, date = None, name = None, meta = {},
+                 report_level = 'transactions'):
         """ Creates a bank account class """
         # call inherited method __init__
         super().__init__(
-            amount = amount, interest = interest, date = date, name = name, meta = meta)
+            amount = amount, interest = interest, date = date, name = name, meta = meta,
+            report_level = report_level)
 
         self._report_input = 0
         self._report_output = 0
@@ -822,8 +1227,8 @@ class Bank_Account(Account):
 
     def interest_time(self):
         """ Checks, whether it is time to book the interests to the account """
-        return ((self._current_date.day == self._interest_paydate['day']) and
-                (self._current_date.month == self._interest_paydate['month']))
+        return ((calendar_table.day(self._ordinal) == self._interest_paydate['day']) and
+                (calendar_table.month(self._ordinal) == self._interest_paydate['month']))
 
     def payment_input(self, account_str, payment, kind, description, meta):
         """ Input function for payments. This account is the receiver
@@ -879,19 +1284,24 @@ class Bank_Account(Account):
     def end_of_day(self):
         """ Things that should happen at the end of the day, after all money
         transfers have been accomplished """
-        # TODO: needs to be replaced by a mechanism that checks not every day
-        days_per_year = get_days_per_year(self._current_date.year)
-
-        # calculate interest for this day
-        interest = self._caccount * (self._interest / days_per_year)
-
-        # store interest for later calculations
-        self._sum_interest += interest
+        # store interest of this day for later calculations
+        self.accrue(1)
 
         # if paydate is there, add the summed interest to the account
         if self.interest_time():
             self.exec_interest_time()
 
+    def next_event_date(self):
+        """ Apart from payments, the account only needs to be simulated on
+        the interest paydate """
+        return self.next_paydate()
+
+    def skip_days(self, days):
+        """ Accrues the interest for days without any event """
+        self.set_ordinal(self._ordinal + 1)
+        self.accrue(days)
+        self.set_ordinal(self._ordinal + days - 1)
+
 
 class Loan(Account):
     """
@@ -899,13 +1309,15 @@ class Loan(Account):
     functionalities of account models
     """
 
-    def __init__(self, amount, interest, date = None, name = None, meta = {}):
+    def __init__(self, amount, interest, date = None, name = None, meta = {},
+                 report_level = 'transactions'):
         """
         Creates the data for a basic account model
         """
         # call inherited method __init__
         super().__init__(
-            amount = -amount, interest = interest, date = date, name = name, meta = meta)
+            amount = -amount, interest = interest, date = date, name = name, meta = meta,
+            report_level = report_level)
 
         # reporting functionality
         self._report_payment = 0
@@ -953,6 +1365,11 @@ class Loan(Account):
         interest for the current year """
         return (self._caccount + self._sum_interest) >= 0.
 
+    def is_dormant(self):
+        """ A loan, which has been payed back exactly, only reports
+        the interest on its paydate """
+        return (self._caccount == 0) and (self._sum_interest == 0)
+
     def make_report(self, payment = 0, interest = 0,
                     foreign_account = '', kind = '', description = '',
                     meta = {}):
@@ -987,8 +1404,8 @@ class Loan(Account):
 
     def interest_time(self):
         """ Checks, whether it is time to book the interests to the account """
-        return (((self._current_date.day == self._interest_paydate['day']) and
-                (self._current_date.month == self._interest_paydate['month'])) or
+        return (((calendar_table.day(self._ordinal) == self._interest_paydate['day']) and
+                (calendar_table.month(self._ordinal) == self._interest_paydate['month'])) or
                 (self._caccount > 0))
 
     def payment_input(self, account_str, payment, kind, description, meta):
@@ -1044,19 +1461,26 @@ class Loan(Account):
     def end_of_day(self):
         """ Things that should happen at the end of the day, after all money
         transfers have been accomplished """
-        # TODO: needs to be replaced by a mechanism that checks not every day
-        days_per_year = get_days_per_year(self._current_date.year)
-
-        # calculate interest for this day
-        interest = self._caccount * (self._interest / days_per_year)
-
-        # store interest for later calculations
-        self._sum_interest += interest
+        # store interest of this day for later calculations
+        self.accrue(1)
 
         # if paydate is there, add the summed interest to the account
         if self.interest_time():
             self.exec_interest_time()
 
+    def next_event_date(self):
+        """ Apart from payments, the loan only needs to be simulated on the
+        interest paydate or, if it has been overpaid, every day """
+        if self._caccount > 0:
+            return self._current_date + timedelta(days = 1)
+        return self.next_paydate()
+
+    def skip_days(self, days):
+        """ Accrues the interest for days without any event """
+        self.set_ordinal(self._ordinal + 1)
+        self.accrue(days)
+        self.set_ordinal(self._ordinal + days - 1)
+
 class Property(Account):
     """
     This class can be used to reflect the amount of property that is gained
@@ -1064,7 +1488,8 @@ class Property(Account):
     amount of property depending on the payments transfered to the loan class
     """
 
-    def __init__(self, property_value, amount, loan, date = None, name = None, meta = {}):
+    def __init__(self, property_value, amount, loan, date = None, name = None, meta = {},
+                 report_level = 'transactions'):
         """
         For a property with a given value (property_value), the current amount
         that is transfered to the owner (amount) is reflected by the amount of
@@ -1078,6 +1503,8 @@ class Property(Account):
         date           : date, for which this property starts to exist
         name           : name of this property
         meta           : meta-information        
+        report_level   : level of detail of the report, either 'transactions',
+                         'daily', 'monthly', 'yearly' or 'none'
         """
         
         assert isinstance(loan, Loan), 'loan must be of type Loan, but is in fact of type ' + str(type(loan))
@@ -1093,7 +1520,7 @@ class Property(Account):
         self._loan = loan
 
         # setting up the report and the semantics
-        self._report = Report(name = self._name)
+        self._report = Report(name = self._name, level = report_level)
 
         self._report.add_semantics('account', 'saving_abs')
         self._report.add_semantics('property_value', 'none')
@@ -1150,7 +1577,19 @@ class Property(Account):
         # this if-clause is included to avoid daily reporting. Reports are
         # just updates, if account volume changes or if if is the end of a year
         if ((new_caccount != self._caccount) or
-           ((self._current_date.day == 31) and
-             (self._current_date.month == 12))):
+           calendar_table.is_end_of_year(self._ordinal)):
             self._caccount = new_caccount
             self.make_report()
+
+    def is_dormant(self):
+        """ Once the loan has been payed back, the property only reports at
+        the end of each year """
+        return self._loan.is_dormant() and (self._caccount == self._property_value)
+
+    def next_event_date(self):
+        """ The property only changes, when the loan changes, which happens on
+        days of other events, and reports at the end of each year """
+        current = self._current_date
+        if (current.month == 12) and (current.day == 31):
+            return Bank_Date(current.year + 1, 12, 31)
+        return Bank_Date(current.year, 12, 31)
@@ -0,0 +1,152 @@
+'''
+Created on 17.10.2026
+
+Running many independent simulations on several CPU cores. Simulations
+contain lambda functions, which cannot be sent to other processes.
+Therefore, each scenario is given as a picklable callable that creates
+the simulation within the worker process, e.g. a function on module level
+or a functools.partial of it:
+
+    def plan(rate):
+        ...
+        return simulation
+
+    results = run_batch([partial(plan, rate) for rate in rates], workers = 8,
+                        delta = timedelta(days = 365 * 30))
+
+With a store, every worker writes the reports of its scenarios into a
+Report_Store, from which they can be memory-mapped afterwards.
+'''
+# standard libraries
+from concurrent.futures import ProcessPoolExecutor
+import os
+import traceback
+
+# own libraries
+from financial_life.financing.store import Report_Store
+
+# semantics for which report_sum_of is computed by default
+C_semantics = ('input', 'output', 'cost', 'win', 'debt', 'saving')
+
+
+class Batch_Result(object):
+    """ Compact result of one scenario of a batch """
+
+    def __init__(self, index, name = None, final = None, sums = None,
+                 yearly = None, stored = None, error = None):
+        self._index = index
+        self._name = name
+        self._final = final
+        self._sums = sums
+        self._yearly = yearly
+        self._stored = stored
+        self._error = error
+
+    @property
+    def index(self):
+        """ position of the scenario in the batch """
+        return self._index
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def final(self):
+        """ dictionary with the final value of every account """
+        return self._final
+
+    @property
+    def sums(self):
+        """ dictionary with report_sum_of for every semantic """
+        return self._sums
+
+    @property
+    def yearly(self):
+        """ dictionary with the yearly report of every account, if requested """
+        return self._yearly
+
+    @property
+    def stored(self):
+        """ names of the reports of all accounts in the store, if given """
+        return self._stored
+
+    @property
+    def error(self):
+        """ traceback of the error of this scenario or None """
+        return self._error
+
+    @property
+    def ok(self):
+        return self._error is None
+
+
+def run_scenario(index, scenario, simulate, semantics, yearly, store = None):
+    """ creates and simulates one scenario and returns a Batch_Result.
+    Errors are captured in the result """
+    try:
+        simulation = scenario()
+        simulation.simulate(**simulate)
+        final = {a.name: a.get_account() for a in simulation.accounts}
+        sums = {s: simulation.report_sum_of(s) for s in semantics}
+        reports = None
+        if yearly:
+            reports = {a.name: a.report.create_report('yearly') for a in simulation.accounts}
+        stored = None
+        if store is not None:
+            stored = Report_Store(store).add_simulation(simulation, prefix = 'scenario_%i' % index)
+        return Batch_Result(index, simulation.name, final, sums, reports, stored)
+    except Exception:
+        return Batch_Result(index, error = traceback.format_exc())
+
+
+def run_chunk(first, scenarios, simulate, semantics, yearly, store = None):
+    """ runs a chunk of scenarios within one worker process """
+    return [run_scenario(first + i, scenario, simulate, semantics, yearly, store)
+            for (i, scenario) in enumerate(scenarios)]
+
+
+def run_batch(scenarios, workers = None, chunksize = None,
+              date_stop = None, delta = None,
+              semantics = C_semantics, yearly = False, store = None):
+    """ Runs many independent scenarios on a pool of processes and returns
+    a list of Batch_Result in the order of the scenarios.
+
+    scenarios: picklable callables, which return a Simulation
+    workers:   number of processes, by default the number of CPUs. With
+               one worker, all scenarios run in the current process
+    chunksize: number of scenarios sent to a worker at once
+    date_stop, delta: arguments for Simulation.simulate
+    semantics: semantics for which report_sum_of is returned
+    yearly:    if True, the yearly reports of all accounts are returned
+    store:     directory of a Report_Store, to which the reports of all
+               accounts are written as 'scenario_<index>/<account>'
+
+    An error in one scenario is stored in its result and does not stop
+    the other scenarios """
+    scenarios = list(scenarios)
+    simulate = {'date_stop': date_stop, 'delta': delta}
+    if not workers:
+        workers = os.cpu_count() or 1
+
+    if workers == 1:
+        return run_chunk(0, scenarios, simulate, semantics, yearly, store)
+
+    if not chunksize:
+        chunksize = max(1, len(scenarios) // (workers * 4))
+
+    results = []
+    with ProcessPoolExecutor(max_workers = workers) as executor:
+        futures = [(first, executor.submit(run_chunk, first, scenarios[first:first + chunksize],
+                                           simulate, semantics, yearly, store))
+                   for first in range(0, len(scenarios), chunksize)]
+        for first, future in futures:
+            try:
+                results.extend(future.result())
+            except Exception:
+                # the whole chunk failed, e.g. because a scenario could not
+                # be sent to the worker process
+                error = traceback.format_exc()
+                size = len(scenarios[first:first + chunksize])
+                results.extend(Batch_Result(first + i, error = error) for i in range(size))
+    return results
@@ -0,0 +1,115 @@
+'''
+Created on 17.10.2026
+
+Storing the state of a simulation on disk and restoring it later. A
+checkpoint is a versioned, gzip-compressed pickle of the simulation with
+its accounts, reports and pending payments.
+
+Lambda functions and nested functions cannot be stored. Functions on module
+level are stored by reference. Functions that need variables of the plan,
+e.g. accounts, are created by a registered factory instead, which is called
+again with the restored variables when the checkpoint is loaded:
+
+    @register_callable('rate')
+    def rate(loan, value):
+        return lambda: min(value, -loan.account)
+
+    simulation.add_regular(account, loan, Registered_Callable('rate', loan, 1500),
+                           interval = 'monthly')
+'''
+# standard libraries
+import gzip
+import os
+import pickle
+
+C_format = 'financial_life checkpoint'
+C_version = 7
+
+# factories for callables, which can be stored in checkpoints
+registered_callables = {}
+
+
+def register_callable(name, factory = None):
+    """ registers a factory for callables under a given name. Can also be
+    used as decorator """
+    if factory is None:
+        def decorator(factory):
+            return register_callable(name, factory)
+        return decorator
+
+    if not callable(factory):
+        raise TypeError("factory must be callable but is of type " + str(type(factory)))
+    registered_callables[name] = factory
+    return factory
+
+
+class Registered_Callable(object):
+    """ Callable that is created by a registered factory with a given set of
+    arguments. Only the name and the arguments are stored, the callable is
+    created again when it is loaded or copied """
+
+    def __init__(self, name, *args, **kwargs):
+        self._name = name
+        self._args = args
+        self._kwargs = kwargs
+        self._func = self.create()
+
+    @property
+    def name(self):
+        return self._name
+
+    def create(self):
+        """ creates the callable with the registered factory """
+        if self._name not in registered_callables:
+            raise KeyError('No callable registered under the name "%s"' % self._name)
+        return registered_callables[self._name](*self._args, **self._kwargs)
+
+    def __call__(self, *args, **kwargs):
+        return self._func(*args, **kwargs)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_func']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._func = self.create()
+
+
+def save_checkpoint(simulation, path):
+    """ writes the simulation to path. The file is replaced only after
+    the checkpoint has been written completely """
+    header = {'format': C_format,
+              'version': C_version,
+              'name': simulation.name,
+              'date': simulation.current_date,
+              }
+    temp_path = str(path) + '.tmp'
+    try:
+        with gzip.open(temp_path, 'wb') as f:
+            pickle.dump(header, f, protocol = pickle.HIGHEST_PROTOCOL)
+            pickle.dump(simulation, f, protocol = pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, AttributeError, TypeError) as e:
+        os.remove(temp_path)
+        raise TypeError(("Simulation could not be stored: %s. Lambda and nested functions " +
+                         "must be replaced by a Registered_Callable") % e) from e
+    os.replace(temp_path, path)
+
+
+def load_header(f):
+    """ reads and checks the header of a checkpoint """
+    header = pickle.load(f)
+    if not isinstance(header, dict) or header.get('format') != C_format:
+        raise ValueError("File is not a checkpoint of a simulation")
+    if header['version'] != C_version:
+        raise ValueError("Checkpoint has version %s, but only version %i is supported" %
+                         (header['version'], C_version))
+    return header
+
+
+def load_checkpoint(path):
+    """ reads a simulation from path """
+    with gzip.open(path, 'rb') as f:
+        load_header(f)
+        return pickle.load(f)
@@ -0,0 +1,336 @@
+'''
+Created on 17.10.2026
+
+Simulating groups of accounts of one simulation, which never exchange money,
+on several CPU cores, e.g. separate households of one portfolio. Accounts
+are connected, if a payment is made between them, if a payment, a stop
+criterion or an account (like the loan of a property) refers to them, or if
+a controller has been declared to touch both of them:
+
+    simulation.add_controller(controller, trigger = 'monthly', accounts = [account, loan])
+    ...
+    simulate_parallel(simulation, delta = timedelta(days = 365 * 30), workers = 4)
+
+The connected components are distributed to forked worker processes. The
+changes of the accounts, pending payments and controller schedules are sent
+back and the statuses of all reports are appended to the reports in the
+order of a serial simulation. Therefore, the result is identical to
+Simulation.simulate. Controllers without declared accounts may touch every
+account, simulations with them are simulated in one process.
+
+Functions must refer to accounts by their closure, their arguments or
+global variables and must not keep state of their own, as only the changes
+of the simulation are sent back. If the result cannot be merged, e.g.
+because controllers of several groups added payments or because the changes
+refer to lambda functions created during the simulation, the simulation is
+simulated serially with a warning.
+'''
+# standard libraries
+from concurrent.futures import ProcessPoolExecutor
+import io
+import multiprocessing
+import os
+import pickle
+import warnings
+
+# own libraries
+from financial_life.financing import Report, Status, Payment, referenced_objects
+from financial_life.financing.accounts import Account
+from financial_life.calendar_help import Bank_Date
+
+# simulation, groups and shared objects, which are inherited by the
+# forked worker processes
+worker_state = None
+
+
+def find(parents, position):
+    """ returns the root of position in a union-find forest """
+    while parents[position] != position:
+        parents[position] = parents[parents[position]]
+        position = parents[position]
+    return position
+
+
+def components(simulation):
+    """ returns the connected components of the accounts of a simulation as
+    lists of positions in simulation.accounts, ordered by their first
+    position. Accounts of different components never exchange money """
+    accounts = simulation.accounts
+    positions = {id(account): position for position, account in enumerate(accounts)}
+    parents = list(range(len(accounts)))
+
+    def connect(values):
+        members = [positions[id(account)] for account in referenced_objects(values, Account, [])
+                   if id(account) in positions]
+        for position in members[1:]:
+            parents[find(parents, position)] = find(parents, members[0])
+
+    for account in accounts:
+        connect([account] + [value for value in vars(account).values() if isinstance(value, Account)])
+    for payment in simulation._payments.uniques:
+        connect([payment['from_acc'], payment['to_acc'], payment['payment']])
+    for regular in simulation._payments.regular:
+        connect([regular['from_acc'], regular['to_acc'], regular['payment'], regular['date_stop']])
+
+    declared = {id(controller): touched for controller, touched in simulation._controller_accounts}
+    controllers = (simulation._controller +
+                   [schedule.controller for schedule in simulation._schedules] +
+                   [controller for _, controller in simulation._payment_triggers])
+    for controller in controllers:
+        # controllers without declared accounts may touch every account
+        connect(list(declared.get(id(controller), accounts)))
+
+    result = {}
+    for position in range(len(accounts)):
+        result.setdefault(find(parents, position), []).append(position)
+    return sorted(result.values())
+
+
+def distribute(components, workers):
+    """ distributes components to at most workers groups with similar
+    numbers of accounts. Returns the positions of every group """
+    groups = [[] for _ in range(min(workers, len(components)))]
+    sizes = [0] * len(groups)
+    for component in sorted(components, key = len, reverse = True):
+        index = sizes.index(min(sizes))
+        groups[index].extend(component)
+        sizes[index] += len(component)
+    return [sorted(group) for group in groups]
+
+
+def group_of(accounts, owners):
+    """ returns the group of the first of accounts, which belongs to the
+    simulation, group 0 for names of accounts """
+    for account in accounts:
+        group = owners.get(id(account))
+        if group is not None:
+            return group
+    return 0
+
+
+def is_shared(obj):
+    """ returns True for objects, which are referred to by the changes of a
+    worker process instead of being copied """
+    return (isinstance(obj, (Account, Report, Payment)) or
+            (callable(obj) and not isinstance(obj, type)))
+
+
+class Shared_Pickler(pickle.Pickler):
+    """ Pickler, which stores the objects of a table of shared objects as
+    references. With collect, shared objects are added to the table """
+
+    def __init__(self, file, table, collect = False):
+        super().__init__(file, protocol = pickle.HIGHEST_PROTOCOL)
+        self._table = table
+        self._collect = collect
+
+    def persistent_id(self, obj):
+        if (id(obj) in self._table) and (self._table[id(obj)] is obj):
+            return id(obj)
+        if self._collect and is_shared(obj):
+            self._table[id(obj)] = obj
+            if isinstance(obj, Payment):
+                # payments created by workers share the description of the
+                # pending payments of their regular payment
+                self.collect_data(obj)
+            return id(obj)
+        return None
+
+    def collect_data(self, payment):
+        """ adds the description of payment and the objects it refers to
+        to the table """
+        data = payment._data
+        self._table[id(data)] = data
+        Shared_Pickler(io.BytesIO(), self._table, collect = True).dump(dict(data))
+
+
+class Shared_Unpickler(pickle.Unpickler):
+    """ Unpickler, which resolves the references of a Shared_Pickler """
+
+    def __init__(self, file, table):
+        super().__init__(file)
+        self._table = table
+
+    def persistent_load(self, pid):
+        return self._table[pid]
+
+
+def shared_objects(simulation):
+    """ returns a table of the accounts, reports, payments and functions of
+    a simulation by their id, including the descriptions of payments and
+    regular payments and the functions they refer to """
+    table = {}
+    regulars = simulation._payments.regular
+    Shared_Pickler(io.BytesIO(), table, collect = True).dump([dict(regular) for regular in regulars])
+    table.update((id(regular), regular) for regular in regulars)
+    Shared_Pickler(io.BytesIO(), table, collect = True).dump(simulation)
+    return table
+
+
+class Recorded_Report(Report):
+    """ Fork of a report in a worker process, which keeps the statuses
+    appended to it, so that they can be appended to the original report
+    afterwards. Controllers can read the whole report """
+
+    def __init__(self, report):
+        self.__dict__.update(vars(report.fork()))
+        self.appended = []
+
+    def append(self, status = None, date = None, **kwargs):
+        if date:
+            if type(date) is not Bank_Date:
+                date = Bank_Date.fromtimestamp(date.timestamp())
+            status = Status(date, **kwargs)
+        self.appended.append(status)
+        Report.append(self, status)
+
+
+def simulate_group(index):
+    """ simulates the accounts of group index in a worker process and
+    returns the changes of the simulation, pickled with references to the
+    shared objects """
+    simulation, groups, owners, simulate, table = worker_state
+    accounts = simulation._accounts
+    positions = groups[index]
+
+    # only the payments and controllers of the group remain
+    queue = simulation._payment_queue
+    queue.restrict(lambda payment: group_of((payment['from_acc'], payment['to_acc']), owners) == index)
+    queue.keys = []
+    declared = {id(controller): touched for controller, touched in simulation._controller_accounts}
+
+    def own(controller):
+        return group_of(declared.get(id(controller), ()), owners) == index
+
+    schedules = {i: schedule for i, schedule in enumerate(simulation._schedules)
+                 if own(schedule.controller)}
+    simulation._controller = [c for c in simulation._controller if own(c)]
+    simulation._schedules = list(schedules.values())
+    simulation._payment_triggers = [(t, c) for t, c in simulation._payment_triggers if own(c)]
+    simulation._active_accounts.restrict(positions)
+
+    reports = {position: accounts[position]._report for position in positions}
+    for position in positions:
+        accounts[position]._report = Recorded_Report(reports[position])
+    simulation._report = Recorded_Report(simulation._report)
+
+    payments = simulation._payments
+    sizes = (len(payments.uniques), len(payments.regular))
+    structure = (len(accounts), len(simulation._controller), len(simulation._schedules),
+                 len(simulation._payment_triggers), len(simulation._controller_accounts))
+
+    simulation.simulate(**simulate)
+
+    if structure != (len(accounts), len(simulation._controller), len(simulation._schedules),
+                     len(simulation._payment_triggers), len(simulation._controller_accounts)):
+        raise RuntimeError('accounts or controllers have been added during the simulation')
+    if len(simulation._report.appended) != len(queue.keys):
+        raise RuntimeError('transfers have been made without payments of the simulation')
+
+    changes = {'accounts': {},
+               'statuses': {},
+               'transfers': list(zip(queue.keys, simulation._report.appended)),
+               'schedules': schedules,
+               'active': simulation._active_accounts,
+               'day': simulation._day,
+               'ordinal': simulation._ordinal,
+               'payments': None,
+               }
+    for position in positions:
+        account = accounts[position]
+        changes['statuses'][position] = account._report.appended
+        account._report = reports[position]
+        changes['accounts'][position] = vars(account)
+    queue.keys = None
+    changes['queue'] = queue
+    if sizes != (len(payments.uniques), len(payments.regular)):
+        changes['payments'] = payments
+
+    f = io.BytesIO()
+    Shared_Pickler(f, table).dump(changes)
+    return f.getvalue()
+
+
+def run_groups(simulation, groups, simulate):
+    """ simulates every group in a forked worker process and returns their
+    changes. Raises an error, if they cannot be merged """
+    global worker_state
+    if simulation._payment_queue is None:
+        simulation._payment_queue = simulation._payments.payment(simulation._current_date)
+    simulation._active_accounts.register(simulation._accounts)
+    owners = {id(simulation._accounts[position]): index
+              for index, group in enumerate(groups) for position in group}
+    table = shared_objects(simulation)
+
+    worker_state = (simulation, groups, owners, simulate, table)
+    try:
+        with ProcessPoolExecutor(max_workers = len(groups),
+                                 mp_context = multiprocessing.get_context('fork')) as executor:
+            results = list(executor.map(simulate_group, range(len(groups))))
+    finally:
+        worker_state = None
+
+    changes = [Shared_Unpickler(io.BytesIO(result), table).load() for result in results]
+    if sum(change['payments'] is not None for change in changes) > 1:
+        raise RuntimeError('payments have been added to several groups of accounts')
+    return changes
+
+
+def merge(simulation, changes):
+    """ applies the changes of all groups to the simulation """
+    for change in changes:
+        for position, state in change['accounts'].items():
+            account = simulation._accounts[position]
+            vars(account).update(state)
+            for status in change['statuses'][position]:
+                account._report.append(status)
+        for i, schedule in change['schedules'].items():
+            simulation._schedules[i] = schedule
+        if change['payments'] is not None:
+            simulation._payments = change['payments']
+
+    # transfers are reported in the order of the queue of payments, like
+    # in a serial simulation
+    transfers = sorted((transfer for change in changes for transfer in change['transfers']),
+                       key = lambda transfer: transfer[0])
+    for _, status in transfers:
+        simulation._report.append(status)
+
+    simulation._payment_queue.combine([change['queue'] for change in changes])
+    simulation._active_accounts.combine([change['active'] for change in changes])
+    simulation._day = changes[0]['day']
+    simulation.set_ordinal(changes[0]['ordinal'])
+
+
+def simulate_parallel(simulation, date_stop = None, delta = None, workers = None):
+    """ Simulates the independent groups of accounts of a simulation (see
+    components) on a pool of processes. The result is identical to
+    simulation.simulate(date_stop, delta).
+
+    workers: number of processes, by default the number of CPUs. With one
+             worker or one group of accounts, the simulation is simulated
+             in the current process
+
+    Returns the groups of positions of accounts, which have been simulated
+    together """
+    simulate = {'date_stop': date_stop, 'delta': delta}
+    if not workers:
+        workers = os.cpu_count() or 1
+    groups = distribute(components(simulation), workers)
+    if len(groups) < 2:
+        simulation.simulate(**simulate)
+        return groups
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        warnings.warn('%s is simulated serially, as processes cannot be forked' % simulation.name)
+        simulation.simulate(**simulate)
+        return [sorted(position for group in groups for position in group)]
+
+    try:
+        changes = run_groups(simulation, groups, simulate)
+    except Exception as e:
+        # a serial simulation also reproduces errors of the simulation itself
+        warnings.warn('%s is simulated serially: %s' % (simulation.name, e))
+        simulation.simulate(**simulate)
+        return [sorted(position for group in groups for position in group)]
+    merge(simulation, changes)
+    return groups
@@ -0,0 +1,426 @@
+'''
+Created on 17.10.2026
+
+Sinks write the statuses of a report to a file while the simulation is
+running, instead of keeping them in memory. Statuses are buffered and
+written in blocks, only the buffer and the last status, which may still
+be replaced by reports with a coarser level of detail, are kept in memory.
+
+    simulation.stream_reports('reports', format = 'jsonl')
+    simulation.simulate(delta = timedelta(days = 365 * 100))
+    simulation.close_reports()
+
+    report = open_report('reports/Main_account.jsonl')
+    print(report.yearly())
+
+Reports opened from a file read their statuses lazily and are read-only.
+CSV files store meta-data as JSON in the column 'meta' and describe the
+report in a JSON file next to them. Empty strings cannot be told apart from
+missing values in CSV files and are read as missing values. Values, which
+are neither numbers nor strings, e.g. accounts in the report of the
+simulation, are written as strings. Parquet files require pyarrow.
+'''
+# standard libraries
+from itertools import islice
+import csv
+import json
+import os
+import re
+
+# third-party libraries
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# own libraries
+from financial_life.calendar_help import Bank_Date
+from financial_life.financing import Report, Status
+
+C_format = 'financial_life report'
+C_version = 1
+
+
+def file_name(name):
+    """ returns name with all characters, which should not be part of a
+    file name, replaced by underscores """
+    return re.sub(r'[^\w\-.]+', '_', name)
+
+
+def parse_value(value):
+    """ converts a value of a CSV file into int or float, if possible """
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+class Report_Sink(object):
+    """ Base class of all sinks. A sink is used as storage of the statuses
+    of a report. Subclasses implement start, write, sync, finish,
+    read_header and read for a particular file format """
+
+    extension = None
+
+    def __init__(self, path, buffer_size = 1000):
+        self._path = str(path)
+        self._buffer_size = buffer_size
+        self._buffer = []       # statuses, which have not been written yet
+        self._last = None       # last status, which may still be replaced
+        self._size = 0          # number of all statuses
+        self._written = 0       # number of statuses in the file
+        self._report = None
+        self._header = None
+        self._writable = True
+        self._closed = False
+
+    @classmethod
+    def reader(cls, path):
+        """ opens a file written by a sink of this class for reading """
+        sink = cls(path)
+        sink._writable = False
+        sink._size = None
+        sink._written = None
+        sink._header = sink.read_header()
+        if (sink._header.get('format') != C_format) or (sink._header.get('version') != C_version):
+            raise ValueError("%s has not been written by a report sink" % path)
+        return sink
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def header(self):
+        return self._header
+
+    def attach(self, report):
+        """ sets the report, whose description is written to the file """
+        self._report = report
+
+    def create_header(self):
+        report = self._report
+        return {'format': C_format,
+                'version': C_version,
+                'name': report.name,
+                'format_date': report._format_date,
+                'precision': report._precision,
+                'semantics': report._semantics,
+                'keys': list(report._keys),
+                }
+
+    def check_writable(self):
+        if not self._writable:
+            raise ValueError("report read from %s is read-only" % self._path)
+        if self._closed:
+            raise ValueError("sink for %s has already been closed" % self._path)
+
+    def append(self, status):
+        self.check_writable()
+        if self._last is not None:
+            self._buffer.append(self._last)
+            if len(self._buffer) >= self._buffer_size:
+                self.flush()
+        self._last = status
+        self._size += 1
+
+    def pop(self):
+        """ removes and returns the last status. Statuses before the last
+        one might be written already and cannot be removed anymore """
+        self.check_writable()
+        if self._last is None:
+            raise IndexError('only the last status can be removed from a sink')
+        status = self._last
+        self._last = None
+        self._size -= 1
+        return status
+
+    def flush(self):
+        """ writes all buffered statuses except the last one """
+        self.check_writable()
+        if self._header is None:
+            self._header = self.create_header()
+            self.start(self._header)
+        if self._buffer:
+            self.write(self._buffer)
+            self._written += len(self._buffer)
+            self._buffer = []
+
+    def close(self):
+        """ writes all remaining statuses and closes the file """
+        if self._closed or not self._writable:
+            return
+        if self._last is not None:
+            self._buffer.append(self._last)
+            self._last = None
+        self.flush()
+        self.finish()
+        self._closed = True
+
+    def __len__(self):
+        if self._size is None:
+            self._size = sum(1 for _ in self.read())
+        return self._size
+
+    def __iter__(self):
+        if self._written is None:
+            yield from self.read()
+            return
+        if self._written:
+            if not self._closed:
+                self.sync()
+            yield from islice(self.read(), self._written)
+        yield from list(self._buffer)
+        if self._last is not None:
+            yield self._last
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(islice(self, *index.indices(len(self))))
+        if index < 0:
+            index += len(self)
+        if (index < 0) or (self._size is not None and index >= self._size):
+            raise IndexError('status index out of range')
+        for status in islice(self, index, None):
+            return status
+        raise IndexError('status index out of range')
+
+    def date(self, index):
+        return self[index].date
+
+    def start(self, header):
+        """ opens the file and writes the description of the report """
+        raise NotImplementedError
+
+    def write(self, statuses):
+        """ writes a list of statuses """
+        raise NotImplementedError
+
+    def sync(self):
+        """ makes the statuses written so far readable """
+        raise NotImplementedError
+
+    def finish(self):
+        """ closes the file """
+        raise NotImplementedError
+
+    def read_header(self):
+        """ returns the description of the report """
+        raise NotImplementedError
+
+    def read(self):
+        """ iterates over all statuses in the file """
+        raise NotImplementedError
+
+
+class CSV_Sink(Report_Sink):
+    """ Writes statuses as rows of a CSV file with a column for every key
+    of the report. All keys need to be known when the first statuses are
+    written, which is the case for keys with semantics """
+
+    extension = 'csv'
+
+    def header_path(self):
+        return self._path + '.json'
+
+    def start(self, header):
+        with open(self.header_path(), 'w') as f:
+            json.dump(header, f)
+        self._columns = header['keys']
+        self._column_set = set(self._columns)
+        self._file = open(self._path, 'w', newline = '')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(['date'] + self._columns + ['meta'])
+
+    def write(self, statuses):
+        columns = self._columns
+        for status in statuses:
+            values = status._status
+            if not self._column_set.issuperset(values):
+                unknown = [key for key in values if key not in self._column_set]
+                raise ValueError('Key "%s" is not a column of %s' % (unknown[0], self._path))
+            row = [status.date.isoformat()]
+            row.extend('' if values.get(key) is None else values[key] for key in columns)
+            row.append(json.dumps(status._meta, default = str) if status._meta else '')
+            self._writer.writerow(row)
+
+    def sync(self):
+        self._file.flush()
+
+    def finish(self):
+        self._file.close()
+
+    def read_header(self):
+        with open(self.header_path()) as f:
+            return json.load(f)
+
+    def read(self):
+        with open(self._path, newline = '') as f:
+            reader = csv.reader(f)
+            columns = next(reader)[1:-1]
+            for row in reader:
+                values = {key: parse_value(value)
+                          for key, value in zip(columns, row[1:-1]) if value != ''}
+                meta = json.loads(row[-1]) if row[-1] else {}
+                yield Status(Bank_Date.fromisoformat(row[0]), meta = meta, **values)
+
+
+class JSONL_Sink(Report_Sink):
+    """ Writes one JSON object per status and line. The first line
+    describes the report """
+
+    extension = 'jsonl'
+
+    def start(self, header):
+        self._file = open(self._path, 'w')
+        self._file.write(json.dumps({'header': header}) + '\n')
+
+    def write(self, statuses):
+        lines = []
+        for status in statuses:
+            row = {'date': status.date.isoformat()}
+            row.update(status._status)
+            row['meta'] = status._meta
+            lines.append(json.dumps(row, default = str) + '\n')
+        self._file.writelines(lines)
+
+    def sync(self):
+        self._file.flush()
+
+    def finish(self):
+        self._file.close()
+
+    def read_header(self):
+        with open(self._path) as f:
+            return json.loads(f.readline())['header']
+
+    def read(self):
+        with open(self._path) as f:
+            next(f)
+            for line in f:
+                row = json.loads(line)
+                date = Bank_Date.fromisoformat(row.pop('date'))
+                meta = row.pop('meta', {})
+                yield Status(date, meta = meta, **row)
+
+
+class Parquet_Sink(Report_Sink):
+    """ Writes every block of statuses as row group of a Parquet file. The
+    types of the columns are determined by the first block: integers are
+    stored as floats, keys without values are stored as floats or, for
+    keys with the semantic 'none', as strings. The file can only be read
+    after the sink has been closed """
+
+    extension = 'parquet'
+
+    def __init__(self, path, buffer_size = 1000):
+        if pa is None:
+            raise ImportError("Parquet_Sink requires pyarrow")
+        super().__init__(path, buffer_size)
+        self._writer = None
+
+    def start(self, header):
+        self._columns = header['keys']
+
+    def create_schema(self, data):
+        """ creates the schema of the file for the first block of data """
+        descriptive = set(self._header['semantics'].get('none', []))
+        fields = [pa.field('date', pa.timestamp('us'))]
+        for key in self._columns:
+            kind = pa.array(data[key]).type
+            if pa.types.is_integer(kind) or (pa.types.is_null(kind) and key not in descriptive):
+                kind = pa.float64()
+            elif pa.types.is_null(kind):
+                kind = pa.string()
+            fields.append(pa.field(key, kind))
+        fields.append(pa.field('meta', pa.string()))
+        metadata = {b'financial_life': json.dumps(self._header).encode()}
+        return pa.schema(fields, metadata = metadata)
+
+    def write(self, statuses):
+        columns = self._columns
+        data = {key: [] for key in ['date'] + columns + ['meta']}
+        for status in statuses:
+            values = status._status
+            if any(key not in data for key in values):
+                unknown = [key for key in values if key not in data]
+                raise ValueError('Key "%s" is not a column of %s' % (unknown[0], self._path))
+            data['date'].append(status.date)
+            for key in columns:
+                data[key].append(values.get(key))
+            data['meta'].append(json.dumps(status._meta, default = str) if status._meta else None)
+
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self._path, self.create_schema(data))
+        schema = self._writer.schema_arrow
+        for key in columns:
+            kind = schema.field(key).type
+            if pa.types.is_string(kind):
+                data[key] = [None if value is None else str(value) for value in data[key]]
+            elif pa.types.is_floating(kind):
+                data[key] = [None if value is None else float(value) for value in data[key]]
+        self._writer.write_table(pa.Table.from_pydict(data, schema = schema))
+
+    def sync(self):
+        raise ValueError("%s can only be read after the sink has been closed" % self._path)
+
+    def finish(self):
+        if self._writer is None:
+            self.write([])
+        self._writer.close()
+
+    def read_header(self):
+        return json.loads(pq.read_schema(self._path).metadata[b'financial_life'])
+
+    def read(self):
+        for batch in pq.ParquetFile(self._path).iter_batches():
+            for row in batch.to_pylist():
+                date = row.pop('date')
+                meta = row.pop('meta')
+                values = {key: value for key, value in row.items() if value is not None}
+                yield Status(Bank_Date.combine(date.date(), date.time()),
+                             meta = json.loads(meta) if meta else {}, **values)
+
+
+# sinks for every file format
+C_sinks = {'csv': CSV_Sink,
+           'jsonl': JSONL_Sink,
+           'parquet': Parquet_Sink,
+           }
+
+
+def sink_class(path, format = None):
+    """ returns the class of sinks for format. The format is taken from the
+    extension of path, if it is not given """
+    if format is None:
+        format = os.path.splitext(str(path))[1][1:]
+    if format not in C_sinks:
+        raise ValueError("format must be one of '" + '\',\''.join(C_sinks) + "'")
+    return C_sinks[format]
+
+
+def create_sink(path, format = None, buffer_size = 1000):
+    """ creates a sink for path """
+    return sink_class(path, format)(path, buffer_size)
+
+
+def open_report(path, format = None):
+    """ opens a file written by a sink as read-only report. Statuses are
+    read from the file whenever the report is iterated """
+    sink = sink_class(path, format).reader(path)
+    header = sink.header
+    report = Report(name = header['name'],
+                    format_date = header['format_date'],
+                    precision = header['precision'],
+                    storage = 'list')
+    report._semantics = header['semantics']
+    report.register_keys(header['keys'])
+    report._statuses = sink
+    # dates are not bisected in files, between filters while reading
+    report._sorted = False
+    return report
@@ -0,0 +1,203 @@
+'''
+Created on 17.10.2026
+
+Goal seeking: finding the value of a parameter of a plan, for which an
+account reaches a target at a given date, e.g. the monthly rate, which pays
+back a loan by 2040. The varied payment is given with a Param expression:
+
+    rate = Param('rate', 1500)
+    simulation.add_regular(account, loan, minimum(rate, -account_value(loan)),
+                           interval = 'monthly', date_start = datetime(2020, 1, 1))
+    solution = solve(simulation, 'rate', loan, target = 0, date = datetime(2040, 1, 1),
+                     low = 0, high = 5000)
+    solution.value
+
+The value is searched between low and high by bracketing and secant steps.
+The simulation is only simulated once until the first payment, which
+depends on the parameter. Every iteration continues a fork of it and stops
+as soon as the outcome is decided, e.g. when a loan has been payed back.
+The metric of the account needs to be monotonous in the parameter.
+'''
+# standard libraries
+from datetime import datetime, timedelta
+
+# own libraries
+from financial_life.financing import referenced_objects
+from financial_life.financing.accounts import Loan, days_until
+from financial_life.financing.vectorized import Param
+from financial_life.financing import validate
+
+# number of days, after which iterations check, whether their outcome is decided
+C_check_days = 30
+
+
+class Solution(object):
+    """ Result of solve """
+
+    def __init__(self, value, result, simulation, iterations, converged):
+        self._value = value
+        self._result = result
+        self._simulation = simulation
+        self._iterations = iterations
+        self._converged = converged
+
+    @property
+    def value(self):
+        """ value of the parameter, with which the target is reached """
+        return self._value
+
+    @property
+    def result(self):
+        """ metric of the account at the date for value """
+        return self._result
+
+    @property
+    def simulation(self):
+        """ fork of the simulation with value, simulated until the date """
+        return self._simulation
+
+    @property
+    def iterations(self):
+        """ number of simulations with different values """
+        return self._iterations
+
+    @property
+    def converged(self):
+        """ False, if the maximal number of iterations has been reached
+        before the value has been determined with the requested precision """
+        return self._converged
+
+
+def get_account(account):
+    return account.get_account()
+
+
+def find_params(simulation, name):
+    """ returns all Param objects with a given name, on which payments,
+    stop criteria or controllers of a simulation depend """
+    values = [payment['payment'] for payment in simulation._payments.uniques]
+    values += [(regular['payment'], regular['date_stop']) for regular in simulation._payments.regular]
+    values += simulation._controller
+    values += [schedule.controller for schedule in simulation._schedules]
+    values += [controller for _, controller in simulation._payment_triggers]
+    return [param for param in referenced_objects(values, Param, []) if param.name == name]
+
+
+def first_use(simulation, name, date):
+    """ returns the date of the first payment of a simulation until date,
+    which depends on the parameter name """
+    controllers = (simulation._controller +
+                   [schedule.controller for schedule in simulation._schedules] +
+                   [controller for _, controller in simulation._payment_triggers])
+    if any(param.name == name for param in referenced_objects(controllers, Param, [])):
+        return simulation.current_date
+
+    if simulation._payment_queue is None:
+        simulation.update_payment_iterators()
+    first = date
+    for payment, regular in simulation._payment_queue.pending():
+        values = (payment['payment'], regular['date_stop'] if regular else None)
+        if any(param.name == name for param in referenced_objects(values, Param, [])):
+            first = min(first, payment['date'])
+    # the day of the payment is not simulated
+    return datetime(first.year, first.month, first.day)
+
+
+def evaluate(prefix, name, value, position, date, metric, decided):
+    """ simulates a fork of prefix with the parameter set to value until
+    date or until decided returns True. Returns the metric of the account
+    at position and the fork """
+    simulation = prefix.fork()
+    for param in find_params(simulation, name):
+        param.set_value(value)
+    account = simulation.accounts[position]
+    while days_until(simulation.current_date, date) > 0:
+        simulation.simulate(date_stop = date, delta = timedelta(days = C_check_days))
+        if (decided is not None) and decided(account):
+            break
+    return metric(account), simulation
+
+
+def solve(simulation, param, account, target, date, low, high,
+          metric = None, decided = None, xtol = 0.01, max_iterations = 50):
+    """ Returns the Solution with the value of param between low and high,
+    for which the metric of account reaches target at date. The simulation
+    itself is not changed.
+
+    param:    a Param (or its name), on which payments of the simulation depend
+    account:  account of the simulation, whose metric is compared to target
+    metric:   function of the account, by default its get_account()
+    decided:  function of the account, which returns True, if the metric at
+              date is already known, e.g. because a loan has been payed back.
+              This is the default for loans and the default metric
+    xtol:     precision of the value
+
+    The metric is assumed to be monotonous in the parameter. Values, for
+    which the metric is at least target, reach it. Of low and high, exactly
+    one needs to reach target. The returned value reaches the target and is
+    the closest to the values, which do not reach it """
+    date = validate.valid_date(date)
+    name = param.name if isinstance(param, Param) else param
+    if not find_params(simulation, name):
+        raise ValueError('No payment of the simulation depends on the parameter "%s"' % name)
+    if account not in simulation.accounts:
+        raise ValueError('%s is not an account of the simulation' % account.name)
+    position = simulation.accounts.index(account)
+    if metric is None:
+        metric = get_account
+        if (decided is None) and isinstance(account, Loan):
+            decided = Loan.is_finished
+
+    # everything before the first payment depending on the parameter is
+    # simulated only once
+    prefix = simulation.fork()
+    prefix.simulate(date_stop = first_use(prefix, name, date))
+
+    def distance(value):
+        result, fork = evaluate(prefix, name, value, position, date, metric, decided)
+        return result - target, result, fork
+
+    low_distance, low_result, low_fork = distance(low)
+    high_distance, high_result, high_fork = distance(high)
+    iterations = 2
+    if (low_distance >= 0) == (high_distance >= 0):
+        raise ValueError('target %s is %s reached with %s and %s' %
+                         (target, 'always' if low_distance >= 0 else 'never', low, high))
+
+    # the bracket [missed, reached] always contains the boundary
+    if high_distance >= 0:
+        reached = (high, high_distance, high_result, high_fork)
+        missed = (low, low_distance)
+    else:
+        reached = (low, low_distance, low_result, low_fork)
+        missed = (high, high_distance)
+
+    retained = None
+    while (abs(reached[0] - missed[0]) > xtol) and (iterations < max_iterations):
+        # secant step between both ends of the bracket (regula falsi). If
+        # the metric does not change beyond the target, e.g. for payed back
+        # loans, the bracket is bisected
+        value = (reached[0] + missed[0]) / 2
+        if reached[1] > 0:
+            secant = missed[0] - missed[1] * (reached[0] - missed[0]) / (reached[1] - missed[1])
+            if min(reached[0], missed[0]) < secant < max(reached[0], missed[0]):
+                value = secant
+        value_distance, result, fork = distance(value)
+        iterations += 1
+
+        # an end, which is retained twice, is weighted down (Illinois method)
+        if value_distance >= 0:
+            reached = (value, value_distance, result, fork)
+            if retained == 'missed':
+                missed = (missed[0], missed[1] / 2)
+            retained = 'missed'
+        else:
+            missed = (value, value_distance)
+            if retained == 'reached':
+                reached = reached[:1] + (reached[1] / 2,) + reached[2:]
+            retained = 'reached'
+
+    value, _, result, fork = reached
+    # iterations, which have been stopped early, are completed
+    fork.simulate(date_stop = date)
+    return Solution(value, result, fork, iterations, abs(reached[0] - missed[0]) <= xtol)
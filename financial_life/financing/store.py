@@ -0,0 +1,186 @@
+'''
+Created on 17.10.2026
+
+On-disk store for the reports of many simulations. Every report is kept in
+a directory with a file of int32 day ordinals ('date.i32'), a file of int64
+cents for every numerical key ('<key>.i64') and a description of the report
+('report.json'). Values are rounded to cents. Keys with other values, e.g.
+descriptions of payments, are not stored.
+
+    store = Report_Store('results')
+    store.add_simulation(simulation, prefix = 'scenario_1')
+    ...
+    report = store.report('scenario_1/Main_account')
+    report.yearly()
+    cents = report._statuses.cents('account')   # numpy.memmap, not copied
+
+Files are only appended to and opened as numpy.memmap for reading, so that
+processes can write to different reports of the same store at the same time
+and analyses do not need to load the whole store into memory.
+'''
+# standard libraries
+import json
+import os
+
+# third-party libraries
+import numpy as np
+
+# own libraries
+from financial_life.financing import Report, Memmap_Column, Memmap_Columns, C_no_cents
+from financial_life.financing.sinks import file_name
+
+C_format = 'financial_life store'
+C_version = 1
+C_description = 'report.json'
+C_dates = 'date.i32'
+
+
+def is_number(value):
+    return isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, bool)
+
+
+def to_cents(values):
+    """ converts a list of values, in which missing values are None, into
+    an int64 array of cents """
+    return np.array([C_no_cents if value is None else int(round(value * 100))
+                     for value in values], dtype = np.int64)
+
+
+def write_after(path, values, size):
+    """ writes values to the file after its first size entries. Entries
+    after them, e.g. of an interrupted write, are overwritten """
+    with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+        f.truncate(size * values.itemsize)
+        f.seek(size * values.itemsize)
+        values.tofile(f)
+
+
+class Report_Store(object):
+    """ Directory of reports, which are stored as memory-mapped columns """
+
+    def __init__(self, directory):
+        self._directory = str(directory)
+        os.makedirs(self._directory, exist_ok = True)
+
+    @property
+    def directory(self):
+        return self._directory
+
+    def path(self, name, file = ''):
+        return os.path.join(self._directory, name, file)
+
+    def description(self, name):
+        """ returns the description of a stored report or None """
+        path = self.path(name, C_description)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            description = json.load(f)
+        if (description.get('format') != C_format) or (description.get('version') != C_version):
+            raise ValueError("%s has not been written by a report store" % path)
+        return description
+
+    def names(self):
+        """ returns the names of all reports in the store """
+        result = []
+        for directory, _, files in os.walk(self._directory):
+            if C_description in files:
+                result.append(os.path.relpath(directory, self._directory).replace(os.sep, '/'))
+        return sorted(result)
+
+    def __contains__(self, name):
+        return os.path.exists(self.path(name, C_description))
+
+    def append(self, report, name = None):
+        """ appends the statuses of report to the stored report name, which
+        is by default the name of the report. Returns the name """
+        if name is None:
+            name = file_name(report.name)
+        os.makedirs(self.path(name), exist_ok = True)
+        description = self.description(name)
+        size = description['size'] if description else 0
+        keys = list(description['keys']) if description else []
+
+        # values of every key, None for statuses without the key
+        ordinals = []
+        values = {}
+        for position, status in enumerate(report):
+            ordinals.append(status.date.toordinal())
+            for key, value in status.status.items():
+                if key not in values:
+                    values[key] = [None] * position
+                values[key].append(value)
+            for column in values.values():
+                if len(column) <= position:
+                    column.append(None)
+
+        count = len(ordinals)
+        for key in keys:
+            column = values.get(key, ())
+            if not all(value is None or is_number(value) for value in column):
+                raise TypeError('Values of key "%s" of report %s are not numerical' % (key, name))
+        new_keys = [key for key in report._keys
+                    if (key not in keys) and (key in values) and
+                    all(value is None or is_number(value) for value in values[key])]
+
+        write_after(self.path(name, C_dates), np.array(ordinals, dtype = np.int32), size)
+        for key in keys:
+            cents = to_cents(values.get(key, [None] * count))
+            write_after(self.path(name, key + '.i64'), cents, size)
+        for key in new_keys:
+            # earlier statuses of the stored report do not have the key
+            cents = np.concatenate((np.full(size, C_no_cents, dtype = np.int64),
+                                    to_cents(values[key])))
+            write_after(self.path(name, key + '.i64'), cents, 0)
+        keys.extend(new_keys)
+
+        # the description is replaced at once, readers never see more
+        # statuses than have been written completely
+        description = {'format': C_format,
+                       'version': C_version,
+                       'name': report.name,
+                       'format_date': report._format_date,
+                       'semantics': report._semantics,
+                       'keys': keys,
+                       'size': size + count,
+                       }
+        temp_path = self.path(name, C_description + '.tmp')
+        with open(temp_path, 'w') as f:
+            json.dump(description, f)
+        os.replace(temp_path, self.path(name, C_description))
+        return name
+
+    def add_simulation(self, simulation, prefix = None):
+        """ appends the reports of all accounts of a simulation. With a
+        prefix, e.g. the number of a scenario, the reports are stored in
+        the directory prefix. Returns the names of the reports """
+        names = []
+        for account in simulation.accounts:
+            name = file_name(account.name)
+            if prefix is not None:
+                name = '%s/%s' % (prefix, name)
+            names.append(self.append(account.report, name))
+        return names
+
+    def report(self, name):
+        """ returns the stored report name as read-only report, whose
+        columns are memory-mapped """
+        description = self.description(name)
+        if description is None:
+            raise KeyError('No report "%s" in %s' % (name, self._directory))
+        size = description['size']
+        if size:
+            ordinals = np.memmap(self.path(name, C_dates), dtype = np.int32, mode = 'r',
+                                 shape = (size,))
+        else:
+            ordinals = np.zeros(0, dtype = np.int32)
+        columns = {key: Memmap_Column(self.path(name, key + '.i64'), size)
+                   for key in description['keys']}
+
+        report = Report(name = description['name'],
+                        format_date = description['format_date'],
+                        storage = 'list')
+        report._semantics = description['semantics']
+        report.register_keys(description['keys'])
+        report._statuses = Memmap_Columns(ordinals, columns)
+        return report
@@ -0,0 +1,56 @@
+'''
+Created on 17.10.2026
+
+Tests for running batches of simulations
+'''
+# standard libraries
+from datetime import timedelta, datetime
+from functools import partial
+import unittest
+import warnings
+
+# own libraries
+from financial_life.financing import accounts as a
+from financial_life.financing.batch import run_batch
+
+
+def plan(rate):
+    """ scenario with a loan that is payed back with a given rate """
+    if rate < 0:
+        raise ValueError('rate must be positive')
+    account = a.Bank_Account(amount = 1000, interest = 0.001, name = 'Main account', date = datetime(2016, 9, 1))
+    loan = a.Loan(amount = 50000, interest = 0.02, name = 'Loan', date = datetime(2016, 9, 1))
+    simulation = a.Simulation(account, loan, name = 'Rate %i' % rate, date = datetime(2016, 9, 1))
+    simulation.add_regular('Income', account, 2000, interval = 'monthly')
+    simulation.add_regular(account, loan, lambda: min(rate, -loan.account), interval = 'monthly')
+    return simulation
+
+
+class Test_Batch(unittest.TestCase):
+
+    def setUp(self):
+        warnings.simplefilter('ignore')
+        self.scenarios = [partial(plan, rate) for rate in (500, 1000, -1, 1500)]
+
+    def test_batch(self):
+        results = run_batch(self.scenarios, workers = 2, chunksize = 1,
+                            delta = timedelta(days = 365 * 3), yearly = True)
+        self.assertEqual([r.index for r in results], [0, 1, 2, 3])
+        self.assertEqual([r.ok for r in results], [True, True, False, True])
+        self.assertIn('rate must be positive', results[2].error)
+
+        simulation = plan(1000)
+        simulation.simulate(delta = timedelta(days = 365 * 3))
+        self.assertEqual(results[1].name, 'Rate 1000')
+        self.assertEqual(results[1].final['Loan'], simulation.accounts[1].get_account())
+        self.assertEqual(results[1].sums['cost'], simulation.report_sum_of('cost'))
+        self.assertEqual(results[1].yearly['Loan'].interest,
+                         simulation.accounts[1].report.yearly().interest)
+
+    def test_single_worker(self):
+        results = run_batch(self.scenarios, workers = 1, delta = 100)
+        self.assertEqual([r.ok for r in results], [True, True, False, True])
+
+
+if __name__ == "__main__":
+    unittest.main()
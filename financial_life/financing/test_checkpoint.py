@@ -0,0 +1,91 @@
+'''
+Created on 17.10.2026
+
+Tests for storing and restoring simulations
+'''
+# standard libraries
+from datetime import timedelta, datetime
+import gzip
+import os
+import pickle
+import tempfile
+import unittest
+import warnings
+
+# own libraries
+from financial_life.financing import accounts as a
+from financial_life.financing.checkpoint import register_callable, Registered_Callable
+
+
+@register_callable('test_rate')
+def rate(loan, value):
+    return lambda: min(value, -loan.account)
+
+
+@register_callable('test_finished')
+def finished(loan):
+    return lambda cdate: loan.is_finished()
+
+
+def controller(s):
+    """ moves money to the savings account on the first of a month """
+    if s.current_date.day == 1:
+        s.add_unique(s.accounts[0], s.accounts[1], 100, s.current_date, name = 'Saving')
+
+
+def create_simulation():
+    account = a.Bank_Account(amount = 1000, interest = 0.001, name = 'Main account', date = datetime(2016, 9, 1))
+    savings = a.Bank_Account(amount = 5000, interest = 0.013, name = 'Savings', date = datetime(2016, 9, 1))
+    loan = a.Loan(amount = 30000, interest = 0.02, name = 'Loan', date = datetime(2016, 9, 1))
+    simulation = a.Simulation(account, savings, loan, name = 'Checkpoint', date = datetime(2016, 9, 1))
+    simulation.add_regular('Income', account, 2000, interval = 'monthly', day = 15)
+    simulation.add_regular(account, loan, Registered_Callable('test_rate', loan, 900),
+                           interval = 'monthly', day = 31,
+                           date_stop = Registered_Callable('test_finished', loan))
+    simulation.add_unique(savings, 'Car', 3000, datetime(2018, 6, 2))
+    simulation.add_controller(controller)
+    return simulation
+
+
+def report_data(report):
+    return [(s.date, s.status) for s in report]
+
+
+class Test_Checkpoint(unittest.TestCase):
+
+    def setUp(self):
+        warnings.simplefilter('ignore')
+        handle, self.path = tempfile.mkstemp(suffix = '.ckpt')
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_resume(self):
+        simulation = create_simulation()
+        simulation.simulate(delta = timedelta(days = 500))
+        simulation.checkpoint(self.path)
+        restored = a.Simulation.restore(self.path)
+        self.assertEqual(restored.current_date, simulation.current_date)
+        restored.simulate(delta = timedelta(days = 1500))
+
+        reference = create_simulation()
+        reference.simulate(delta = timedelta(days = 2000))
+        for acc, acc_reference in zip(restored.accounts, reference.accounts):
+            self.assertEqual(report_data(acc.report), report_data(acc_reference.report))
+            self.assertEqual(acc._sum_interest, acc_reference._sum_interest)
+        self.assertTrue(reference.accounts[2].is_finished())
+
+    def test_lambda(self):
+        simulation = create_simulation()
+        simulation.add_regular('Income', simulation.accounts[0], lambda: 10, interval = 'monthly')
+        self.assertRaises(TypeError, simulation.checkpoint, self.path)
+
+    def test_version(self):
+        with gzip.open(self.path, 'wb') as f:
+            pickle.dump({'format': 'financial_life checkpoint', 'version': 0}, f)
+        self.assertRaises(ValueError, a.Simulation.restore, self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,7 +8,9 @@ Created on Thu Jun 23 21:40:47 2016
 import unittest
 import financial_life.financing as financing
 from financial_life.calendar_help import Bank_Date
-from datetime import datetime
+from datetime import datetime, date
+from copy import deepcopy
+from itertools import islice
 
 class Test_Create_Stop_Criteria(unittest.TestCase):
 
@@ -94,6 +96,38 @@ class TestRegular_Month_Payment(unittest.TestCase):
         payment = next(iterator)
         self.assertEqual(payment['date'], datetime(2015,2,28))
 
+    def test_shorter_first_month(self):
+        # the day is reduced to the length of the first month
+        iterator = financing.iter_regular_month(self.lastcal, date_start = datetime(2015,4, 1))
+        dates = [payment['date'] for payment in iterator]
+        self.assertEqual(dates, [datetime(2015,4,30), datetime(2015,5,30)])
+
+    def test_callable_stop(self):
+        self.infinite['date_stop'] = lambda cdate: cdate.year == 2017
+        iterator = financing.iter_regular_month(self.infinite, date_start = datetime(2016,12, 1))
+        dates = [payment['date'] for payment in iterator]
+        self.assertEqual(dates, [datetime(2016,12,15)])
+
+    def test_long_schedule(self):
+        iterator = financing.iter_regular_month(self.infinite, skip = 1000)
+        payment = next(iterator)
+        self.assertEqual(payment['date'], datetime(2098,7,15))
+        dates = [payment['date'] for payment in iterator]
+        self.assertEqual(dates[-1], datetime(9999,12,15))
+        self.assertEqual(len(dates), (9999 - 2098) * 12 + 5)
+
+    def test_shared_description(self):
+        iterator = financing.iter_regular_month(self.infinite)
+        first, second = next(iterator), next(iterator)
+        self.assertIs(first._data, second._data)
+        self.assertEqual((first['date'], second.date, second['name'], second.kind),
+                         (datetime(2015,3,15), datetime(2015,4,15), 'Test', 'regular'))
+
+    def test_cached_schedule(self):
+        schedule = financing.compile_schedule(0, 15, 200)
+        self.assertIs(schedule, financing.compile_schedule(0, 15, 200))
+        self.assertFalse(schedule.flags.writeable)
+
 
 class TestRegular_Year_Payment(unittest.TestCase):
 
@@ -152,5 +186,109 @@ class TestRegular_Year_Payment(unittest.TestCase):
         self.assertEqual(payment['date'], datetime(2017,3,15))
         self.assertRaises(StopIteration, next, iterator)
 
+    def test_leap_day(self):
+        self.infinite['date_start'] = Bank_Date(2016, 2, 29)
+        iterator = financing.iter_regular_year(self.infinite, date_start = datetime(2016,3, 1))
+        dates = [next(iterator)['date'] for i in range(4)]
+        self.assertEqual(dates, [datetime(2017,2,28), datetime(2018,2,28),
+                                 datetime(2019,2,28), datetime(2020,2,29)])
+
+class TestRecurrence(unittest.TestCase):
+
+    def dates(self, recurrence, date_start, size, day = 1):
+        return [date.fromordinal(ordinal) for ordinal in recurrence.ordinals(date_start, size, day)]
+
+    def test_weekly(self):
+        recurrence = financing.Recurrence('weekly', step = 2, by_day = 4)
+        self.assertEqual(self.dates(recurrence, Bank_Date(2016, 9, 1), 3),
+                         [date(2016, 9, 2), date(2016, 9, 16), date(2016, 9, 30)])
+        recurrence = financing.Recurrence('weekly', by_day = (0, 2))
+        self.assertEqual(self.dates(recurrence, Bank_Date(2016, 9, 6), 3),
+                         [date(2016, 9, 7), date(2016, 9, 12), date(2016, 9, 14)])
+
+    def test_monthly(self):
+        recurrence = financing.Recurrence('monthly', by_month = (3, 6, 9, 12), end_of_month = True)
+        self.assertEqual(self.dates(recurrence, Bank_Date(2016, 4, 10), 3),
+                         [date(2016, 6, 30), date(2016, 9, 30), date(2016, 12, 31)])
+        recurrence = financing.Recurrence('monthly', step = 3)
+        self.assertEqual(self.dates(recurrence, Bank_Date(2016, 1, 31), 3, day = 31),
+                         [date(2016, 1, 31), date(2016, 4, 30), date(2016, 7, 31)])
+        # days reduced to the same end of the month occur once
+        recurrence = financing.Recurrence('monthly', by_day = (15, 30, 31))
+        self.assertEqual(self.dates(recurrence, Bank_Date(2016, 2, 1), 3),
+                         [date(2016, 2, 15), date(2016, 2, 29), date(2016, 3, 15)])
+
+    def test_yearly(self):
+        recurrence = financing.Recurrence('yearly', by_month = (1, 7), by_day = 31, count = 3)
+        self.assertEqual(self.dates(recurrence, Bank_Date(2016, 5, 3), 5),
+                         [date(2016, 7, 31), date(2017, 1, 31), date(2017, 7, 31)])
+        recurrence = financing.Recurrence('yearly', step = 2)
+        self.assertEqual(self.dates(recurrence, Bank_Date(2016, 2, 29), 2),
+                         [date(2016, 2, 29), date(2018, 2, 28)])
+
+    def test_until(self):
+        recurrence = financing.Recurrence('daily', step = 10, until = '2016-01-31')
+        self.assertEqual(self.dates(recurrence, Bank_Date(2016, 1, 1), 5),
+                         [date(2016, 1, 1), date(2016, 1, 11), date(2016, 1, 21), date(2016, 1, 31)])
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, financing.Recurrence, 'hourly')
+        self.assertRaises(ValueError, financing.Recurrence, 'monthly', step = 0)
+        self.assertRaises(ValueError, financing.Recurrence, 'weekly', by_day = 7)
+        self.assertRaises(ValueError, financing.Recurrence, 'monthly', by_month = 13)
+
+    def test_payments(self):
+        payments = financing.PaymentList()
+        payments.add_regular('A', 'B', 10, 'quarter_year', datetime(2016, 1, 1), day = 15, name = 'q')
+        payments.add_regular('A', 'B', 10, financing.Recurrence('weekly', step = 2),
+                             datetime(2016, 4, 1), name = 'w', date_stop = datetime(2016, 5, 1))
+        queue = payments.payment(datetime(2016, 4, 1))
+        groups = [(group[0]['date'], [p['name'] for p in group]) for group in islice(queue, 4)]
+        self.assertEqual(groups, [(datetime(2016, 4, 1), ['w']),
+                                  (datetime(2016, 4, 15), ['w']),
+                                  (datetime(2016, 4, 29), ['w']),
+                                  (datetime(2016, 6, 15), ['q'])])
+        # the queue continues after being copied
+        copied = deepcopy(queue)
+        self.assertEqual(next(copied)[0]['date'], datetime(2016, 9, 15))
+        self.assertRaises(ValueError, payments.add_regular, 'A', 'B', 10, 'hourly', datetime(2016, 1, 1))
+
+
+class TestPaymentList(unittest.TestCase):
+
+    def setUp(self):
+        self.payments = financing.PaymentList()
+        self.payments.add_unique('A', 'B', 10, datetime(2016, 2, 1), name = 'u1')
+        self.payments.add_unique('A', 'B', 10, datetime(2016, 1, 15), name = 'u2')
+        self.payments.add_unique('A', 'B', 10, datetime(2016, 2, 1), name = 'u3')
+        self.payments.add_regular('A', 'B', 10, 'monthly', datetime(2016, 1, 1), day = 1, name = 'r1')
+        self.payments.add_regular('A', 'B', 10, 'yearly', datetime(2016, 2, 1), name = 'r2')
+
+    def test_grouping_and_order(self):
+        groups = self.payments.payment(datetime(2016, 1, 1))
+        self.assertEqual([p['name'] for p in next(groups)], ['r1'])
+        self.assertEqual([p['name'] for p in next(groups)], ['u2'])
+        self.assertEqual([p['name'] for p in next(groups)], ['u1', 'u3', 'r1', 'r2'])
+        self.assertEqual([p['name'] for p in next(groups)], ['r1'])
+
+    def test_start_date(self):
+        groups = self.payments.payment(datetime(2016, 1, 16))
+        group = next(groups)
+        self.assertEqual(group[0]['date'], datetime(2016, 2, 1))
+        self.assertEqual(len(group), 4)
+
+    def test_insert_into_running_queue(self):
+        queue = self.payments.payment(datetime(2016, 1, 1))
+        next(queue)
+        unique = self.payments.add_unique('A', 'B', 10, datetime(2016, 2, 1), name = 'u4')
+        queue.add_unique(unique, datetime(2016, 1, 2))
+        regular = self.payments.add_regular('A', 'B', 10, 'monthly', datetime(2016, 1, 20), day = 20, name = 'r3')
+        queue.add_regular(regular, len(self.payments.regular) - 1, datetime(2016, 1, 2))
+        self.assertEqual([p['name'] for p in next(queue)], ['u2'])
+        self.assertEqual([p['name'] for p in next(queue)], ['r3'])
+        self.assertEqual([p['name'] for p in next(queue)], ['u1', 'u3', 'u4', 'r1', 'r2'])
+        self.assertEqual([u['name'] for u in self.payments.uniques], ['u2', 'u1', 'u3', 'u4'])
+
+
 if __name__ == '__main__':
     unittest.main()
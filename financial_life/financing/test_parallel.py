@@ -0,0 +1,149 @@
+'''
+Created on 17.10.2026
+
+Tests for simulating independent groups of accounts in parallel
+'''
+# standard libraries
+from datetime import timedelta, datetime
+import unittest
+import warnings
+
+# own libraries
+from financial_life.financing import accounts as a
+from financial_life.financing.parallel import components, simulate_parallel
+from financial_life.financing.test_simulation import report_data
+
+
+def add_household(simulation, i):
+    """ adds the accounts and payments of a household to the simulation,
+    similar to create_simulation """
+    date = datetime(2016, 9, 1)
+    account = simulation.add_account(a.Bank_Account(amount = 1000, interest = 0.001,
+                                                    name = 'Main account %i' % i, date = date))
+    savings = simulation.add_account(a.Bank_Account(amount = 5000, interest = 0.013,
+                                                    name = 'Savings %i' % i, date = date))
+    loan = simulation.add_account(a.Loan(amount = 100000 - 20000 * i, interest = 0.01,
+                                         name = 'House Credit %i' % i, date = date))
+    simulation.add_account(a.Property(100000, 0, loan, name = 'House %i' % i, date = date))
+
+    simulation.add_regular('Income', account, 2000 + 100 * i, interval = 'monthly',
+                           date_start = datetime(2016, 9, 15), day = 15, name = 'Income')
+    simulation.add_regular(account, savings, 500, interval = 'monthly',
+                           date_start = datetime(2016, 9, 30), day = 30, name = 'Savings')
+    simulation.add_regular(account, loan, 1000, interval = 'monthly',
+                           date_start = datetime(2016, 9, 15), day = 15, name = 'Debts',
+                           fixed = False, date_stop = lambda cdate: loan.is_finished())
+    simulation.add_regular(account, loan, lambda: min(8000, max(0, account.get_account() - 4000)),
+                           interval = 'yearly', date_start = datetime(2016, 11, 20), day = 20,
+                           name = 'Debts', fixed = False, date_stop = lambda cdate: loan.is_finished())
+    simulation.add_unique(savings, 'Vendor for car', 10000, datetime(2019, 3, 17))
+
+
+def portfolio(households, event_driven = False):
+    """ simulation of several households, which never exchange money """
+    simulation = a.Simulation(name = 'Portfolio', date = datetime(2016, 9, 1),
+                              event_driven = event_driven)
+    for i in range(households):
+        add_household(simulation, i)
+    return simulation
+
+
+def transfers(simulation):
+    """ report of the simulation with names instead of accounts """
+    return [(s.date, {key: getattr(value, 'name', value) for key, value in s.status.items()})
+            for s in simulation.report]
+
+
+class Test_Parallel(unittest.TestCase):
+
+    def setUp(self):
+        warnings.simplefilter('ignore')
+
+    def assertSimulationsEqual(self, simulation, reference):
+        self.assertEqual(simulation.current_date, reference.current_date)
+        for account, reference_account in zip(simulation.accounts, reference.accounts):
+            self.assertEqual(account.current_date, reference_account.current_date)
+            self.assertEqual(report_data(account.report), report_data(reference_account.report))
+        self.assertEqual(transfers(simulation), transfers(reference))
+
+    def test_components(self):
+        simulation = portfolio(3)
+        self.assertEqual(components(simulation), [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9, 10, 11]])
+        # a controller without accounts may touch every account
+        simulation.add_controller(lambda s: None, trigger = 'monthly')
+        self.assertEqual(components(simulation), [list(range(12))])
+
+        simulation = portfolio(3)
+        simulation.add_controller(lambda s: None, accounts = simulation.accounts[1:5:3])
+        # the payment refers to the main account of the last household
+        account = simulation.accounts[8]
+        simulation.add_unique('Income', simulation.accounts[9], lambda: account.account, datetime(2017, 1, 1))
+        self.assertEqual(components(simulation), [[0, 1, 2, 3, 4, 5, 6, 7], [8, 9, 10, 11]])
+
+    def test_simulate(self):
+        for event_driven in (False, True):
+            reference = portfolio(4, event_driven)
+            reference.simulate(delta = timedelta(days = 365 * 10))
+            simulation = portfolio(4, event_driven)
+            groups = simulate_parallel(simulation, delta = timedelta(days = 365 * 10), workers = 3)
+            self.assertEqual(groups, [[0, 1, 2, 3, 12, 13, 14, 15], [4, 5, 6, 7], [8, 9, 10, 11]])
+            self.assertSimulationsEqual(simulation, reference)
+
+            # the simulation can be continued afterwards
+            reference.simulate(delta = timedelta(days = 365 * 5))
+            simulate_parallel(simulation, delta = timedelta(days = 365 * 5), workers = 2)
+            self.assertSimulationsEqual(simulation, reference)
+
+    def test_pending_functions(self):
+        # payments with functions are still pending after one year
+        reference = portfolio(2)
+        reference.simulate(delta = timedelta(days = 365))
+        simulation = portfolio(2)
+        with warnings.catch_warnings(record = True) as caught:
+            warnings.simplefilter('always')
+            groups = simulate_parallel(simulation, delta = timedelta(days = 365), workers = 2)
+            groups_continued = simulate_parallel(simulation, delta = timedelta(days = 365), workers = 2)
+        reference.simulate(delta = timedelta(days = 365))
+        self.assertEqual([w for w in caught if 'simulated serially' in str(w.message)], [])
+        self.assertEqual(groups, [[0, 1, 2, 3], [4, 5, 6, 7]])
+        self.assertEqual(groups_continued, groups)
+        self.assertSimulationsEqual(simulation, reference)
+
+    def test_controllers(self):
+        def create(adding):
+            simulation = portfolio(3)
+            for i in range(3):
+                account = simulation.accounts[4 * i]
+
+                def controller(s, account = account, add = i in adding):
+                    if add and account.account > 3000:
+                        s.add_unique(account, 'Vacation', 500, s.current_date)
+                simulation.add_controller(controller, trigger = 'monthly', accounts = [account])
+            return simulation
+
+        for adding in ((1,), (0, 2)):
+            reference = create(adding)
+            reference.simulate(delta = timedelta(days = 365 * 8))
+            simulation = create(adding)
+            with warnings.catch_warnings(record = True) as caught:
+                warnings.simplefilter('always')
+                groups = simulate_parallel(simulation, delta = timedelta(days = 365 * 8), workers = 3)
+            self.assertSimulationsEqual(simulation, reference)
+            # payments added in several groups cannot be ordered like in a
+            # serial simulation
+            self.assertEqual(len(groups), 3 if adding == (1,) else 1)
+            serial = [w for w in caught if 'simulated serially' in str(w.message)]
+            self.assertEqual(len(serial), 0 if adding == (1,) else 1)
+
+    def test_report_level(self):
+        reference = portfolio(2)
+        reference.report.level = 'monthly'
+        reference.simulate(delta = timedelta(days = 365 * 3))
+        simulation = portfolio(2)
+        simulation.report.level = 'monthly'
+        simulate_parallel(simulation, delta = timedelta(days = 365 * 3), workers = 2)
+        self.assertSimulationsEqual(simulation, reference)
+
+
+if __name__ == "__main__":
+    unittest.main()
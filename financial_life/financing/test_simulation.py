@@ -0,0 +1,352 @@
+'''
+Created on 17.10.2026
+
+Tests for the simulation engine
+'''
+# standard libraries
+from datetime import timedelta, datetime
+import unittest
+
+# own libraries
+from financial_life.financing import accounts as a
+from financial_life.financing import Payment, Payment_Value, Recurrence, Payment_Trigger
+
+
+def create_simulation(event_driven = False, report_level = 'transactions'):
+    """ Mostly taken from test_general.py, with a property and a unique
+    payment on top """
+    account = a.Bank_Account(amount = 1000, interest = 0.001, name = 'Main account', date=datetime(2016,9, 1),
+                             report_level = report_level)
+    savings = a.Bank_Account(amount = 5000, interest = 0.013, name = 'Savings', date=datetime(2016,9, 1),
+                             report_level = report_level)
+    loan = a.Loan(amount = 100000, interest = 0.01, name = 'House Credit', date=datetime(2016,9, 1),
+                  report_level = report_level)
+    house = a.Property(100000, 0, loan, name = 'House', date=datetime(2016,9, 1),
+                       report_level = report_level)
+
+    simulation = a.Simulation(account, savings, loan, house, name = 'Testsimulation',
+                              date=datetime(2016,9, 1), event_driven = event_driven,
+                              report_level = report_level)
+    simulation.add_regular(from_acc = 'Income',
+                           to_acc = account,
+                           payment = 2000,
+                           interval = 'monthly',
+                           date_start = datetime(2016,9,15),
+                           day = 15,
+                           name = 'Income')
+
+    simulation.add_regular(from_acc = account,
+                           to_acc = savings,
+                           payment = 500,
+                           interval = 'monthly',
+                           date_start = datetime(2016,9,30),
+                           day = 30,
+                           name = 'Savings')
+
+    simulation.add_regular(from_acc = account,
+                           to_acc= loan,
+                           payment = 1000,
+                           interval = 'monthly',
+                           date_start = datetime(2016,9,15),
+                           day = 15,
+                           name = 'Debts',
+                           fixed = False,
+                           date_stop = lambda cdate: loan.is_finished())
+
+    simulation.add_regular(from_acc = account,
+                           to_acc= loan,
+                           payment = lambda : min(8000, max(0,account.get_account()-4000)),
+                           interval = 'yearly',
+                           date_start = datetime(2016,11,20),
+                           day = 20,
+                           name = 'Debts',
+                           fixed = False,
+                           date_stop = lambda cdate: loan.is_finished())
+
+    simulation.add_unique(savings, 'Vendor for car', 10000, datetime(2019, 3, 17))
+    return simulation
+
+
+def report_data(report):
+    """ Returns the content of a report as comparable list """
+    return [(s.date, s.status) for s in report]
+
+
+class Test_Event_Driven(unittest.TestCase):
+
+    def test_identical_reports(self):
+        daily = create_simulation()
+        daily.simulate(delta=timedelta(days=365*12))
+        skipping = create_simulation(event_driven = True)
+        skipping.simulate(delta=timedelta(days=365*12))
+
+        self.assertEqual(daily.current_date, skipping.current_date)
+        for acc_daily, acc_skipping in zip(daily.accounts, skipping.accounts):
+            self.assertEqual(report_data(acc_daily.report), report_data(acc_skipping.report))
+        self.assertEqual(len(daily.report), len(skipping.report))
+
+    def test_continued_simulation(self):
+        daily = create_simulation()
+        daily.simulate(delta=timedelta(days=700))
+        skipping = create_simulation(event_driven = True)
+        skipping.simulate(delta=timedelta(days=300))
+        skipping.simulate(date_stop=datetime(2016, 9, 1) + timedelta(days=700))
+
+        self.assertEqual(daily.current_date, skipping.current_date)
+        for acc_daily, acc_skipping in zip(daily.accounts, skipping.accounts):
+            self.assertEqual(report_data(acc_daily.report), report_data(acc_skipping.report))
+
+
+class Test_Fork(unittest.TestCase):
+
+    def test_branches(self):
+        simulation = create_simulation()
+        simulation.simulate(delta=timedelta(days=1000))
+        fork = simulation.fork()
+        fork.add_unique(fork.accounts[1], fork.accounts[2], 3000, datetime(2020, 2, 3))
+        simulation.simulate(delta=timedelta(days=3000))
+        fork.simulate(delta=timedelta(days=3000))
+
+        # the report history before the fork is shared
+        self.assertIs(fork.accounts[0].report._statuses._parent,
+                      simulation.accounts[0].report._statuses)
+
+        reference = create_simulation()
+        reference.simulate(delta=timedelta(days=4000))
+        alternative = create_simulation()
+        alternative.add_unique(alternative.accounts[1], alternative.accounts[2],
+                               3000, datetime(2020, 2, 3))
+        alternative.simulate(delta=timedelta(days=4000))
+
+        for acc, acc_reference in zip(simulation.accounts, reference.accounts):
+            self.assertEqual(report_data(acc.report), report_data(acc_reference.report))
+        for acc, acc_alternative in zip(fork.accounts, alternative.accounts):
+            self.assertEqual(report_data(acc.report), report_data(acc_alternative.report))
+        self.assertNotEqual(report_data(fork.accounts[2].report),
+                            report_data(simulation.accounts[2].report))
+
+
+class Test_Calendar(unittest.TestCase):
+
+    def test_time_of_day(self):
+        account = a.Bank_Account(amount = 1000, interest = 0.01, name = 'Main account',
+                                 date = datetime(2016, 12, 30, 9, 30))
+        simulation = a.Simulation(account, date = datetime(2016, 12, 30, 9, 30))
+        simulation.add_regular('Income', account, 100, interval = 'monthly', day = 1)
+        simulation.simulate(delta = timedelta(days = 40))
+        self.assertEqual(simulation.current_date, datetime(2017, 2, 8, 9, 30))
+        self.assertEqual([s.date for s in account.report],
+                         [datetime(2016, 12, 30, 9, 30), datetime(2016, 12, 31, 9, 30),
+                          datetime(2017, 1, 1, 9, 30), datetime(2017, 2, 1, 9, 30)])
+
+
+class Test_Report_Level(unittest.TestCase):
+
+    def setUp(self):
+        self.reference = create_simulation()
+        self.reference.simulate(delta=timedelta(days=365*5))
+
+    def test_levels(self):
+        for level in ('daily', 'monthly', 'yearly'):
+            simulation = create_simulation(report_level = level)
+            simulation.simulate(delta=timedelta(days=365*5))
+            for acc, acc_reference in zip(simulation.accounts, self.reference.accounts):
+                self.assertEqual(report_data(acc.report),
+                                 report_data(acc_reference.report.aggregate(level)))
+                self.assertEqual(acc.get_account(), acc_reference.get_account())
+            self.assertEqual(report_data(simulation.report),
+                             report_data(self.reference.report.aggregate(level)))
+
+        # the monthly report is stored with one status per month
+        simulation = create_simulation(report_level = 'monthly')
+        simulation.simulate(delta=timedelta(days=365*5))
+        dates = [status.date for status in simulation.accounts[0].report]
+        self.assertEqual(len(dates), len({(date.year, date.month) for date in dates}))
+        self.assertEqual(len(dates), len(self.reference.accounts[0].report.monthly()))
+        self.assertEqual(len(dates), 12 * 5)
+
+    def test_rollup(self):
+        simulation = create_simulation(report_level = 'monthly')
+        simulation.simulate(delta=timedelta(days=400))
+        # the yearly report is kept up to date, while the last month changes
+        simulation.accounts[1].report.yearly()
+        simulation.simulate(delta=timedelta(days=365*5-400))
+        self.assertEqual(report_data(simulation.accounts[1].report.yearly()),
+                         report_data(self.reference.accounts[1].report.yearly()))
+
+    def test_none(self):
+        simulation = create_simulation(report_level = 'none')
+        simulation.simulate(delta=timedelta(days=365*5))
+        self.assertEqual(len(simulation.accounts[0].report), 0)
+        self.assertEqual(len(simulation.report), 0)
+        self.assertEqual(simulation.accounts[0].get_account(),
+                         self.reference.accounts[0].get_account())
+
+    def test_change_level(self):
+        report = self.reference.accounts[0].report.fork()
+        report.level = 'monthly'
+        self.assertEqual(report_data(report),
+                         report_data(self.reference.accounts[0].report.monthly()))
+        self.assertRaises(ValueError, setattr, report, 'level', 'weekly')
+
+
+class Test_Accrue(unittest.TestCase):
+
+    def test_year_boundary(self):
+        account = a.Bank_Account(amount = 1000, interest = 0.05, date=datetime(2019, 12, 30))
+        account.accrue(4)
+        expected = 100000 * 2 * (0.05 / 365) + 100000 * 2 * (0.05 / 366)
+        self.assertAlmostEqual(account._sum_interest, expected, places = 9)
+
+    def test_span_equals_single_days(self):
+        loan = a.Loan(amount = 1000, interest = 0.03, date=datetime(2019, 11, 1))
+        loan.accrue(100)
+        single = a.Loan(amount = 1000, interest = 0.03, date=datetime(2019, 11, 1))
+        for day in range(100):
+            single._current_date = datetime(2019, 11, 1) + timedelta(days = day)
+            single.accrue(1)
+        self.assertEqual(loan._sum_interest, single._sum_interest)
+
+
+class Test_Active_Accounts(unittest.TestCase):
+
+    def create(self, event_driven = False, dormant = True):
+        simulation = create_simulation(event_driven = event_driven)
+        late = a.Bank_Account(amount = 0, interest = 0.02, name = 'Late', date = datetime(2030, 5, 3))
+        simulation.add_account(late)
+        simulation.add_regular(simulation.accounts[0], late, 100, interval = 'monthly',
+                               date_start = datetime(2030, 6, 1))
+        # payment to the loan after it has been payed back
+        simulation.add_unique(simulation.accounts[0], simulation.accounts[2], 100, datetime(2035, 3, 4))
+        if not dormant:
+            for account in simulation.accounts:
+                account.is_dormant = lambda: False
+        return simulation
+
+    def test_identical_reports(self):
+        for event_driven in (False, True):
+            reference = self.create(event_driven, dormant = False)
+            reference.simulate(delta = timedelta(days = 365 * 15))
+            simulation = self.create(event_driven)
+            simulation.simulate(delta = timedelta(days = 365 * 10))
+            simulation.simulate(delta = timedelta(days = 365 * 5))
+
+            self.assertEqual(simulation._active_accounts._dormant, {2, 3})
+            for account, reference_account in zip(simulation.accounts, reference.accounts):
+                self.assertEqual(account.current_date, reference_account.current_date)
+                self.assertEqual(report_data(account.report), report_data(reference_account.report))
+            self.assertEqual(len(simulation.report), len(reference.report))
+            self.assertEqual(simulation.report[-1].code, reference.report[-1].code)
+
+    def test_inactive_accounts(self):
+        simulation = self.create()
+        calls = []
+        loan, late = simulation.accounts[2], simulation.accounts[4]
+        for account in (loan, late):
+            account.end_of_day = lambda end_of_day = account.end_of_day: calls.append(end_of_day.__self__) or end_of_day()
+        simulation.simulate(delta = timedelta(days = 365 * 15))
+        self.assertEqual(calls.count(late), (datetime(2031, 8, 28) - datetime(2030, 5, 3)).days + 1)
+        self.assertLess(calls.count(loan), 3000)
+
+    def test_fork(self):
+        simulation = self.create()
+        simulation.simulate(delta = timedelta(days = 365 * 10))
+        fork = simulation.fork()
+        fork.simulate(delta = timedelta(days = 365 * 5))
+        reference = self.create(dormant = False)
+        reference.simulate(delta = timedelta(days = 365 * 15))
+        self.assertEqual(report_data(fork.accounts[2].report), report_data(reference.accounts[2].report))
+
+
+class Test_Transfer(unittest.TestCase):
+
+    def setUp(self):
+        self.account = a.Bank_Account(amount = 1000, interest = 0, name = 'Main', date=datetime(2016,9, 1))
+        self.savings = a.Bank_Account(amount = 0, interest = 0, name = 'Savings', date=datetime(2016,10, 1))
+        self.simulation = a.Simulation(self.account, self.savings, date=datetime(2016,9, 1))
+
+    def test_constant_payment(self):
+        payment = Payment(self.account, a.DummyAccount('Costs'), datetime(2016,9, 2), 'costs', 'unique',
+                          Payment_Value(12.34))
+        self.assertEqual(payment.cents, 1234)
+        self.assertEqual(payment.valid_from, datetime(2016,9, 1))
+        self.assertEqual(Payment(self.account, 'Costs', datetime(2016,9, 2), 'costs', 'unique',
+                                 Payment_Value(lambda: 1)).cents, None)
+        self.assertTrue(self.simulation.make_transfer(payment))
+        self.assertEqual(self.account.account, 1000 - 12.34)
+
+    def test_creation_date(self):
+        payment = Payment(self.account, self.savings, datetime(2016,9, 2), 'savings', 'unique',
+                          Payment_Value(100))
+        self.assertEqual(payment.valid_from, datetime(2016,10, 1))
+        self.assertRaises(AssertionError, self.simulation.make_transfer, payment)
+
+
+class Test_Controller(unittest.TestCase):
+
+    def create(self, trigger, event_driven = False):
+        simulation = create_simulation(event_driven = event_driven)
+        calls = []
+        simulation.add_controller(lambda s: calls.append(s.current_date), trigger = trigger)
+        return simulation, calls
+
+    def test_recurrence(self):
+        simulation, calls = self.create(Recurrence('yearly', by_month = 2, by_day = 15))
+        simulation.simulate(delta = timedelta(days = 1000))
+        self.assertEqual(calls, [datetime(2017, 2, 15), datetime(2018, 2, 15), datetime(2019, 2, 15)])
+
+        # days without events are still skipped
+        simulation, calls_event = self.create(Recurrence('yearly', by_month = 2, by_day = 15), True)
+        simulated = []
+        simulate_day = simulation.simulate_day
+        simulation.simulate_day = lambda: simulated.append(simulation.current_date) or simulate_day()
+        simulation.simulate(delta = timedelta(days = 1000))
+        self.assertEqual(calls_event, calls)
+        self.assertLess(len(simulated), 500)
+        self.assertIn(datetime(2018, 2, 15), simulated)
+
+    def test_interval(self):
+        simulation, calls = self.create('monthly')
+        simulation.simulate(delta = timedelta(days = 65))
+        self.assertEqual(calls, [datetime(2016, 9, 1), datetime(2016, 10, 1), datetime(2016, 11, 1)])
+        self.assertRaises(ValueError, simulation.add_controller, print, trigger = 'hourly')
+        self.assertRaises(TypeError, simulation.add_controller, print, trigger = 5)
+
+    def test_payment(self):
+        simulation, calls = self.create(Payment_Trigger(name = 'Income'))
+        simulation.simulate(delta = timedelta(days = 100))
+        self.assertEqual(calls, [datetime(2016, 9, 15), datetime(2016, 10, 15), datetime(2016, 11, 15)])
+
+    def test_fork(self):
+        simulation, calls = self.create(Recurrence('weekly', by_day = 0))
+        simulation.simulate(delta = timedelta(days = 20))
+        fork = simulation.fork()
+        simulation.simulate(delta = timedelta(days = 20))
+        fork.simulate(delta = timedelta(days = 20))
+        self.assertEqual(calls, [datetime(2016, 9, 5), datetime(2016, 9, 12), datetime(2016, 9, 19),
+                                 datetime(2016, 9, 26), datetime(2016, 10, 3), datetime(2016, 10, 10)])
+        self.assertEqual(fork._schedules[0].next, simulation._schedules[0].next)
+
+
+class Test_Live_Queue(unittest.TestCase):
+
+    def test_add_payment_keeps_schedule(self):
+        # adding a payment does not move a schedule on the 31st to the 28th
+        account = a.Bank_Account(amount = 1000, interest = 0.001, name = 'Main account',
+                                 date = datetime(2016, 12, 1))
+        simulation = a.Simulation(account, date = datetime(2016, 12, 1))
+        simulation.add_regular('Income', account, 100, interval = 'monthly',
+                               date_start = datetime(2017, 1, 31), day = 31, name = 'Income')
+
+        def controller(s):
+            if s.current_date == datetime(2017, 2, 10):
+                s.add_unique('Gift', account, 50, datetime(2017, 2, 20), name = 'Gift')
+        simulation.add_controller(controller)
+        simulation.simulate(date_stop = datetime(2017, 7, 15))
+        dates = [status.date for status in simulation.report if status.get('name', None) == 'Income']
+        self.assertEqual(dates, [datetime(2017, 1, 31), datetime(2017, 2, 28), datetime(2017, 3, 31),
+                                 datetime(2017, 4, 30), datetime(2017, 5, 31), datetime(2017, 6, 30)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+'''
+Created on 17.10.2026
+
+Tests for writing reports to files during the simulation
+'''
+# standard libraries
+from datetime import timedelta, datetime
+import shutil
+import tempfile
+import unittest
+
+# own libraries
+from financial_life.financing import accounts as a
+from financial_life.financing import sinks
+
+
+def create_simulation(report_level = 'transactions'):
+    account = a.Bank_Account(amount = 1000, interest = 0.001, name = 'Main account',
+                             date = datetime(2016, 9, 1), report_level = report_level)
+    loan = a.Loan(amount = 20000, interest = 0.02, name = 'Loan', date = datetime(2016, 9, 1),
+                  report_level = report_level)
+    simulation = a.Simulation(account, loan, name = 'Sinks', date = datetime(2016, 9, 1),
+                              report_level = report_level)
+    simulation.add_regular('Income', account, 2000, interval = 'monthly', day = 15,
+                           meta = {'type': 'income'})
+    simulation.add_regular(account, loan, lambda: min(1500, -loan.account), interval = 'monthly',
+                           date_stop = lambda cdate: loan.is_finished())
+    return simulation
+
+
+def report_data(report, level = 'transactions'):
+    if level != 'transactions':
+        report = report.aggregate(level)
+    return [(s.date, s.status, s.meta) for s in report]
+
+
+class Test_Sinks(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.reference = create_simulation()
+        self.reference.simulate(delta = timedelta(days = 365 * 3))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def check_format(self, format, report_level = 'transactions'):
+        simulation = create_simulation(report_level)
+        paths = simulation.stream_reports(self.directory, format = format, buffer_size = 10)
+        simulation.simulate(delta = timedelta(days = 365 * 3))
+
+        # only the buffer is kept in memory
+        self.assertLessEqual(len(simulation.accounts[0].report._statuses._buffer), 10)
+        # the report can be read while it is written
+        self.assertEqual(report_data(simulation.accounts[0].report.yearly()),
+                         report_data(self.reference.accounts[0].report.yearly()))
+
+        simulation.close_reports()
+        reports = [sinks.open_report(path) for path in paths]
+        references = self.reference.accounts + [self.reference]
+        for report, reference in zip(reports, references):
+            self.assertEqual(report.name, reference.report.name)
+            self.assertEqual(len(report), len(report_data(reference.report, report_level)))
+        self.assertEqual(report_data(reports[0].yearly()),
+                         report_data(self.reference.accounts[0].report.yearly()))
+        self.assertEqual(report_data(reports[1].yearly()),
+                         report_data(self.reference.accounts[1].report.yearly()))
+        self.assertRaises(ValueError, reports[0].append, next(iter(reports[0])))
+        return reports
+
+    def test_csv(self):
+        self.check_format('csv')
+
+    def test_jsonl(self):
+        reports = self.check_format('jsonl')
+        # accounts in the report of the simulation are written as names
+        for report, reference in zip(reports, self.reference.accounts):
+            self.assertEqual(report_data(report), report_data(reference.report))
+
+    def test_monthly(self):
+        reports = self.check_format('jsonl', 'monthly')
+        self.assertEqual(report_data(reports[0]),
+                         report_data(self.reference.accounts[0].report, 'monthly'))
+
+    @unittest.skipIf(sinks.pa is None, 'pyarrow is not installed')
+    def test_parquet(self):
+        simulation = create_simulation()
+        paths = simulation.stream_reports(self.directory, format = 'parquet', buffer_size = 10)
+        simulation.simulate(delta = timedelta(days = 365 * 3))
+        simulation.close_reports()
+        report = sinks.open_report(paths[0])
+        self.assertEqual(report_data(report.yearly()),
+                         report_data(self.reference.accounts[0].report.yearly()))
+
+    def test_format(self):
+        simulation = create_simulation()
+        self.assertRaises(ValueError, simulation.stream_reports, self.directory, format = 'xls')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+'''
+Created on 17.10.2026
+
+Tests for the goal-seek solver
+'''
+# standard libraries
+from datetime import datetime
+import unittest
+import warnings
+
+# own libraries
+from financial_life.financing import accounts as a
+from financial_life.financing import vectorized as v
+from financial_life.financing.solver import solve, first_use, find_params
+
+
+def create_plan(rate = 500):
+    """ plan, in which a loan is payed back with a rate from 2018 on """
+    account = a.Bank_Account(amount = 1000, interest = 0.001, name = 'Main account', date = datetime(2016, 9, 1))
+    loan = a.Loan(amount = 50000, interest = 0.02, name = 'Loan', date = datetime(2016, 9, 1))
+    simulation = a.Simulation(account, loan, date = datetime(2016, 9, 1))
+    simulation.add_regular('Income', account, 2000, interval = 'monthly')
+    simulation.add_regular(account, loan, v.minimum(v.Param('rate', rate), -v.account_value(loan)),
+                           interval = 'monthly', date_start = datetime(2018, 1, 15), day = 15,
+                           name = 'Rate')
+    return simulation
+
+
+def simulate_plan(rate, date):
+    simulation = create_plan(rate)
+    simulation.simulate(date_stop = date)
+    return simulation
+
+
+class Test_Solver(unittest.TestCase):
+
+    def setUp(self):
+        warnings.simplefilter('ignore')
+        self.date = datetime(2026, 1, 1)
+
+    def test_payoff(self):
+        simulation = create_plan()
+        solution = solve(simulation, 'rate', simulation.accounts[1], 0, self.date, 0, 3000)
+        self.assertTrue(solution.converged)
+        self.assertEqual(solution.result, 0)
+        self.assertEqual(solution.simulation.current_date, self.date)
+        # the simulation itself is not changed
+        self.assertIsNone(simulation._payment_queue)
+
+        self.assertEqual(simulate_plan(solution.value, self.date).accounts[1].get_account(), 0)
+        self.assertLess(simulate_plan(solution.value - 0.01, self.date).accounts[1].get_account(), 0)
+        self.assertEqual(solution.simulation.accounts[0].get_account(),
+                         simulate_plan(solution.value, self.date).accounts[0].get_account())
+
+    def test_savings(self):
+        # the higher the rate, the less money is left on the account
+        simulation = create_plan()
+        account = simulation.accounts[0]
+        solution = solve(simulation, v.Param('rate'), account, 180000, self.date, 0, 3000)
+        self.assertTrue(solution.converged)
+        self.assertGreaterEqual(solution.result, 180000)
+        self.assertGreaterEqual(simulate_plan(solution.value, self.date).accounts[0].get_account(), 180000)
+        self.assertLess(simulate_plan(solution.value + 0.01, self.date).accounts[0].get_account(), 180000)
+
+    def test_first_use(self):
+        simulation = create_plan()
+        self.assertEqual(first_use(simulation, 'rate', self.date), datetime(2018, 1, 15))
+        self.assertEqual(first_use(simulation, 'other', self.date), self.date)
+        rate = find_params(simulation, 'rate')[0]
+        simulation.add_controller(lambda s: rate.value())
+        self.assertEqual(first_use(simulation, 'rate', self.date), datetime(2016, 9, 1))
+
+    def test_errors(self):
+        simulation = create_plan()
+        loan = simulation.accounts[1]
+        self.assertRaises(ValueError, solve, simulation, 'other', loan, 0, self.date, 0, 3000)
+        self.assertRaises(ValueError, solve, simulation, 'rate', loan, 0, self.date, 0, 100)
+        self.assertRaises(ValueError, solve, create_plan(), 'rate', loan, 0, self.date, 0, 3000)
+
+
+if __name__ == "__main__":
+    unittest.main()
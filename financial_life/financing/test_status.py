@@ -5,11 +5,12 @@ Created on 15.12.2016
 '''
 # standard libraries
 from datetime import datetime, timedelta
+import pickle
 import unittest
 
 # own libraries
 from financial_life.financing import accounts as a
-from financial_life.financing import Status
+from financial_life.financing import Status, Report, Column
 
 
 class Test(unittest.TestCase):
@@ -55,6 +56,24 @@ class Test(unittest.TestCase):
         self.assertDictEqual(s._status, {'a':2, 'b':3})
         self.assertDictEqual(s._meta, {'test': 3})
 
+    def test_shared_schema(self):
+        s1 = Status(datetime(2016,9,1), a=2, b=3)
+        s2 = Status(datetime(2016,9,2), a=4, b=5, meta={'test': 3})
+        self.assertIs(s1._schema, s2._schema)
+        # every status has its own meta data and read-only values
+        s1.meta['x'] = 1
+        self.assertEqual(Status(datetime(2016,9,3), c=1).meta, {})
+        self.assertRaises(TypeError, s1.status.__setitem__, 'a', 1)
+        self.assertRaises(TypeError, s1._status.update, a = 1)
+        self.assertIs(type(pickle.loads(pickle.dumps(s1.status))), dict)
+        self.assertFalse(hasattr(s1, '__dict__'))
+        self.assertEqual((s2['a'], s2.b, s2.get('c', 0), list(s2.keys())), (4, 5, 0, ['a', 'b']))
+        self.assertRaises(KeyError, s2.__getitem__, 'c')
+        copied = pickle.loads(pickle.dumps(s2))
+        self.assertIs(copied._schema, s1._schema)
+        self.assertEqual((copied.date, copied.status, copied.meta),
+                         (datetime(2016,9,2), {'a': 4, 'b': 5}, {'test': 3}))
+
     def test_str(self):
         s = Status(datetime(2016,9,1), a=2, b=3, ceta=4)
         str(s)
@@ -67,6 +86,156 @@ class Test(unittest.TestCase):
         print(status2._meta)
         self.assertDictEqual(status2._meta, {'tax': 100})
 
+    def test_key_order(self):
+        report = Report()
+        report.add_semantics('z', 'none')
+        report.append(date = datetime(2016, 9, 1), b = 1, a = 2)
+        report.append(date = datetime(2016, 9, 2), b = 1, a = 2)
+        report.append(date = datetime(2016, 9, 3), c = 1, a = 2)
+        self.assertEqual(report._keys, ['z', 'b', 'a', 'c'])
+
+    def test_semantic_index(self):
+        report = Report()
+        report.add_semantics('a', 'cost_cum')
+        self.assertEqual(report.semantics_of('a'), 'cost_cum')
+        self.assertEqual(report.semantics_of('b'), '')
+        report.add_semantics('b', 'none')
+        self.assertEqual(report.semantics_of('b'), 'none')
+
+
+class Test_Between(unittest.TestCase):
+
+    def create_report(self, storage):
+        report = Report(storage = storage)
+        for day in range(400):
+            report.append(date = datetime(2016, 9, 1) + timedelta(days = day), value = day,
+                          meta = {'type': ('income', 'cost', 'tax')[day % 3], 'tax': {'paid': day}})
+        return report
+
+    def test_between(self):
+        for storage in ('list', 'columnar'):
+            report = self.create_report(storage)
+            report.add_index('type')
+            result = report.between(datetime(2017, 1, 1), '01.03.2017', type = 'income')
+            expected = report.subset(lambda st: (datetime(2017, 1, 1) <= st.date < datetime(2017, 3, 1)) and
+                                                (st.meta['type'] == 'income'))
+            self.assertEqual(result.value, expected.value)
+            self.assertEqual(len(result), 20)
+
+            # indexes are updated with new statuses
+            report.append(date = datetime(2018, 1, 1), value = 1000, meta = {'type': 'income'})
+            self.assertEqual(report.where(type = 'income').value[-1], 1000)
+            self.assertEqual(len(report.where(type = 'income', tax = {'paid': 3})), 1)
+
+    def test_unsorted(self):
+        report = self.create_report('list')
+        report.append(date = datetime(2016, 1, 1), value = -1, meta = {'type': 'income'})
+        self.assertEqual(report.between(end = datetime(2016, 9, 1)).value, [-1])
+        self.assertEqual(report.between(datetime(2016, 9, 1), datetime(2016, 9, 3)).value, [0, 1])
+
+
+class Test_Rollup(unittest.TestCase):
+
+    def test_incremental(self):
+        for storage in ('list', 'columnar'):
+            Report.default_storage = storage
+            try:
+                account = a.Bank_Account(amount = 1000, interest = 0.02, name = 'Main account', date=datetime(2016,9, 1))
+            finally:
+                Report.default_storage = 'list'
+            simulation = a.Simulation(account, date=datetime(2016,9, 1))
+            simulation.add_regular('Income', account, 2000, interval = 'monthly', day = 5)
+            simulation.add_regular(account, 'Rent', 700, interval = 'monthly', day = 20)
+            for step in range(20):
+                simulation.simulate(delta=timedelta(days=97))
+                for interval in ('monthly', 'yearly'):
+                    expected = account.report.aggregate(interval)
+                    result = account.report.create_report(interval)
+                    self.assertEqual([(s.date, list(s.status.items())) for s in expected],
+                                     [(s.date, list(s.status.items())) for s in result])
+            # requests share the maintained report, but get their own fork
+            yearly = account.report.yearly()
+            self.assertIsNot(yearly, account.report.yearly())
+            self.assertIs(account.report._rollups['yearly'].report(),
+                          account.report._rollups['yearly'].report())
+            size = len(yearly)
+            yearly.append(date = datetime(2030, 1, 1), input = 1)
+            self.assertEqual(len(account.report.yearly()), size)
+
+    def test_semantic_change(self):
+        account = a.Bank_Account(amount = 1000, interest = 0.02, name = 'Main account', date=datetime(2016,9, 1))
+        simulation = a.Simulation(account, date=datetime(2016,9, 1))
+        simulation.add_regular('Income', account, 2000, interval = 'monthly', day = 5)
+        simulation.simulate(delta=timedelta(days=500))
+        summed = account.report.yearly().input
+        # input is not cumulative anymore, therefore, the last value is taken
+        account.report.add_semantics({'input_cum': []})
+        self.assertNotEqual(account.report.yearly().input, summed)
+        self.assertEqual(account.report.yearly().input, account.report.aggregate('yearly').input)
+
+
+class Test_Columns(unittest.TestCase):
+
+    def simulate(self, storage):
+        Report.default_storage = storage
+        try:
+            account = a.Bank_Account(amount = 1000, interest = 0.001, name = 'Main account', date=datetime(2016,9, 1))
+            loan = a.Loan(amount = 20000, interest = 0.03, name = 'Loan', date=datetime(2016,9, 1))
+            simulation = a.Simulation(account, loan, date=datetime(2016,9, 1))
+            simulation.add_regular('Income', account, 2000, interval = 'monthly', meta = {'tax': 100})
+            simulation.add_regular(account, loan, lambda: min(1500, -loan.account),
+                                   interval = 'monthly', day = 15)
+            simulation.simulate(delta=timedelta(days=2000))
+        finally:
+            Report.default_storage = 'list'
+        return simulation
+
+    def test_same_reports(self):
+        listed = self.simulate('list')
+        columnar = self.simulate('columnar')
+        self.assertEqual(columnar.accounts[0].report.storage, 'columnar')
+        for acc_list, acc_col in zip(listed.accounts, columnar.accounts):
+            for report_list, report_col in ((acc_list.report, acc_col.report),
+                                            (acc_list.report.monthly(), acc_col.report.monthly()),
+                                            (acc_list.report.yearly(), acc_col.report.yearly())):
+                self.assertEqual(len(report_list), len(report_col))
+                for s_list, s_col in zip(report_list, report_col):
+                    self.assertEqual(s_list.date, s_col.date)
+                    # same keys in the same order with values of the same type
+                    self.assertEqual([(k, v, type(v)) for k, v in s_list.status.items()],
+                                     [(k, v, type(v)) for k, v in s_col.status.items()])
+                    self.assertEqual(s_list.meta, s_col.meta)
+                self.assertEqual(report_list.get('input'), report_col.get('input'))
+                self.assertEqual(report_list.kind, report_col.kind)
+        self.assertEqual(listed.report_sum_of('cost'), columnar.report_sum_of('cost'))
+
+    def test_column_kinds(self):
+        column = Column(1.25, size = 1)
+        self.assertEqual(column.kind, 'cents')
+        column.append(3.5)
+        self.assertEqual(column[1], 3.5)
+        column.append(1 / 3)
+        self.assertEqual(column.kind, 'float')
+        column.append('text')
+        self.assertEqual(column.kind, 'object')
+        self.assertEqual(column.values(), [0., 3.5, 1 / 3, 'text'])
+
+        column = Column('a')
+        for value in ('a', 'b', 'a'):
+            column.append(value)
+        self.assertEqual(column.kind, 'category')
+        self.assertEqual(column.values(), ['a', 'b', 'a'])
+
+    def test_heterogeneous_statuses(self):
+        report = Report(storage = 'columnar')
+        report.append(date = datetime(2016, 9, 1, 12), a = 1, b = 'x')
+        report.append(date = datetime(2016, 9, 2), c = 2.5, meta = {'tax': 1})
+        self.assertEqual(report._statuses[0].date, datetime(2016, 9, 1, 12))
+        self.assertEqual(report._statuses[1].status, {'c': 2.5})
+        self.assertEqual(report._statuses[1].meta, {'tax': 1})
+        self.assertEqual(report.get('a'), [1, 'None'])
+        self.assertEqual(report.get('c', num_only = True), [0, 2.5])
+
 
 if __name__ == "__main__":
     #import sys;sys.argv = ['', 'Test.testName']
@@ -0,0 +1,90 @@
+'''
+Created on 17.10.2026
+
+Tests for the memory-mapped report store
+'''
+# standard libraries
+from datetime import timedelta
+from functools import partial
+import shutil
+import tempfile
+import unittest
+import warnings
+
+# third-party libraries
+import numpy as np
+
+# own libraries
+from financial_life.financing import Report
+from financial_life.financing.store import Report_Store
+from financial_life.financing.batch import run_batch
+from financial_life.financing.test_batch import plan
+from financial_life.financing.test_simulation import create_simulation
+
+
+class Test_Store(unittest.TestCase):
+
+    def setUp(self):
+        warnings.simplefilter('ignore')
+        self.directory = tempfile.mkdtemp()
+        self.store = Report_Store(self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def assertReportsEqual(self, stored, report):
+        self.assertEqual(len(stored), len(report))
+        for s_stored, s_report in zip(stored, report):
+            self.assertEqual(s_stored.date, s_report.date)
+            for key, value in s_report.status.items():
+                if isinstance(value, str):
+                    self.assertNotIn(key, s_stored.status)
+                else:
+                    self.assertAlmostEqual(s_stored.status[key], value, places = 2)
+
+    def test_simulation(self):
+        simulation = create_simulation()
+        simulation.simulate(delta = timedelta(days = 1000))
+        names = self.store.add_simulation(simulation, prefix = 'first')
+        self.assertEqual(names, ['first/Main_account', 'first/Savings',
+                                 'first/House_Credit', 'first/House'])
+        self.assertEqual(self.store.names(), sorted(names))
+
+        for name, account in zip(names, simulation.accounts):
+            stored = self.store.report(name)
+            self.assertReportsEqual(stored, account.report)
+            self.assertReportsEqual(stored.yearly(), account.report.yearly())
+
+        stored = self.store.report('first/Savings')
+        self.assertIsInstance(stored._statuses.cents('account'), np.memmap)
+        self.assertEqual(list(stored.account), simulation.accounts[1].report.account)
+        df = stored.as_df()
+        self.assertEqual(list(df.columns), ['account', 'interest', 'input', 'output'])
+        self.assertEqual(len(df), len(simulation.accounts[1].report))
+        self.assertRaises(ValueError, stored.append, date = simulation.current_date, account = 1)
+
+    def test_append(self):
+        simulation = create_simulation()
+        simulation.simulate(delta = timedelta(days = 500))
+        report = simulation.accounts[2].report
+        self.store.append(report, 'loan')
+        size = len(report)
+        simulation.simulate(delta = timedelta(days = 500))
+        tail = Report()
+        for status in list(report)[size:]:
+            tail.append(status)
+        self.store.append(tail, 'loan')
+        self.assertReportsEqual(self.store.report('loan'), report)
+
+    def test_batch(self):
+        scenarios = [partial(plan, rate) for rate in (500, 1000)]
+        results = run_batch(scenarios, workers = 2, chunksize = 1, delta = 365,
+                            store = self.directory)
+        self.assertEqual(results[1].stored, ['scenario_1/Main_account', 'scenario_1/Loan'])
+        simulation = plan(1000)
+        simulation.simulate(delta = 365)
+        self.assertReportsEqual(self.store.report('scenario_1/Loan'), simulation.accounts[1].report)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+'''
+Created on 17.10.2026
+
+Tests for the vectorized simulation
+'''
+# standard libraries
+from datetime import datetime
+import unittest
+import warnings
+
+# third-party libraries
+import numpy as np
+
+# own libraries
+from financial_life.financing import accounts as a
+from financial_life.financing import vectorized as v
+
+
+def create_plan(amount = 100000, interest = 0.018, income = 2000, rate = 1500):
+    """ creates a plan with a loan, which is payed back with an expression """
+    account = a.Bank_Account(amount = 1000, interest = 0.001, name = 'Main account', date = datetime(2016, 9, 1))
+    loan = a.Loan(amount = amount, interest = interest, name = 'House Credit', date = datetime(2016, 9, 1))
+    simulation = a.Simulation(account, loan, date = datetime(2016, 9, 1))
+    simulation.add_regular('Income', account, income, interval = 'monthly',
+                           date_start = datetime(2016, 9, 1), name = 'Income')
+    simulation.add_regular(account, loan, v.minimum(v.Param('rate', rate), -v.account_value(loan)),
+                           interval = 'monthly', date_start = datetime(2016, 9, 15), day = 15,
+                           name = 'Rate', date_stop = v.is_finished(loan))
+    simulation.add_regular(account, loan, v.maximum(0, v.account_value(account) - 20000),
+                           interval = 'yearly', date_start = datetime(2016, 12, 20),
+                           name = 'Special', fixed = False)
+    simulation.add_unique(account, 'Car', 8000, datetime(2019, 5, 3))
+    return simulation
+
+
+class Test_Vector_Simulation(unittest.TestCase):
+
+    def setUp(self):
+        warnings.simplefilter('ignore')
+        self.amounts = np.array([80000., 100000., 150000.])
+        self.interests = np.array([0.01, 0.025, 0.018])
+        self.incomes = np.array([2500., 2000., 1800.])
+        self.rates = np.array([1200., 1500., 700.])
+        self.days = 365 * 8
+
+    def test_equal_to_simulations(self):
+        template = create_plan()
+        engine = v.Vector_Simulation(template, size = 3)
+        engine.set_amount(template.accounts[1], self.amounts)
+        engine.set_interest(template.accounts[1], self.interests)
+        engine.set_payment('Income', self.incomes)
+        engine.set_param('rate', self.rates)
+        result = engine.simulate(delta = self.days)
+
+        for i in range(3):
+            simulation = create_plan(self.amounts[i], self.interests[i], self.incomes[i], self.rates[i])
+            balances = [[], []]
+            for day in range(self.days):
+                simulation.simulate(delta = 1)
+                for k, account in enumerate(simulation.accounts):
+                    balances[k].append(account._caccount)
+            for k, account in enumerate(simulation.accounts):
+                self.assertEqual(list(result.balance(account.name)[i]), balances[k])
+                self.assertEqual(result.interest(account.name)[i], account._sum_interest)
+
+    def test_record(self):
+        engine = v.Vector_Simulation(create_plan(), size = 3)
+        daily = engine.simulate(delta = self.days)
+        yearly = engine.simulate(delta = self.days, record = 'yearly')
+        final = engine.simulate(delta = self.days, record = 'final')
+        self.assertEqual(yearly.dates[0], datetime(2016, 12, 31))
+        index = daily.dates.index(yearly.dates[1])
+        self.assertTrue(np.all(yearly.balance('House Credit')[:, 1] == daily.balance('House Credit')[:, index]))
+        self.assertTrue(np.all(final.balance('Main account')[:, -1] == daily.balance('Main account')[:, -1]))
+
+    def test_unsupported_payment(self):
+        simulation = create_plan()
+        simulation.add_regular('Income', simulation.accounts[0], lambda: 100, interval = 'monthly')
+        self.assertRaises(TypeError, v.Vector_Simulation, simulation, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,589 @@
+'''
+Created on 17.10.2026
+
+Vectorized simulation of many variants of one plan at once. A plan
+(a Simulation with Bank_Account and Loan objects) is used as template and
+amounts, interest rates and payments can be varied by arrays of parameters.
+All variants are simulated together as numpy arrays of integer cents.
+
+Payments that are determined at runtime must be written with the expressions
+of this module instead of lambda functions, e.g.
+
+    payment = minimum(1500, -account_value(loan))
+    date_stop = is_finished(loan)
+
+Expressions are callables as well and can therefore be used in normal
+simulations, too.
+'''
+# standard libraries
+from datetime import date, timedelta
+
+# third-party libraries
+import numpy as np
+
+# own libraries
+from financial_life.financing import PaymentList, Payment_Queue
+from financial_life.financing import validate
+from financial_life.financing.accounts import (Bank_Account, Loan, DummyAccount,
+                                               C_max_time, days_until)
+from financial_life.calendar_help import Bank_Date, get_days_per_year
+
+
+class Expression(object):
+    """ Base class of all expressions. Calling an expression evaluates it for
+    the current state of the accounts of a normal simulation. evaluate(engine)
+    evaluates it for all variants of a vectorized simulation """
+
+    def __call__(self, *args):
+        return self.value()
+
+    def value(self):
+        raise NotImplementedError
+
+    def evaluate(self, engine):
+        raise NotImplementedError
+
+    def __add__(self, other):
+        return Operation(np.add, self, other)
+
+    def __radd__(self, other):
+        return Operation(np.add, other, self)
+
+    def __sub__(self, other):
+        return Operation(np.subtract, self, other)
+
+    def __rsub__(self, other):
+        return Operation(np.subtract, other, self)
+
+    def __mul__(self, other):
+        return Operation(np.multiply, self, other)
+
+    def __rmul__(self, other):
+        return Operation(np.multiply, other, self)
+
+    def __truediv__(self, other):
+        return Operation(np.true_divide, self, other)
+
+    def __rtruediv__(self, other):
+        return Operation(np.true_divide, other, self)
+
+    def __neg__(self):
+        return Operation(np.subtract, 0, self)
+
+
+def valid_expression(x):
+    """ converts numbers to constant expressions """
+    if isinstance(x, Expression):
+        return x
+    if isinstance(x, int) or isinstance(x, float):
+        return Constant(x)
+    raise TypeError("%s is neither a number nor an expression" % str(x))
+
+
+class Constant(Expression):
+    """ A constant number """
+
+    def __init__(self, number):
+        self._number = number
+
+    def value(self):
+        return self._number
+
+    def evaluate(self, engine):
+        return self._number
+
+
+class Param(Expression):
+    """ A named parameter of the plan. In normal simulations, its value is
+    used, in vectorized simulations the values given by set_param """
+
+    def __init__(self, name, value = 0):
+        self._name = name
+        self._value = value
+
+    @property
+    def name(self):
+        return self._name
+
+    def value(self):
+        return self._value
+
+    def set_value(self, value):
+        self._value = value
+
+    def evaluate(self, engine):
+        return engine.param(self)
+
+
+class Operation(Expression):
+    """ Elementwise operation on two expressions. The operations are
+    numpy ufuncs, which give the same results for scalars and arrays """
+
+    def __init__(self, func, a, b):
+        self._func = func
+        self._a = valid_expression(a)
+        self._b = valid_expression(b)
+
+    def value(self):
+        return self._func(self._a.value(), self._b.value()).item()
+
+    def evaluate(self, engine):
+        return self._func(self._a.evaluate(engine), self._b.evaluate(engine))
+
+
+class Minimum(Operation):
+
+    def __init__(self, a, b):
+        super().__init__(np.minimum, a, b)
+
+
+class Maximum(Operation):
+
+    def __init__(self, a, b):
+        super().__init__(np.maximum, a, b)
+
+
+class Account_Value(Expression):
+    """ The current value of an account, as returned by get_account() """
+
+    def __init__(self, account):
+        if not (isinstance(account, Bank_Account) or isinstance(account, Loan)):
+            raise TypeError("account must be of type Bank_Account or Loan")
+        self._account = account
+
+    @property
+    def account(self):
+        return self._account
+
+    def value(self):
+        return self._account.get_account()
+
+    def evaluate(self, engine):
+        return engine.account_value(self._account)
+
+
+class Is_Finished(Expression):
+    """ True, if a loan has been payed back. Can be used as date_stop of
+    regular payments """
+
+    def __init__(self, loan):
+        if not isinstance(loan, Loan):
+            raise TypeError("loan must be of type Loan")
+        self._account = loan
+
+    @property
+    def account(self):
+        return self._account
+
+    def value(self):
+        return self._account.is_finished()
+
+    def evaluate(self, engine):
+        return engine.is_finished(self._account)
+
+
+def account_value(account):
+    return Account_Value(account)
+
+def minimum(a, b):
+    return Minimum(a, b)
+
+def maximum(a, b):
+    return Maximum(a, b)
+
+def is_finished(loan):
+    return Is_Finished(loan)
+
+
+def accrue(balance_days, caccount, day, days):
+    """ adds the balance-days of caccount for a number of days, starting
+    with the day ordinal day, to the balance_days per length of year. This is
+    the vectorized counterpart of Account.accrue """
+    current = date.fromordinal(day)
+    while days > 0:
+        days_of_year = min(days, (current.replace(month = 12, day = 31) - current).days + 1)
+        days_per_year = get_days_per_year(current.year)
+        if days_per_year not in balance_days:
+            balance_days[days_per_year] = np.zeros_like(caccount)
+        balance_days[days_per_year] += caccount * days_of_year
+        days -= days_of_year
+        current = current.replace(year = current.year + 1, month = 1, day = 1)
+
+
+class Vector_Result(object):
+    """ Results of a vectorized simulation. Balances are the values of
+    _caccount in cents, with one row per variant """
+
+    def __init__(self, names, dates, balances, final, interest):
+        self._names = names
+        self._dates = dates
+        self._balances = balances
+        self._final = final
+        self._interest = interest
+
+    @property
+    def names(self):
+        return self._names
+
+    @property
+    def dates(self):
+        """ list of dates of the recorded balances """
+        return self._dates
+
+    def balance(self, account):
+        """ returns the recorded balances of an account (given as object or
+        name) as array of shape (variants, dates) in cents """
+        return self._balances[self.name_of(account)]
+
+    def final(self, account):
+        """ returns the balance at the end of the simulation in cents """
+        return self._final[self.name_of(account)]
+
+    def interest(self, account):
+        """ returns the accrued but not yet booked interest at the end of the
+        simulation in cents """
+        return self._interest[self.name_of(account)]
+
+    def name_of(self, account):
+        if isinstance(account, str):
+            return account
+        return account.name
+
+
+class Vector_Simulation(object):
+    """ Simulates many variants of a plan at once. The plan is given as
+    Simulation, which has not been simulated yet. It may only contain accounts
+    of type Bank_Account and Loan, constant payments, payments given as
+    expressions and no controllers. The plan itself is not changed """
+
+    def __init__(self, simulation, size):
+        if simulation._day != 0:
+            raise ValueError("the template simulation must not have been simulated")
+        if simulation._controller or simulation._schedules or simulation._payment_triggers:
+            raise ValueError("controllers cannot be vectorized")
+        for account in simulation.accounts:
+            if not (type(account) is Bank_Account or type(account) is Loan):
+                raise TypeError("%s is of type %s, but only Bank_Account and Loan can be vectorized" %
+                                (account.name, type(account).__name__))
+        for payment in simulation._payments.uniques + simulation._payments.regular:
+            if not valid_vector_value(payment['payment']._payment):
+                raise TypeError("payment '%s' is neither a number nor an expression" % payment['name'])
+        for regular in simulation._payments.regular:
+            date_stop = regular['date_stop']
+            if callable(date_stop) and not isinstance(date_stop, Expression):
+                raise TypeError("date_stop of payment '%s' is neither a date nor an expression" %
+                                regular['name'])
+
+        self._simulation = simulation
+        self._size = size
+        self._amounts = {}
+        self._interests = {}
+        self._payments = {}
+        self._params = {}
+
+    @property
+    def size(self):
+        return self._size
+
+    def valid_values(self, values):
+        values = np.asarray(values, dtype = float)
+        if values.shape != (self._size, ):
+            raise ValueError("values must be of shape (%i,)" % self._size)
+        return values
+
+    def set_amount(self, account, values):
+        """ sets the start amounts of an account for all variants """
+        self._amounts[account] = self.valid_values(values)
+
+    def set_interest(self, account, values):
+        """ sets the interest rate of an account for all variants """
+        self._interests[account] = self.valid_values(values)
+
+    def set_payment(self, name, values):
+        """ sets the value of all constant payments with a given name """
+        self._payments[name] = self.valid_values(values)
+
+    def set_param(self, param, values):
+        """ sets the values of a Param expression (given as object or name)
+        for all variants """
+        if isinstance(param, Param):
+            param = param.name
+        self._params[param] = self.valid_values(values)
+
+    def param(self, param):
+        return self._params.get(param.name, param.value())
+
+    def account_value(self, account):
+        """ vectorized get_account() """
+        k = self._index[account]
+        if isinstance(account, Loan):
+            return (self._caccount[k] + self.sum_interest(k)) / 100
+        return self._caccount[k] / 100
+
+    def is_finished(self, loan):
+        """ vectorized Loan.is_finished() """
+        k = self._index[loan]
+        return (self._caccount[k] + self.sum_interest(k)) >= 0.
+
+    def sum_interest(self, k):
+        """ vectorized _sum_interest of account k """
+        accrued = 0
+        for days_per_year, balance_days in sorted(self._balance_days[k].items()):
+            accrued = accrued + balance_days * (self._interest[k] / days_per_year)
+        return self._interest_offset[k] + accrued
+
+    def reset_interest(self, k, mask):
+        """ sets _sum_interest of account k to zero for all variants in mask """
+        self._interest_offset[k] = np.where(mask, 0., self._interest_offset[k])
+        for balance_days in self._balance_days[k].values():
+            balance_days[mask] = 0
+
+    def exec_interest_time(self, k, mask):
+        """ books the accrued interest of account k for all variants in mask """
+        booked = np.rint(self._caccount[k] + self.sum_interest(k)).astype(np.int64)
+        self._caccount[k] = np.where(mask, booked, self._caccount[k])
+        self.reset_interest(k, mask)
+
+    def init_accounts(self):
+        """ creates the state of all accounts for all variants """
+        accounts = self._simulation.accounts
+        self._index = {account: k for (k, account) in enumerate(accounts)}
+        self._caccount = []
+        self._interest = []
+        self._interest_offset = []
+        self._balance_days = []
+        for account in accounts:
+            caccount = np.full(self._size, account._caccount, dtype = np.int64)
+            if account in self._amounts:
+                amount = self._amounts[account]
+                if isinstance(account, Loan):
+                    amount = -amount
+                caccount = np.trunc(amount * 100).astype(np.int64)
+            interest = np.full(self._size, account._interest)
+            if account in self._interests:
+                interest = self._interests[account]
+                interest = np.where(interest > 1., interest / 100., interest)
+            self._caccount.append(caccount)
+            self._interest.append(interest)
+            self._interest_offset.append(np.zeros(self._size))
+            self._balance_days.append({})
+
+    def init_streams(self, start_date):
+        """ creates the payment queue of the plan. Stop criteria given as
+        expressions are evaluated per variant, the queue only sees dates """
+        payments = PaymentList()
+        payments._uniques = self._simulation._payments.uniques
+        # state of the regular payments, by index and by their payment value
+        self._streams = []
+        self._stream_of = {}
+        for regular in self._simulation._payments.regular:
+            date_stop = regular['date_stop']
+            stream = {'stop': None, 'alive': None}
+            if isinstance(date_stop, Expression):
+                regular = dict(regular, date_stop = Bank_Date.max)
+                stream['stop'] = date_stop
+            payments._regular.append(regular)
+            self._streams.append(stream)
+            self._stream_of[id(regular['payment'])] = stream
+
+        queue = Payment_Queue(payments, start_date)
+        # the first payments of the queue have been determined, therefore
+        # the stop criteria need to be evaluated now
+        for stream in self._streams:
+            self.advance_stream(stream)
+        return queue
+
+    def advance_stream(self, stream):
+        """ evaluates the stop criteria of a regular payment for all variants """
+        if stream['stop'] is not None:
+            stop = np.broadcast_to(stream['stop'].evaluate(self), (self._size, ))
+            if stream['alive'] is None:
+                stream['alive'] = ~stop
+            else:
+                stream['alive'] = stream['alive'] & ~stop
+
+    def payment_value(self, payment):
+        """ returns the money of a payment for all variants in cents """
+        value = payment['payment']._payment
+        if isinstance(value, Expression):
+            value = value.evaluate(self)
+        elif payment['name'] in self._payments:
+            value = self._payments[payment['name']]
+        money = np.trunc(np.multiply(value, 100))
+        return np.broadcast_to(money, (self._size, )).astype(np.int64)
+
+    def make_transfer(self, payment, day):
+        """ vectorized counterpart of Simulation.make_transfer for Bank_Account,
+        Loan and DummyAccount """
+        for account in (payment['from_acc'], payment['to_acc']):
+            if not isinstance(account, DummyAccount):
+                assert account._date_start.toordinal() <= day, (str(account) + ' has a later creation date than the payment ' + payment['name'])
+
+        # loans cannot send money
+        if isinstance(payment['from_acc'], Loan):
+            return
+
+        money = self.payment_value(payment)
+        active = money != 0
+        stream = self._stream_of.get(id(payment['payment']))
+        if stream is not None and stream['alive'] is not None:
+            active = active & stream['alive']
+
+        sender = self._index.get(payment['from_acc'])
+        receiver = self._index.get(payment['to_acc'])
+
+        if sender is not None:
+            self._caccount[sender] = np.where(active, self._caccount[sender] - money, self._caccount[sender])
+
+        if not isinstance(payment['to_acc'], Loan):
+            if receiver is not None:
+                self._caccount[receiver] = np.where(active, self._caccount[receiver] + money, self._caccount[receiver])
+            return
+
+        caccount = self._caccount[receiver]
+        open_debt = caccount + self.sum_interest(receiver)
+        owed = -open_debt
+        rejected = active & (open_debt >= 0)
+        partial = active & ~rejected & (money > owed)
+        full = active & ~rejected & ~partial
+
+        if payment['fixed'] and np.any(partial):
+            raise ValueError("%s was submitted to account '%s' but less was accepted because it is fixed" %
+                             (payment['name'], payment['to_acc'].name))
+
+        caccount = np.where(full, caccount + money, caccount)
+        caccount = np.where(partial, np.trunc(open_debt + owed).astype(np.int64), caccount)
+        self._caccount[receiver] = caccount
+        self.reset_interest(receiver, partial)
+
+        # money that has not been accepted goes back to the sender
+        if sender is not None:
+            returned = self._caccount[sender]
+            returned = np.where(rejected, returned + money, returned)
+            returned = np.where(partial, np.trunc(returned + (money - owed)).astype(np.int64), returned)
+            self._caccount[sender] = returned
+
+    def end_of_day(self, day):
+        """ books interest on the paydate of each account """
+        current = date.fromordinal(day)
+        for account, k in self._index.items():
+            if account._date_start.toordinal() > day:
+                continue
+            accrue(self._balance_days[k], self._caccount[k], day, 1)
+            paydate = ((current.day == account._interest_paydate['day']) and
+                       (current.month == account._interest_paydate['month']))
+            if isinstance(account, Loan):
+                mask = paydate | (self._caccount[k] > 0)
+            else:
+                mask = np.full(self._size, paydate)
+            if np.any(mask):
+                self.exec_interest_time(k, mask)
+
+    def next_event(self, day, queue):
+        """ returns the next day after day, on which anything happens """
+        next_day = queue.next_date().toordinal()
+        current = date.fromordinal(day)
+        for account, k in self._index.items():
+            start = account._date_start.toordinal()
+            if start > day:
+                next_day = min(next_day, start)
+                continue
+            paydate = date(current.year, account._interest_paydate['month'], account._interest_paydate['day'])
+            if paydate <= current:
+                paydate = paydate.replace(year = current.year + 1)
+            next_day = min(next_day, paydate.toordinal())
+            if isinstance(account, Loan) and np.any(self._caccount[k] > 0):
+                next_day = day + 1
+        return max(next_day, day + 1)
+
+    def simulate(self, date_stop = None, delta = None, record = 'daily'):
+        """ Simulates all variants, starting at the date of the template
+        simulation. date_stop and delta are handled like in
+        Simulation.simulate. record defines, which balances are returned:
+            'daily': balance of each day
+            'monthly', 'yearly': balance of the last day of each period
+            'final': only the balance after the last day """
+        if record not in ('daily', 'monthly', 'yearly', 'final'):
+            raise ValueError("record must be one of 'daily', 'monthly', 'yearly', 'final'")
+        date_stop = validate.valid_date_stop(date_stop)
+        delta = validate.valid_delta(delta)
+
+        start_date = self._simulation.current_date
+        days = min(delta.days, C_max_time, days_until(start_date, date_stop))
+        first = start_date.toordinal()
+        last = first + days - 1
+
+        self.init_accounts()
+        queue = self.init_streams(start_date)
+        accounts = self._simulation.accounts
+
+        record_days = []
+        records = []
+        # day up to which the interest has been accrued, per account
+        accrued = [max(first, a._date_start.toordinal()) - 1 for a in accounts]
+
+        day = first
+        while day <= last:
+            for account, k in self._index.items():
+                if accrued[k] < day - 1:
+                    accrue(self._balance_days[k], self._caccount[k], accrued[k] + 1, day - 1 - accrued[k])
+                accrued[k] = max(accrued[k], day)
+
+            if queue.next_date().toordinal() == day:
+                for payment in queue.pop_day():
+                    self.make_transfer(payment, day)
+                # stop criteria are evaluated right after the transfers, like
+                # in Payment_Queue.advance
+                for index in queue.popped:
+                    self.advance_stream(self._streams[index])
+                queue.advance()
+
+            self.end_of_day(day)
+
+            next_day = min(self.next_event(day, queue), last + 1)
+            balances = [c.copy() for c in self._caccount]
+            for d in self.record_days(day, next_day - 1, record, last):
+                record_days.append(d)
+                records.append(balances)
+            day = next_day
+
+        # accrue the days after the last event
+        for account, k in self._index.items():
+            if accrued[k] < last:
+                accrue(self._balance_days[k], self._caccount[k], accrued[k] + 1, last - accrued[k])
+
+        names = [a.name for a in accounts]
+        dates = [Bank_Date.fromordinal(d) for d in record_days]
+        if records:
+            result = {name: np.stack([r[k] for r in records], axis = 1) for (k, name) in enumerate(names)}
+        else:
+            result = {name: np.zeros((self._size, 0), dtype = np.int64) for name in names}
+        final = {name: self._caccount[k] for (k, name) in enumerate(names)}
+        interest = {name: self.sum_interest(k) for (k, name) in enumerate(names)}
+        return Vector_Result(names, dates, result, final, interest)
+
+    def record_days(self, first, last, record, end):
+        """ returns the days between first and last (including) for which
+        balances are recorded """
+        if record == 'daily':
+            return range(first, last + 1)
+        if record == 'final':
+            return [end] if first <= end <= last else []
+        result = []
+        current = date.fromordinal(first)
+        while current.toordinal() <= last:
+            if record == 'monthly':
+                following = (current.replace(day = 1) + timedelta(days = 32)).replace(day = 1)
+            else:
+                following = date(current.year + 1, 1, 1)
+            period_end = min(following.toordinal() - 1, end)
+            if period_end <= last:
+                result.append(period_end)
+            current = following
+        return result
+
+
+def valid_vector_value(payment):
+    """ checks, whether the value of a payment can be vectorized """
+    return (isinstance(payment, int) or isinstance(payment, float) or
+            isinstance(payment, Expression))
@@ -44,5 +44,8 @@ if have_setuptools is True:
 		'tabulate>=0.7.5,<1',
         'xlwt>=1.2.0',
 	]
+	skw['extras_require'] = {
+		'parquet': ['pyarrow'],
+	}
 
 setup(**skw)